@@ -0,0 +1,110 @@
+"""
+배치 검색 처리량 벤치마크
+
+ChromaService.search()를 쿼리마다 호출하는 루프와 search_batch()로
+한 번에 검색하는 방식의 결과가 같은지 확인하고 처리량(QPS)을 비교합니다.
+
+쿼리는 인덱싱된 문서의 첫 줄에서 뽑으며, 공정한 비교를 위해
+임베딩 디스크 캐시, 쿼리 임베딩 캐시, 결과 캐시는 모두 끕니다.
+
+실행 (먼저 python -m services.chroma_service 로 인덱스 생성):
+    python -m benchmarks.batch_search_bench [--queries 500] [--batch-sizes 16 64 256]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from services.chroma_service import ChromaService
+
+
+def sample_queries(
+    service: ChromaService, count: int, with_filters: bool, seed: int = 42
+) -> Tuple[List[str], List[Optional[Dict]]]:
+    """인덱싱된 문서의 첫 줄로 쿼리(와 필터)를 만듭니다."""
+    page = service.collection.get(limit=max(count * 4, 1000), include=["documents", "metadatas"])
+
+    rng = random.Random(seed)
+    candidates = [
+        (doc.split("\n", 1)[0], metadata)
+        for doc, metadata in zip(page["documents"], page["metadatas"])
+        if doc.strip()
+    ]
+    picked = [rng.choice(candidates) for _ in range(count)]
+
+    queries = [text for text, _ in picked]
+    filters = [
+        {"platform_filter": metadata.get("platform")} if with_filters and i % 2 else None
+        for i, (_, metadata) in enumerate(picked)
+    ]
+    return queries, filters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="배치 검색 처리량 벤치마크")
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument("--queries", type=int, default=500, help="쿼리 수")
+    parser.add_argument("--n-results", type=int, default=5, help="쿼리당 결과 수")
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[16, 64, 256], help="비교할 배치 크기"
+    )
+    parser.add_argument(
+        "--with-filters", action="store_true", help="쿼리 절반에 플랫폼 필터 적용"
+    )
+    args = parser.parse_args()
+
+    service = ChromaService(
+        persist_dir=args.persist_dir,
+        use_embedding_cache=False,
+        query_cache_size=0,
+        result_cache_size=0,
+    )
+    if service.collection.count() == 0:
+        raise SystemExit("컬렉션이 비어 있습니다. 먼저 인덱스를 생성하세요.")
+
+    queries, filters = sample_queries(service, args.queries, args.with_filters)
+    print(f"쿼리 수: {len(queries)} (필터 적용: {sum(f is not None for f in filters)})")
+
+    # 모델 로딩 등 첫 호출 비용 제외
+    service.search_batch(queries[:8], n_results=args.n_results, filters=filters[:8])
+
+    start = time.perf_counter()
+    expected = [
+        service.search(query, n_results=args.n_results, **(query_filters or {}))
+        for query, query_filters in zip(queries, filters)
+    ]
+    loop_elapsed = time.perf_counter() - start
+
+    results = {"search() loop": loop_elapsed}
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        got = []
+        for i in range(0, len(queries), batch_size):
+            got.extend(
+                service.search_batch(
+                    queries[i : i + batch_size],
+                    n_results=args.n_results,
+                    filters=filters[i : i + batch_size],
+                )
+            )
+        results[f"search_batch({batch_size})"] = time.perf_counter() - start
+
+        mismatches = sum(
+            want["ids"] != have["ids"] for want, have in zip(expected, got)
+        )
+        if mismatches:
+            print(f"❌ batch_size={batch_size}: 결과 불일치 {mismatches}건")
+            raise SystemExit(1)
+    print("✅ 루프 검색과 배치 검색 결과 일치")
+
+    print()
+    for name, elapsed in results.items():
+        print(
+            f"{name:<20} {elapsed * 1000:9.1f} ms  "
+            f"{len(queries) / elapsed:9.1f} QPS  x{loop_elapsed / elapsed:5.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
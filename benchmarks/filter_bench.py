@@ -0,0 +1,231 @@
+"""
+주제 필터 검색 지연 시간 벤치마크
+
+주제 필터를 subject 부분 문자열로 거르는 기존 방식과 인덱싱 시 만든 태그 필드
+정확 일치로 거르는 방식의 검색 지연 시간을 비교합니다.
+
+같은 결과를 내는 방식끼리만 비교하도록, 전체 메타데이터와 벡터를 파이썬에서
+직접 걸러 정확히 계산한 결과(reference)와 방식별 결과 수가 같은지 먼저 확인합니다.
+
+- substring scan: 메타데이터를 훑어 subject 부분 문자열로 거른 뒤 그 ID 안에서 검색
+  (부분 문자열 필터를 결과가 맞게 처리하는 기준 방식)
+- chroma $contains: where의 $contains 조건 (ChromaDB 버전에 따라 문자열 메타데이터의
+  부분 문자열 일치를 지원하지 않아 결과가 없으면 비교에서 제외)
+- chroma tag / int8 index tag: 태그 필드 정확 일치 (ChromaDB 검색 / 양자화 인덱스)
+
+쿼리는 chroma_service.TEST_QUERIES에 인덱싱된 문서 첫 줄 샘플을 더해 사용하고,
+쿼리마다 컬렉션에 있는 주제 태그 하나(+ 절반은 플랫폼)를 필터로 붙입니다.
+쿼리 임베딩은 미리 캐시해 두므로 측정값에는 임베딩 시간이 포함되지 않습니다.
+태그 방식의 결과 수가 기준과 다르면 실패(종료 코드 1)로 처리합니다.
+
+실행 (태그 필드가 포함되도록 인덱스를 다시 만든 뒤):
+    python -m benchmarks.filter_bench [-k 5] [--sample-queries 200]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from services.chroma_service import TEST_QUERIES, ChromaService
+from services.subject_tags import subject_tags
+
+
+def sample_workload(service: ChromaService, count: int, seed: int = 42) -> List[Dict]:
+    """쿼리와 필터 조합을 만듭니다."""
+    page = service.collection.get(limit=max(count * 4, 1000), include=["documents", "metadatas"])
+    rng = random.Random(seed)
+
+    samples = [
+        (doc.split("\n", 1)[0], metadata)
+        for doc, metadata in zip(page["documents"], page["metadatas"])
+        if doc.strip() and subject_tags(metadata.get("subject", ""))
+    ]
+    if not samples:
+        return []
+
+    texts = TEST_QUERIES + [rng.choice(samples)[0] for _ in range(count)]
+    workload = []
+    for i, text in enumerate(texts):
+        _, metadata = rng.choice(samples)
+        workload.append(
+            {
+                "query": text,
+                "subject_filter": rng.choice(subject_tags(metadata["subject"])),
+                "platform_filter": metadata.get("platform") if i % 2 else None,
+            }
+        )
+    return workload
+
+
+def load_corpus(service: ChromaService, page_size: int = 5000) -> Tuple[List[str], List[Dict], np.ndarray]:
+    """컬렉션의 ID, 메타데이터, 정규화한 벡터를 모두 읽습니다."""
+    ids: List[str] = []
+    metadatas: List[Dict] = []
+    vectors = []
+    offset = 0
+    while True:
+        page = service.collection.get(
+            limit=page_size, offset=offset, include=["metadatas", "embeddings"]
+        )
+        ids.extend(page["ids"])
+        metadatas.extend(metadata or {} for metadata in page["metadatas"])
+        if len(page["ids"]):
+            vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        if len(page["ids"]) < page_size:
+            break
+        offset += page_size
+
+    matrix = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return ids, metadatas, matrix / np.where(norms > 0, norms, 1.0)
+
+
+def substring_match(metadata: Dict, item: Dict) -> bool:
+    """기존 $contains 필터와 같은 의미의 파이썬 부분 문자열 조건"""
+    if item["platform_filter"] and metadata.get("platform") != item["platform_filter"]:
+        return False
+    return item["subject_filter"] in metadata.get("subject", "")
+
+
+def reference_search(
+    ids: List[str], metadatas: List[Dict], matrix: np.ndarray, embedding, item: Dict, k: int
+) -> List[str]:
+    """필터에 맞는 문서 전체와 거리를 직접 계산한 정확한 top-k"""
+    candidates = [i for i, metadata in enumerate(metadatas) if substring_match(metadata, item)]
+    if not candidates:
+        return []
+    query = np.asarray(embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+    distances = 1.0 - matrix[candidates] @ query
+    order = np.argsort(distances, kind="stable")[:k]
+    return [ids[candidates[j]] for j in order]
+
+
+def run_mode(
+    search: Callable[[Dict], List[str]], workload: List[Dict], references: List[List[str]]
+) -> Dict:
+    """한 방식으로 워크로드를 실행하고 지연 시간과 기준 대비 결과를 집계합니다."""
+    latencies = []
+    hits = []
+    parity = 0
+    overlap = 0
+    expected = 0
+    for item, reference in zip(workload, references):
+        start = time.perf_counter()
+        found = search(item)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        hits.append(len(found))
+        parity += len(found) == len(reference)
+        overlap += len(set(found) & set(reference))
+        expected += len(reference)
+
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "hits": sum(hits) / len(hits),
+        "parity": parity / len(workload),
+        "recall": overlap / expected if expected else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주제 필터 검색 지연 시간 벤치마크")
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument("-k", type=int, default=5, help="쿼리당 결과 수")
+    parser.add_argument(
+        "--sample-queries", type=int, default=200, help="TEST_QUERIES에 더할 샘플 쿼리 수"
+    )
+    args = parser.parse_args()
+
+    chroma = ChromaService(persist_dir=args.persist_dir, result_cache_size=0)
+    if chroma.collection.count() == 0:
+        raise SystemExit("컬렉션이 비어 있습니다. 먼저 인덱스를 생성하세요.")
+
+    workload = sample_workload(chroma, args.sample_queries)
+    if not workload:
+        raise SystemExit("주제가 있는 문서가 없습니다.")
+
+    quantized = ChromaService(
+        persist_dir=args.persist_dir, result_cache_size=0, quantization="int8"
+    )
+    quantized.get_quantized_index()
+
+    # 쿼리 임베딩을 미리 캐시 (임베딩 시간 제외)
+    queries = [item["query"] for item in workload]
+    embeddings = dict(zip(queries, chroma.embed_queries(queries)))
+    quantized.embed_queries(queries)
+
+    ids, metadatas, matrix = load_corpus(chroma)
+    references = [
+        reference_search(ids, metadatas, matrix, embeddings[item["query"]], item, args.k)
+        for item in workload
+    ]
+
+    def substring_scan(item: Dict) -> List[str]:
+        matched = [doc_id for doc_id, metadata in zip(ids, metadatas) if substring_match(metadata, item)]
+        if not matched:
+            return []
+        response = chroma.collection.query(
+            query_embeddings=[embeddings[item["query"]]],
+            ids=matched,
+            n_results=min(args.k, len(matched)),
+            include=[],
+        )
+        return response["ids"][0]
+
+    def service_search(service: ChromaService, mode: str) -> Callable[[Dict], List[str]]:
+        def search(item: Dict) -> List[str]:
+            results = service.search(
+                item["query"],
+                n_results=args.k,
+                platform_filter=item["platform_filter"],
+                subject_filter=item["subject_filter"],
+                subject_filter_mode=mode,
+            )
+            return results["ids"][0] if results["ids"] else []
+
+        return search
+
+    print(f"문서 수: {chroma.collection.count()}, 쿼리 수: {len(workload)}, k={args.k}")
+    print(f"기준 결과 평균 수: {sum(len(r) for r in references) / len(references):.2f}")
+    print()
+    print(f"{'filter':<20}{'p50 ms':>10}{'p95 ms':>10}{'avg hits':>10}{'parity':>9}{'recall':>9}")
+
+    runs = [
+        ("substring scan", substring_scan, True),
+        ("chroma $contains", service_search(chroma, "contains"), False),
+        ("chroma tag", service_search(chroma, "tag"), True),
+        ("int8 index tag", service_search(quantized, "tag"), True),
+    ]
+    results = {}
+    failed = []
+    for name, search, required in runs:
+        summary = run_mode(search, workload, references)
+        comparable = summary["parity"] == 1.0
+        if comparable:
+            results[name] = summary
+        elif required:
+            failed.append(name)
+        print(
+            f"{name:<20}{summary['p50']:>10.2f}{summary['p95']:>10.2f}{summary['hits']:>10.2f}"
+            f"{summary['parity']:>9.1%}{summary['recall']:>9.1%}"
+            + ("" if comparable else "  (결과 수 불일치: 비교 제외)")
+        )
+
+    baseline = results.get("substring scan")
+    if baseline:
+        print()
+        for name, summary in results.items():
+            if name != "substring scan":
+                print(f"{name}: p50 {baseline['p50'] / summary['p50']:.2f}x (substring scan 대비)")
+
+    if failed:
+        raise SystemExit(f"기준과 결과 수가 다른 방식: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
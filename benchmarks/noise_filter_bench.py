@@ -0,0 +1,132 @@
+"""
+노이즈 필터 마이크로 벤치마크
+
+기존 clean_text 구현(패턴별 re.sub 반복)과 단일 패스 NoiseFilter의
+출력이 같은지 확인하고 처리 속도를 비교합니다.
+
+실행:
+    python -m benchmarks.noise_filter_bench [--data-dir preprocess/data] [--lines 200000]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from preprocess.data_preprocessor import CHAT_NOISE_PATTERNS, NOISE_FILTER, clean_text
+
+# 샘플 코퍼스 생성용 토큰 (노이즈 + 일반 단어 + 다양한 공백)
+_SAMPLE_TOKENS = [
+    "안녕하세요", "밥", "먹었어?", "오늘", "뭐해", "주말에", "영화", "보러", "갈래",
+    "ㅋ", "ㅋㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅜ", "키키", "헤헤", "하하하", "호호", "히히",
+    "웅", "앜", "엌엌", "ㄱㄱ", "ㅇㅇ", "ㅇ", "ㄷㄷ", ";;;", ";;", "...", "..",
+    "하", "헤", "ㄱ", "키읔", "웅장한", "하하호호", " ", "\t", "　",
+]
+
+
+def clean_text_reference(text: str) -> str:
+    """기존 clean_text 구현 (패턴마다 re.sub 실행)"""
+    cleaned = text
+    for pattern in CHAT_NOISE_PATTERNS:
+        cleaned = re.sub(pattern, " ", cleaned)
+    cleaned = re.sub(r"\s+", " ", cleaned)
+    return cleaned.strip()
+
+
+def load_sample_lines(data_dir: Optional[Path], limit: int, seed: int = 42) -> List[str]:
+    """
+    샘플 코퍼스를 준비합니다.
+
+    data_dir에 원본 데이터가 있으면 norm_text를 사용하고,
+    부족한 만큼은 노이즈가 섞인 합성 문장으로 채웁니다.
+    """
+    lines = []
+
+    if data_dir and data_dir.exists():
+        for json_file in sorted(data_dir.glob("*/*.json")):
+            try:
+                with open(json_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            for info in data.get("info", []):
+                for line in info.get("annotations", {}).get("lines", []):
+                    norm_text = line.get("norm_text", "")
+                    if norm_text:
+                        lines.append(norm_text)
+            if len(lines) >= limit:
+                return lines[:limit]
+
+    rng = random.Random(seed)
+    while len(lines) < limit:
+        tokens = rng.choices(_SAMPLE_TOKENS, k=rng.randint(1, 12))
+        separators = rng.choices(["", " ", "  "], k=len(tokens))
+        lines.append("".join(t + s for t, s in zip(tokens, separators)))
+
+    return lines
+
+
+def _measure(fn: Callable[[List[str]], List[str]], lines: List[str], repeat: int) -> float:
+    """repeat 회 실행 중 가장 빠른 시간을 초 단위로 반환합니다."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="노이즈 필터 마이크로 벤치마크")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path(__file__).parent.parent / "preprocess" / "data",
+        help="샘플로 사용할 원본 데이터 디렉토리",
+    )
+    parser.add_argument("--lines", type=int, default=200_000, help="샘플 줄 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수")
+    args = parser.parse_args()
+
+    lines = load_sample_lines(args.data_dir, args.lines)
+    print(f"샘플 줄 수: {len(lines)}")
+
+    # 출력 일치 확인
+    expected = [clean_text_reference(line) for line in lines]
+    mismatches = [
+        (line, want, got)
+        for line, want, got in zip(lines, expected, NOISE_FILTER.clean_batch(lines))
+        if want != got
+    ]
+    if mismatches:
+        print(f"❌ 출력 불일치 {len(mismatches)}건")
+        for line, want, got in mismatches[:5]:
+            print(f"  입력: {line!r}\n    기존: {want!r}\n    신규: {got!r}")
+        raise SystemExit(1)
+    print("✅ 기존 구현과 출력 일치")
+
+    results = {
+        "reference (re.sub x18)": _measure(
+            lambda xs: [clean_text_reference(x) for x in xs], lines, args.repeat
+        ),
+        "clean_text (single pass)": _measure(
+            lambda xs: [clean_text(x) for x in xs], lines, args.repeat
+        ),
+        "clean_batch": _measure(NOISE_FILTER.clean_batch, lines, args.repeat),
+    }
+
+    baseline = results["reference (re.sub x18)"]
+    print()
+    for name, elapsed in results.items():
+        rate = len(lines) / elapsed if elapsed else float("inf")
+        print(
+            f"{name:<26} {elapsed * 1000:9.1f} ms  "
+            f"{rate:12,.0f} lines/s  x{baseline / elapsed:5.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+양자화 인덱스 정확도/지연 시간 벤치마크
+
+ChromaDB 컬렉션에 저장된 float32 벡터로 float32 / float16 / int8 양자화 인덱스를
+만들고, 현재 검색 경로(ChromaDB HNSW)와 함께 다음을 비교합니다.
+
+- recall@k: float32 전수 검색 결과(정답) 대비 겹치는 비율
+- p50 / p95 지연 시간: 쿼리 하나 검색에 걸린 시간 (임베딩 제외)
+- 벡터 저장 크기
+
+쿼리는 chroma_service.TEST_QUERIES에 인덱싱된 문서 첫 줄 샘플을 더해 사용합니다.
+
+실행 (먼저 python -m services.chroma_service 로 인덱스 생성):
+    python -m benchmarks.quantization_bench [-k 5] [--sample-queries 200]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from services.chroma_service import TEST_QUERIES, ChromaService
+from services.quantized_index import SUPPORTED_DTYPES, QuantizedIndex
+
+
+def build_indexes(service: ChromaService, page_size: int = 5000) -> Dict[str, QuantizedIndex]:
+    """컬렉션 벡터로 dtype별 인덱스를 만듭니다."""
+    indexes = {dtype: QuantizedIndex(dtype) for dtype in SUPPORTED_DTYPES}
+    offset = 0
+    while True:
+        page = service.collection.get(
+            limit=page_size, offset=offset, include=["embeddings", "metadatas"]
+        )
+        for index in indexes.values():
+            index.add(page["ids"], page["embeddings"], page["metadatas"])
+        if len(page["ids"]) < page_size:
+            return indexes
+        offset += page_size
+
+
+def sample_queries(service: ChromaService, count: int, seed: int = 42) -> List[str]:
+    """인덱싱된 문서의 첫 줄을 쿼리로 뽑습니다."""
+    if count <= 0:
+        return []
+    page = service.collection.get(limit=max(count * 4, 1000), include=["documents"])
+    lines = [doc.split("\n", 1)[0] for doc in page["documents"] if doc.strip()]
+    rng = random.Random(seed)
+    return [rng.choice(lines) for _ in range(count)] if lines else []
+
+
+def run(
+    search: Callable[[List[float]], List[str]], embeddings: Sequence[List[float]]
+) -> Tuple[List[List[str]], List[float]]:
+    """쿼리별 검색 결과와 지연 시간(ms)을 반환합니다."""
+    results = []
+    latencies = []
+    for embedding in embeddings:
+        start = time.perf_counter()
+        results.append(search(embedding))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def recall_at_k(truth: List[List[str]], got: List[List[str]]) -> float:
+    """정답 대비 recall@k 평균"""
+    scores = [len(set(t) & set(g)) / len(t) for t, g in zip(truth, got) if t]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="양자화 인덱스 정확도/지연 시간 벤치마크")
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument("-k", type=int, default=5, help="쿼리당 결과 수")
+    parser.add_argument(
+        "--sample-queries", type=int, default=200, help="TEST_QUERIES에 더할 샘플 쿼리 수"
+    )
+    args = parser.parse_args()
+
+    service = ChromaService(persist_dir=args.persist_dir, result_cache_size=0)
+    count = service.collection.count()
+    if count == 0:
+        raise SystemExit("컬렉션이 비어 있습니다. 먼저 인덱스를 생성하세요.")
+
+    queries = TEST_QUERIES + sample_queries(service, args.sample_queries)
+    embeddings = service.embed_queries(queries)
+    print(f"문서 수: {count}, 쿼리 수: {len(queries)}, k={args.k}")
+
+    indexes = build_indexes(service)
+
+    def hnsw_search(embedding: List[float]) -> List[str]:
+        return service.collection.query(
+            query_embeddings=[embedding], n_results=args.k, include=[]
+        )["ids"][0]
+
+    def index_search(index: QuantizedIndex) -> Callable[[List[float]], List[str]]:
+        return lambda embedding: index.search([embedding], args.k)[0][0]
+
+    truth, _ = run(index_search(indexes["float32"]), embeddings)
+
+    rows = [("chroma hnsw (float32)", hnsw_search, count * len(embeddings[0]) * 4)]
+    rows += [
+        (f"{dtype} exact", index_search(index), index.nbytes)
+        for dtype, index in indexes.items()
+    ]
+
+    print()
+    print(f"{'search':<24}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'vectors MB':>13}")
+    for name, search, nbytes in rows:
+        got, latencies = run(search, embeddings)
+        print(
+            f"{name:<24}{recall_at_k(truth, got):>10.4f}"
+            f"{np.percentile(latencies, 50):>10.2f}{np.percentile(latencies, 95):>10.2f}"
+            f"{nbytes / 1024 / 1024:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+검색 지연 시간/품질 벤치마크
+
+버전이 붙은 쿼리 세트(benchmarks/queries/v1.jsonl)로 로컬에 만든 컬렉션을 검색하고,
+ChromaService.search와 RAGService.search_context 각각에 대해 다음을 측정합니다.
+
+- 지연 시간 p50 / p95 / p99 (ms), 초당 쿼리 수(QPS)
+- recall@k, MRR
+
+쿼리 세트 형식 (한 줄에 쿼리 하나):
+    {"id": "q001", "query": "안녕하세요",
+     "relevant_ids": [...],          # 정답 문서 ID (선택)
+     "relevant_keywords": [...],     # 정답 문서에 들어 있어야 할 단어 (선택)
+     "filters": {"subject_filter": "연애"}}  # search() 필터 (선택)
+
+relevant_ids가 있는 쿼리(id 라벨)는 recall@k = 찾은 정답 수 / 정답 수로,
+relevant_keywords만 있는 쿼리(키워드 라벨)는 키워드가 하나라도 든 문서를 정답으로 보고
+hit_rate@k = 상위 k개 안에 정답이 있는지 여부로 계산합니다.
+키워드 라벨은 글자가 겹치는 문서를 정답으로 보므로 어휘(하이브리드) 검색에 유리하게
+치우칩니다. 그래서 두 라벨의 지표는 섞지 않고 quality.ids / quality.keywords로 따로 보고합니다.
+search_context는 내부 검색(RAGService.retrieve) 결과로 품질을, search_context 호출로
+지연 시간을 잽니다.
+
+--fixture를 주면 고정 말뭉치(benchmarks/fixtures/corpus_v1.jsonl)로 임시 컬렉션을 만들고
+id 라벨 쿼리 세트(benchmarks/queries/fixture_v1.jsonl)로 측정합니다. 말뭉치가 고정되어
+있어 정답 ID가 바뀌지 않으므로, 검색 방식 간 품질 비교는 이 결과를 기준으로 합니다.
+
+결과는 JSON으로 출력하며(--output으로 파일 저장), 인덱스나 모델을 바꾼 뒤
+이전 결과와 비교해 회귀를 확인할 수 있습니다. 임베딩/결과 캐시는 모두 끄고 측정합니다.
+
+실행 (먼저 python -m services.chroma_service 로 인덱스 생성):
+    python -m benchmarks.retrieval_bench [-k 5] [--output bench_results.json]
+    python -m benchmarks.retrieval_bench --fixture [--search-mode hybrid]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from preprocess.corpus_io import iter_processed_data
+from services.chroma_service import SEARCH_MODES, ChromaService
+from services.quantized_index import SUPPORTED_DTYPES
+from services.rag_service import RAGService
+from services.vector_store import ChromaVectorStore
+
+DEFAULT_QUERY_SET = Path(__file__).parent / "queries" / "v1.jsonl"
+
+# 정답 ID가 고정된 말뭉치와 쿼리 세트
+FIXTURE_CORPUS = Path(__file__).parent / "fixtures" / "corpus_v1.jsonl"
+FIXTURE_QUERY_SET = Path(__file__).parent / "queries" / "fixture_v1.jsonl"
+
+
+def load_query_set(path: Path) -> List[Dict]:
+    """쿼리 세트를 읽습니다."""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                queries.append(json.loads(line))
+    return queries
+
+
+def is_relevant(label: Dict, doc_id: str, document: str) -> bool:
+    """검색된 문서가 쿼리의 정답인지 확인합니다."""
+    if label.get("relevant_ids"):
+        return doc_id in label["relevant_ids"]
+    return any(keyword in document for keyword in label.get("relevant_keywords", []))
+
+
+def score_ranking(label: Dict, hits: List[Dict], k: int) -> Dict:
+    """검색 결과 하나의 recall@k와 reciprocal rank를 계산합니다."""
+    flags = [is_relevant(label, hit["id"], hit["dialogue"]) for hit in hits[:k]]
+
+    relevant_ids = label.get("relevant_ids")
+    if relevant_ids:
+        kind = "ids"
+        recall = sum(flags) / len(relevant_ids)
+    else:
+        kind = "keywords"
+        recall = 1.0 if any(flags) else 0.0
+
+    reciprocal_rank = next((1.0 / rank for rank, flag in enumerate(flags, 1) if flag), 0.0)
+    return {"label": kind, "recall": recall, "reciprocal_rank": reciprocal_rank}
+
+
+def summarize_quality(scores: List[Dict]) -> Dict:
+    """품질 지표를 라벨 종류(ids, keywords)별로 따로 요약합니다."""
+    quality = {}
+    for kind, metric in (("ids", "recall_at_k"), ("keywords", "hit_rate_at_k")):
+        group = [s for s in scores if s["label"] == kind]
+        if not group:
+            continue
+        quality[kind] = {
+            "queries": len(group),
+            metric: round(float(np.mean([s["recall"] for s in group])), 4),
+            "mrr": round(float(np.mean([s["reciprocal_rank"] for s in group])), 4),
+        }
+    return quality
+
+
+def summarize(latencies: List[float], scores: Optional[List[Dict]] = None) -> Dict:
+    """지연 시간과 품질 지표를 요약합니다."""
+    total_seconds = sum(latencies) / 1000
+    summary = {
+        "queries": len(latencies),
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+            "p99": round(float(np.percentile(latencies, 99)), 3),
+            "mean": round(float(np.mean(latencies)), 3),
+        },
+        "qps": round(len(latencies) / total_seconds, 2) if total_seconds else None,
+    }
+    if scores is not None:
+        summary["quality"] = summarize_quality(scores)
+    return summary
+
+
+def timed(fn: Callable[[], object]) -> Tuple[object, float]:
+    """함수를 실행하고 (결과, 걸린 시간 ms)를 반환합니다."""
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(
+    service: ChromaService, queries: List[Dict], k: int, repeat: int = 1
+) -> Dict:
+    """ChromaService.search와 RAGService.search_context를 측정합니다."""
+    rag = RAGService(vector_store=ChromaVectorStore(service))
+
+    # 모델 로딩 등 첫 호출 비용 제외
+    service.search(queries[0]["query"], n_results=k)
+
+    search_latencies = []
+    search_scores = []
+    context_latencies = []
+    context_scores = []
+
+    for _ in range(repeat):
+        for label in queries:
+            filters = label.get("filters") or {}
+
+            results, elapsed = timed(
+                lambda: service.search(label["query"], n_results=k, **filters)
+            )
+            search_latencies.append(elapsed)
+            search_scores.append(score_ranking(label, service.to_conversations(results), k))
+
+            _, elapsed = timed(lambda: rag.search_context(label["query"], n_results=k))
+            context_latencies.append(elapsed)
+            context_scores.append(score_ranking(label, rag.retrieve(label["query"], k), k))
+
+    return {
+        "search": summarize(search_latencies, search_scores),
+        "search_context": summarize(context_latencies, context_scores),
+    }
+
+
+def build_report(args: argparse.Namespace, persist_dir: Optional[str]) -> Dict:
+    """인덱스를 열고(--fixture면 고정 말뭉치로 채우고) 벤치마크 결과 보고서를 만듭니다."""
+    queries = load_query_set(args.queries)
+    service = ChromaService(
+        persist_dir=persist_dir,
+        use_embedding_cache=False,
+        query_cache_size=0,
+        result_cache_size=0,
+        search_mode=args.search_mode,
+        quantization=args.quantization,
+    )
+    if args.fixture:
+        # 청킹하지 않고 대화 하나를 문서 하나로 넣어 문서 ID = conversation_id
+        service.add_conversations(iter_processed_data(str(FIXTURE_CORPUS)))
+    if service.collection.count() == 0:
+        raise SystemExit("컬렉션이 비어 있습니다. 먼저 인덱스를 생성하세요.")
+
+    return {
+        "query_set": args.queries.stem,
+        "corpus": FIXTURE_CORPUS.stem if args.fixture else None,
+        "k": args.k,
+        "repeat": args.repeat,
+        "index": {
+            # 고정 말뭉치의 임시 경로는 측정 후 지우므로 기록하지 않음
+            "persist_dir": None if args.fixture else service.persist_dir,
+            "collection": service.collection_name,
+            "documents": service.collection.count(),
+            "embedding_model": service.embedding_model,
+            "search_mode": args.search_mode,
+            "quantization": args.quantization,
+        },
+        **run_benchmark(service, queries, args.k, args.repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 지연 시간/품질 벤치마크")
+    parser.add_argument(
+        "--queries",
+        type=Path,
+        default=None,
+        help="쿼리 세트 경로 (기본: v1.jsonl, --fixture면 fixture_v1.jsonl)",
+    )
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument(
+        "--fixture",
+        action="store_true",
+        help="고정 말뭉치로 임시 컬렉션을 만들어 id 라벨 쿼리 세트로 측정",
+    )
+    parser.add_argument("-k", type=int, default=5, help="쿼리당 결과 수")
+    parser.add_argument("--repeat", type=int, default=3, help="쿼리 세트 반복 횟수")
+    parser.add_argument("--search-mode", choices=SEARCH_MODES, default="vector")
+    parser.add_argument("--quantization", choices=SUPPORTED_DTYPES, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.queries is None:
+        args.queries = FIXTURE_QUERY_SET if args.fixture else DEFAULT_QUERY_SET
+
+    if args.fixture:
+        # 고정 말뭉치 컬렉션은 측정이 끝나면 지움
+        with tempfile.TemporaryDirectory(prefix="retrieval_bench_") as persist_dir:
+            report = build_report(args, persist_dir)
+    else:
+        report = build_report(args, args.persist_dir)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
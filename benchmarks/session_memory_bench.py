@@ -0,0 +1,216 @@
+"""
+세션 검색 기억 벤치마크
+
+한 라운드(기본 10턴) 동안 이어지는 사용자 메시지를 흉내 내어, 라운드마다
+RAG 컨텍스트로 넣는 토큰 수를 기억 없이(매 턴 같은 예시를 다시 넣음) 보낸 경우와
+retrieval_memory의 반복 예시 처리 모드(skip, reference, replace)별로 비교합니다.
+
+라운드는 인덱싱된 대화 하나에서 연속된 발화를 사용자 메시지로 삼아 만듭니다.
+같은 화제가 이어지므로 실제 게임처럼 같은 말뭉치 대화가 반복해서 검색됩니다.
+메시지를 뽑은 출처 대화는 매 턴 거의 그대로 일치하는 결과가 되어 반복률과 절감량을
+부풀리므로, 라운드를 도는 동안 검색 결과에서 출처 대화(모든 청크)를 뺍니다.
+그래도 메시지가 검색 대상과 같은 말뭉치에서 나오므로 실제 사용자 메시지보다
+반복이 많을 수 있습니다.
+시스템 프롬프트의 나머지 부분은 모든 방식이 같으므로 컨텍스트 토큰 차이가
+라운드당 프롬프트 토큰 차이입니다.
+
+토큰이 기억 없음보다 줄지 않는 모드는 표시하고, 기본 모드(RAG_REPEAT_MODE)가
+토큰을 줄이지 못하면 실패(종료 코드 1)로 처리합니다.
+
+실행 (먼저 python -m services.chroma_service 로 인덱스 생성):
+    python -m benchmarks.session_memory_bench [--rounds 30] [--turns 10]
+"""
+
+import argparse
+import random
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from config.settings import RAG_REPEAT_MODE
+from services.chroma_service import ChromaService
+from services.rag_service import RAGService
+from services.retrieval_memory import REPEAT_MODES, RetrievalMemory
+from services.vector_store import ChromaVectorStore, VectorStore
+
+
+def parent_id(doc_id: str, metadata: Optional[Dict]) -> str:
+    """문서의 원본 대화 ID (청크면 parent_id)"""
+    return (metadata or {}).get("parent_id") or doc_id
+
+
+class HeldOutVectorStore(VectorStore):
+    """검색 결과에서 지정한 출처 대화를 빼는 벡터 저장소 래퍼"""
+
+    def __init__(self, store: VectorStore):
+        self.store = store
+        self.excluded: Optional[str] = None
+        self.chunk_count = 1
+
+    def hold_out(self, source: Optional[str], chunk_count: int = 1) -> None:
+        """이후 검색에서 뺄 출처 대화를 정합니다. (None이면 빼지 않음)"""
+        self.excluded = source
+        self.chunk_count = chunk_count
+
+    def add(
+        self,
+        conversations: Iterable[Dict],
+        batch_size: int = 100,
+        extra_metadata: Optional[Dict] = None,
+    ) -> int:
+        return self.store.add(conversations, batch_size, extra_metadata)
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        n_results: int = 5,
+        filters: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> List[Dict]:
+        if self.excluded is None:
+            return self.store.search_batch(queries, n_results=n_results, filters=filters)
+
+        # 출처 대화의 청크 수만큼 더 가져와 빼고 n_results개로 자름
+        results = self.store.search_batch(
+            queries, n_results=n_results + self.chunk_count, filters=filters
+        )
+        held_out = []
+        for result in results:
+            keys = [key for key in ("ids", "documents", "metadatas", "distances") if result.get(key)]
+            rows = [
+                j
+                for j, (doc_id, metadata) in enumerate(zip(result["ids"][0], result["metadatas"][0]))
+                if parent_id(doc_id, metadata) != self.excluded
+            ][:n_results]
+            held_out.append(
+                {key: [[result[key][0][j] for j in rows]] if key in keys else None for key in result}
+            )
+        return held_out
+
+    def count(self, limit: Optional[int] = None, **filters) -> Optional[int]:
+        return self.store.count(limit=limit, **filters)
+
+    def stats(self) -> Dict:
+        return self.store.stats()
+
+
+def sample_rounds(
+    service: ChromaService, rounds: int, turns: int, seed: int = 42
+) -> List[Dict]:
+    """
+    인덱싱된 대화의 연속된 발화로 라운드를 만듭니다.
+
+    Returns:
+        라운드 목록 ({"source": 출처 대화 ID, "chunks": 출처 대화 청크 수,
+        "messages": 사용자 메시지 목록})
+    """
+    page = service.collection.get(
+        limit=max(rounds * 20, 1000), include=["documents", "metadatas"]
+    )
+    rng = random.Random(seed)
+
+    dialogues = [
+        (
+            parent_id(doc_id, metadata),
+            (metadata or {}).get("chunk_count", 1),
+            [line for line in doc.split("\n") if line.strip()],
+        )
+        for doc_id, doc, metadata in zip(page["ids"], page["documents"], page["metadatas"])
+    ]
+    dialogues = [dialogue for dialogue in dialogues if len(dialogue[2]) >= 2]
+    if not dialogues:
+        return []
+
+    sampled = []
+    for _ in range(rounds):
+        source, chunks, lines = rng.choice(dialogues)
+        start = rng.randrange(max(1, len(lines) - turns + 1))
+        messages = lines[start : start + turns]
+        # 대화가 짧으면 발화를 반복해 턴 수를 맞춤 (같은 화제가 이어지는 경우)
+        while len(messages) < turns:
+            messages.append(rng.choice(lines))
+        sampled.append({"source": source, "chunks": chunks, "messages": messages})
+    return sampled
+
+
+def run_round(
+    rag: RAGService, messages: List[str], memory: Optional[RetrievalMemory]
+) -> Dict:
+    """라운드 하나의 메시지를 차례로 보내고 컨텍스트 통계를 합산합니다."""
+    totals = {"tokens": 0, "examples": 0, "repeats": 0, "skipped": 0, "distinct": set()}
+    for message in messages:
+        report = rag.build_context(message, memory=memory)
+        totals["tokens"] += report["tokens"]
+        totals["examples"] += report["examples"]
+        totals["repeats"] += report["repeats"]
+        totals["skipped"] += report["repeats_skipped"]
+        totals["distinct"].update(report["ids"])
+    totals["distinct"] = len(totals["distinct"])
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 검색 기억 벤치마크")
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument("--rounds", type=int, default=30, help="라운드 수")
+    parser.add_argument("--turns", type=int, default=10, help="라운드당 사용자 메시지 수")
+    args = parser.parse_args()
+
+    service = ChromaService(persist_dir=args.persist_dir)
+    if service.collection.count() == 0:
+        raise SystemExit("컬렉션이 비어 있습니다. 먼저 인덱스를 생성하세요.")
+
+    rounds = sample_rounds(service, args.rounds, args.turns)
+    if not rounds:
+        raise SystemExit("발화가 두 개 이상인 문서가 없습니다.")
+
+    store = HeldOutVectorStore(ChromaVectorStore(service))
+    rag = RAGService(vector_store=store)
+
+    print(f"문서 수: {service.collection.count()}, 라운드: {len(rounds)}, 라운드당 턴: {args.turns}")
+    print(
+        "주의: 메시지는 검색 대상 컬렉션의 대화에서 뽑았습니다. 출처 대화는 검색에서 뺐지만 "
+        "실제 사용자 메시지보다 반복이 많을 수 있습니다."
+    )
+    print()
+    print(
+        f"{'mode':<16}{'tokens/round':>14}{'examples':>10}{'repeats':>10}"
+        f"{'skipped':>10}{'distinct':>10}"
+    )
+
+    results = {}
+    memories = {"no memory": lambda: None}
+    for mode in REPEAT_MODES:
+        memories[mode] = lambda mode=mode: RetrievalMemory(mode=mode)
+    for mode, new_memory in memories.items():
+        per_round = []
+        for sampled in rounds:
+            store.hold_out(sampled["source"], sampled["chunks"])
+            per_round.append(run_round(rag, sampled["messages"], new_memory()))
+        summary = {
+            key: sum(r[key] for r in per_round) / len(per_round)
+            for key in ("tokens", "examples", "repeats", "skipped", "distinct")
+        }
+        results[mode] = summary
+        print(
+            f"{mode:<16}{summary['tokens']:>14.1f}{summary['examples']:>10.1f}"
+            f"{summary['repeats']:>10.1f}{summary['skipped']:>10.1f}{summary['distinct']:>10.1f}"
+        )
+
+    baseline = results["no memory"]["tokens"]
+    if not baseline:
+        raise SystemExit("기억 없이도 주입한 컨텍스트가 없어 비교할 수 없습니다.")
+
+    print()
+    failed = []
+    for mode in REPEAT_MODES:
+        saved = baseline - results[mode]["tokens"]
+        flag = "" if saved > 0 else "  (토큰이 줄지 않음)"
+        default = " [기본]" if mode == RAG_REPEAT_MODE else ""
+        print(f"{mode}{default}: 라운드당 컨텍스트 토큰 {saved:.1f} 감소 ({saved / baseline:.1%}){flag}")
+        if saved <= 0 and mode == RAG_REPEAT_MODE:
+            failed.append(mode)
+
+    if failed:
+        raise SystemExit(f"기본 모드가 토큰을 줄이지 못했습니다: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,3 +6,23 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 CHAT_MODEL = "gpt-4.1-mini"
 ANALYSIS_MODEL = "gpt-5-nano"
+
+# RAG 로딩이 끝나지 않았을 때 응답 전에 기다릴 최대 시간 (초, 넘으면 검색 없이 응답)
+RAG_WAIT_TIMEOUT = 3.0
+
+# 검색 벡터 저장소 백엔드 (chroma: ChromaDB HNSW, numpy: 메모리 행렬 전수 검색)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+
+# RAG 컨텍스트 조립 (시스템 프롬프트에 넣는 과거 대화 예시)
+RAG_CONTEXT_TOKEN_BUDGET = 600  # 예시 전체 최대 토큰 수
+RAG_MAX_DISTANCE = 0.6  # 코사인 거리가 이보다 먼 예시는 버림
+RAG_MAX_TURNS_PER_EXAMPLE = 8  # 예시당 남길 최대 발화 수 (쿼리와 관련 있는 발화 중심)
+
+# RAG 주입 정책 (가장 가까운 예시가 RAG_MAX_DISTANCE보다 멀면 주입하지 않음)
+RAG_DISTANCE_MARGIN = 0.1  # 가장 가까운 거리 + 이 값 안의 예시만 주입
+RAG_MIN_RESULTS = 1  # 주입할 때 최소 예시 수
+RAG_MAX_RESULTS = 5  # 검색할 후보 수 (최대 예시 수)
+# 같은 라운드에서 다시 검색된 예시 처리
+# (skip: 다시 넣지 않음, reference: 한 발화짜리 참조로 넣음, replace: 다음으로 가까운 새 예시로 대체)
+RAG_REPEAT_MODE = "skip"
+RAG_REPEAT_TURNS = 1  # reference 모드에서 참조에 남길 발화 수
@@ -0,0 +1,96 @@
+"""
+대화 청킹 모듈
+
+긴 대화를 하나의 문서로 임베딩하면 문장 임베딩 모델의 입력 길이 제한에 걸려
+뒷부분이 잘리고, RAG 컨텍스트도 지나치게 길어집니다.
+대화의 turns를 일정 크기의 겹치는 윈도우로 나누어 검색 단위로 사용합니다.
+
+각 청크는 원본 대화와 같은 필드를 가지며 다음 필드가 추가됩니다.
+- chunk_id: "{conversation_id}#c{chunk_index}" 형태의 안정적인 ID
+- parent_id: 원본 대화의 conversation_id
+- chunk_index / chunk_count: 청크 순번과 전체 청크 수
+- turn_start / turn_end: 원본 turns에서의 범위 [turn_start, turn_end)
+"""
+
+from typing import Dict, Iterable, Iterator, List
+
+# 기본 윈도우 크기 (턴 수)와 인접 윈도우 간 겹치는 턴 수
+DEFAULT_WINDOW_SIZE = 8
+DEFAULT_OVERLAP = 2
+
+
+def window_starts(turn_count: int, window_size: int, overlap: int) -> List[int]:
+    """
+    윈도우 시작 위치 목록을 반환합니다.
+
+    마지막 윈도우도 가능한 한 window_size 턴을 채우도록 끝에 맞춥니다.
+    """
+    if turn_count <= window_size:
+        return [0]
+
+    step = window_size - overlap
+    starts = list(range(0, turn_count - window_size + 1, step))
+    if starts[-1] + window_size < turn_count:
+        starts.append(turn_count - window_size)
+    return starts
+
+
+def chunk_id(conversation_id: str, chunk_index: int) -> str:
+    """청크 ID를 생성합니다."""
+    return f"{conversation_id}#c{chunk_index}"
+
+
+def chunk_conversation(
+    conv: Dict,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> List[Dict]:
+    """
+    대화 하나를 턴 윈도우 청크로 나눕니다.
+
+    Args:
+        conv: 정제된 대화 (data_preprocessor 출력 형식)
+        window_size: 청크당 턴 수
+        overlap: 인접 청크 간 겹치는 턴 수
+
+    Returns:
+        청크 리스트 (짧은 대화는 청크 하나)
+    """
+    if window_size <= 0:
+        raise ValueError(f"window_size must be positive: {window_size}")
+    if not 0 <= overlap < window_size:
+        raise ValueError(f"overlap must be in [0, window_size): {overlap}")
+
+    turns = conv.get("turns", [])
+    conversation_id = conv.get("conversation_id", "")
+    starts = window_starts(len(turns), window_size, overlap)
+
+    chunks = []
+    for index, start in enumerate(starts):
+        window = turns[start : start + window_size]
+        chunk = {key: value for key, value in conv.items() if key not in ("turns", "dialogue")}
+        chunk.update(
+            {
+                "chunk_id": chunk_id(conversation_id, index),
+                "parent_id": conversation_id,
+                "chunk_index": index,
+                "chunk_count": len(starts),
+                "turn_start": start,
+                "turn_end": start + len(window),
+                "dialogue": "\n".join(turn["text"] for turn in window),
+                "turns": window,
+            }
+        )
+        chunks.append(chunk)
+
+    return chunks
+
+
+def iter_chunks(
+    conversations: Iterable[Dict],
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> Iterator[Dict]:
+    """대화 스트림을 청크 스트림으로 변환합니다."""
+    for conv in conversations:
+        yield from chunk_conversation(conv, window_size, overlap)
@@ -0,0 +1,321 @@
+"""
+컬럼 기반 코퍼스 저장소 모듈
+
+정제된 코퍼스를 dict 리스트로 다루면 대화마다, 턴마다 파이썬 객체가 생겨
+메모리 대부분이 객체 오버헤드로 쓰입니다. 이 모듈은 코퍼스를 컬럼 단위
+바이너리 파일로 저장하고, 읽을 때는 읽기 전용 mmap으로 열어 필요한
+대화만 그때그때 dict로 만들어 반환합니다.
+
+디렉토리 구성:
+- meta.json: 버전, 바이트 순서, 개수, 코드 -> 문자열 사전(vocab)
+- turn_text.bin / turn_text_offsets.bin: 턴 텍스트(UTF-8 연결)와 오프셋
+- turn_{speaker_id,speaker_sex,speaker_age,speech_act}.bin: 턴별 코드 배열
+- conv_turn_offsets.bin: 대화별 턴 범위 오프셋
+- conv_id.bin / conv_id_offsets.bin: 대화 ID(UTF-8 연결)와 오프셋
+- conv_{platform,subject,speaker_type,source_file}.bin: 대화별 코드 배열
+
+ColumnarCorpus는 len(), 인덱싱, 순회를 지원하므로
+대화 dict 리스트 대신 그대로 사용할 수 있습니다.
+"""
+
+import json
+import mmap
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+COLUMNAR_VERSION = 1
+META_FILENAME = "meta.json"
+
+# 턴 단위 코드 컬럼: (필드 이름, array 타입 코드)
+TURN_CODE_COLUMNS = [
+    ("speaker_id", "I"),
+    ("speaker_sex", "H"),
+    ("speaker_age", "H"),
+    ("speech_act", "H"),
+]
+
+# 대화 단위 코드 컬럼
+CONV_CODE_COLUMNS = [
+    ("platform", "H"),
+    ("subject", "I"),
+    ("speaker_type", "H"),
+    ("source_file", "I"),
+]
+
+# 쓰기 시 메모리에 모았다가 한 번에 기록할 대화 수
+_FLUSH_EVERY = 1024
+
+
+def is_columnar(path: str) -> bool:
+    """경로가 컬럼 저장소 디렉토리인지 확인합니다."""
+    return (Path(path) / META_FILENAME).exists()
+
+
+class _Vocab:
+    """문자열 <-> 정수 코드 사전"""
+
+    def __init__(self, typecode: str):
+        self.typecode = typecode
+        self.limit = 1 << (8 * array(typecode).itemsize)
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            if code >= self.limit:
+                raise OverflowError(f"too many distinct values for typecode {self.typecode}")
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class _ColumnWriter:
+    """array 버퍼를 모았다가 파일에 덧붙이는 컬럼 기록기"""
+
+    def __init__(self, path: Path, typecode: str):
+        self.f = open(path, "wb")
+        self.buffer = array(typecode)
+
+    def flush(self) -> None:
+        self.buffer.tofile(self.f)
+        del self.buffer[:]
+
+    def close(self) -> None:
+        self.flush()
+        self.f.close()
+
+
+def write_columnar(conversations: Iterable[Dict], output_dir: str) -> int:
+    """
+    대화를 컬럼 저장소 형식으로 스트리밍 저장합니다.
+
+    Args:
+        conversations: 대화 이터러블 (data_preprocessor 출력 형식)
+        output_dir: 저장할 디렉토리 경로
+
+    Returns:
+        저장된 대화 수
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    vocabs = {name: _Vocab(code) for name, code in TURN_CODE_COLUMNS + CONV_CODE_COLUMNS}
+    turn_columns = {
+        name: _ColumnWriter(out / f"turn_{name}.bin", code) for name, code in TURN_CODE_COLUMNS
+    }
+    conv_columns = {
+        name: _ColumnWriter(out / f"conv_{name}.bin", code) for name, code in CONV_CODE_COLUMNS
+    }
+    turn_text_offsets = _ColumnWriter(out / "turn_text_offsets.bin", "Q")
+    conv_turn_offsets = _ColumnWriter(out / "conv_turn_offsets.bin", "Q")
+    conv_id_offsets = _ColumnWriter(out / "conv_id_offsets.bin", "Q")
+    writers = (
+        list(turn_columns.values())
+        + list(conv_columns.values())
+        + [turn_text_offsets, conv_turn_offsets, conv_id_offsets]
+    )
+
+    text_offset = 0
+    turn_count = 0
+    id_offset = 0
+    conv_count = 0
+
+    turn_text_offsets.buffer.append(0)
+    conv_turn_offsets.buffer.append(0)
+    conv_id_offsets.buffer.append(0)
+
+    with open(out / "turn_text.bin", "wb") as text_f, open(out / "conv_id.bin", "wb") as id_f:
+        for conv in conversations:
+            for turn in conv.get("turns", []):
+                encoded = turn.get("text", "").encode("utf-8")
+                text_f.write(encoded)
+                text_offset += len(encoded)
+                turn_text_offsets.buffer.append(text_offset)
+                for name, column in turn_columns.items():
+                    column.buffer.append(vocabs[name].encode(turn.get(name, "")))
+                turn_count += 1
+            conv_turn_offsets.buffer.append(turn_count)
+
+            encoded_id = conv.get("conversation_id", "").encode("utf-8")
+            id_f.write(encoded_id)
+            id_offset += len(encoded_id)
+            conv_id_offsets.buffer.append(id_offset)
+
+            for name, column in conv_columns.items():
+                column.buffer.append(vocabs[name].encode(conv.get(name, "")))
+
+            conv_count += 1
+            if conv_count % _FLUSH_EVERY == 0:
+                for writer in writers:
+                    writer.flush()
+
+    for writer in writers:
+        writer.close()
+
+    meta = {
+        "version": COLUMNAR_VERSION,
+        "byteorder": sys.byteorder,
+        "conversations": conv_count,
+        "turns": turn_count,
+        "vocab": {name: vocab.values for name, vocab in vocabs.items()},
+    }
+    with open(out / META_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    return conv_count
+
+
+class ColumnarCorpus:
+    """읽기 전용 mmap으로 연 컬럼 저장소 (대화 dict 리스트 대용)"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: write_columnar()로 저장한 디렉토리 경로
+        """
+        self.path = Path(path)
+        with open(self.path / META_FILENAME, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        if self.meta.get("version") != COLUMNAR_VERSION:
+            raise ValueError(f"Unsupported columnar version: {self.meta.get('version')}")
+        if self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Columnar store byte order mismatch: {self.meta.get('byteorder')}")
+
+        self.vocab = self.meta["vocab"]
+        self._maps: List[mmap.mmap] = []
+
+        self._turn_text = self._open("turn_text.bin", "B")
+        self._turn_text_offsets = self._open("turn_text_offsets.bin", "Q")
+        self._conv_turn_offsets = self._open("conv_turn_offsets.bin", "Q")
+        self._conv_id = self._open("conv_id.bin", "B")
+        self._conv_id_offsets = self._open("conv_id_offsets.bin", "Q")
+        self._turn_codes = {
+            name: self._open(f"turn_{name}.bin", code) for name, code in TURN_CODE_COLUMNS
+        }
+        self._conv_codes = {
+            name: self._open(f"conv_{name}.bin", code) for name, code in CONV_CODE_COLUMNS
+        }
+
+    def _open(self, filename: str, typecode: str):
+        """컬럼 파일을 mmap으로 열어 타입이 지정된 memoryview를 반환합니다."""
+        with open(self.path / filename, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 빈 파일은 mmap할 수 없음
+                return memoryview(array(typecode))
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def close(self) -> None:
+        """mmap을 닫습니다."""
+        views = [
+            self._turn_text,
+            self._turn_text_offsets,
+            self._conv_turn_offsets,
+            self._conv_id,
+            self._conv_id_offsets,
+            *self._turn_codes.values(),
+            *self._conv_codes.values(),
+        ]
+        for view in views:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self) -> "ColumnarCorpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.meta["conversations"]
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("conversation index out of range")
+        return index
+
+    def _turn_range(self, index: int) -> range:
+        return range(self._conv_turn_offsets[index], self._conv_turn_offsets[index + 1])
+
+    def _turn_text_at(self, turn: int) -> str:
+        start = self._turn_text_offsets[turn]
+        end = self._turn_text_offsets[turn + 1]
+        return str(self._turn_text[start:end], "utf-8")
+
+    def conversation_id(self, index: int) -> str:
+        """대화 ID를 반환합니다."""
+        index = self._index(index)
+        start = self._conv_id_offsets[index]
+        end = self._conv_id_offsets[index + 1]
+        return str(self._conv_id[start:end], "utf-8")
+
+    def field(self, index: int, name: str) -> str:
+        """대화 단위 코드 컬럼(platform, subject 등)의 값을 반환합니다."""
+        index = self._index(index)
+        return self.vocab[name][self._conv_codes[name][index]]
+
+    def turn_count(self, index: int) -> int:
+        """대화의 턴 수를 반환합니다."""
+        index = self._index(index)
+        return len(self._turn_range(index))
+
+    def turn_texts(self, index: int) -> List[str]:
+        """대화의 턴 텍스트 목록을 반환합니다."""
+        index = self._index(index)
+        return [self._turn_text_at(turn) for turn in self._turn_range(index)]
+
+    def dialogue(self, index: int) -> str:
+        """대화 전체 텍스트를 반환합니다. (턴 텍스트를 줄바꿈으로 연결)"""
+        return "\n".join(self.turn_texts(index))
+
+    def turns(self, index: int) -> List[Dict]:
+        """대화의 턴 dict 목록을 반환합니다."""
+        index = self._index(index)
+        vocab = self.vocab
+        codes = self._turn_codes
+
+        # data_preprocessor 출력과 같은 키 순서로 생성
+        return [
+            {
+                "speaker_id": vocab["speaker_id"][codes["speaker_id"][turn]],
+                "speaker_sex": vocab["speaker_sex"][codes["speaker_sex"][turn]],
+                "speaker_age": vocab["speaker_age"][codes["speaker_age"][turn]],
+                "text": self._turn_text_at(turn),
+                "speech_act": vocab["speech_act"][codes["speech_act"][turn]],
+            }
+            for turn in self._turn_range(index)
+        ]
+
+    def __getitem__(self, index: int) -> Dict:
+        index = self._index(index)
+        turns = self.turns(index)
+        return {
+            "conversation_id": self.conversation_id(index),
+            "platform": self.field(index, "platform"),
+            "subject": self.field(index, "subject"),
+            "speaker_type": self.field(index, "speaker_type"),
+            "dialogue": "\n".join(turn["text"] for turn in turns),
+            "turns": turns,
+            "source_file": self.field(index, "source_file"),
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+def iter_columnar(path: str) -> Iterator[Dict]:
+    """컬럼 저장소의 대화를 한 건씩 읽고, 다 읽으면 mmap을 닫습니다."""
+    with ColumnarCorpus(path) as corpus:
+        yield from corpus
@@ -0,0 +1,87 @@
+"""
+정제된 코퍼스 입출력 모듈
+
+전처리 결과를 JSONL(한 줄에 대화 하나) 형식으로 스트리밍 저장하고,
+인덱서가 파일 전체를 메모리에 올리지 않고 한 건씩 읽을 수 있도록 합니다.
+기존 JSON 배열(.json) 파일, 컬럼 저장소(.columnar 디렉토리),
+샤드 디렉토리(.shards)도 같은 인터페이스로 읽을 수 있습니다.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+from preprocess.columnar_store import is_columnar, iter_columnar
+from preprocess.shards import is_sharded, iter_sharded
+
+
+def write_jsonl(conversations: Iterable[Dict], output_path: str) -> int:
+    """
+    대화를 JSONL 파일로 한 건씩 저장합니다.
+
+    Args:
+        conversations: 대화 이터러블 (제너레이터도 가능)
+        output_path: 저장할 파일 경로
+
+    Returns:
+        저장된 대화 수
+    """
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    with open(output, "w", encoding="utf-8") as f:
+        for conv in conversations:
+            f.write(json.dumps(conv, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+
+    return count
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """JSONL 파일에서 대화를 한 건씩 읽습니다."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_processed_data(path: str) -> Iterator[Dict]:
+    """
+    정제된 코퍼스를 형식에 맞게 한 건씩 읽습니다.
+
+    - .jsonl: 한 줄씩 스트리밍
+    - 컬럼 저장소 디렉토리: mmap으로 열어 한 건씩 복원
+    - 샤드 디렉토리: 샤드 매니페스트 순서대로 스트리밍
+    - .json: 기존 JSON 배열 (파일 전체를 로드)
+    """
+    if Path(path).suffix == ".jsonl":
+        yield from iter_jsonl(path)
+        return
+
+    if is_columnar(path):
+        yield from iter_columnar(path)
+        return
+
+    if is_sharded(path):
+        yield from iter_sharded(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        conversations = json.load(f)
+    yield from conversations
+
+
+def replace_output(tmp_path: str, output_path: str) -> None:
+    """
+    임시로 기록한 출력을 최종 경로로 교체합니다.
+    컬럼 저장소처럼 디렉토리인 경우 기존 디렉토리를 지운 뒤 교체합니다.
+    """
+    output = Path(output_path)
+    if Path(tmp_path).is_dir() and output.exists():
+        shutil.rmtree(output)
+    os.replace(tmp_path, output)
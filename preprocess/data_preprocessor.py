@@ -17,11 +17,27 @@
 - 19: 방송/연예
 """
 
+import argparse
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from preprocess.columnar_store import write_columnar
+from preprocess.corpus_io import iter_processed_data, replace_output, write_jsonl
+from preprocess.dedup import NearDuplicateFilter
+from preprocess.json_stream import iter_array_items
+from preprocess.manifest import (
+    MANIFEST_VERSION,
+    diff_sources,
+    file_fingerprint,
+    load_manifest,
+    save_manifest,
+)
+from preprocess.shards import ShardWriter
+from preprocess.noise_filter import NoiseFilter
 
 
 # 제외할 카테고리 번호 (파일명에서 추출)
@@ -48,6 +64,12 @@ CHAT_NOISE_PATTERNS = [
     r"\s*\.\.\.+\s*",  # ...
 ]
 
+# 노이즈 패턴 테이블을 하나의 정규식으로 컴파일한 필터
+NOISE_FILTER = NoiseFilter(CHAT_NOISE_PATTERNS)
+
+# 이 크기 이상의 원본 파일은 json.load 대신 점진적으로 파싱
+STREAMING_THRESHOLD_BYTES = 32 * 1024 * 1024
+
 
 def get_category_from_filename(filename: str) -> Optional[int]:
     """
@@ -76,24 +98,109 @@ def should_exclude_file(filename: str) -> bool:
 def clean_text(text: str) -> str:
     """
     채팅 텍스트에서 불필요한 표현을 제거합니다.
+
+    노이즈 제거, 연속 공백 정리, 앞뒤 공백 제거를 한 번의 스캔으로 처리합니다.
+    """
+    return NOISE_FILTER.clean(text)
+
+
+def clean_texts(texts: Iterable[str]) -> List[str]:
+    """
+    여러 채팅 텍스트를 한 번에 정제합니다. (clean_text의 배치 버전)
+    """
+    return NOISE_FILTER.clean_batch(texts)
+
+
+def build_conversation(info: Dict, platform: str, filename: str) -> Optional[Dict]:
+    """
+    info 항목 하나를 정제된 대화로 변환합니다.
+
+    Returns:
+        대화 딕셔너리. 유효한 발화가 없으면 None
+    """
+    annotations = info.get("annotations", {})
+    lines = annotations.get("lines", [])
+
+    if not lines:
+        return None
+
+    # 메타데이터 추출
+    subject = annotations.get("subject", "")
+    speaker_type = annotations.get("speaker_type", "")
+
+    # 대화 턴 처리
+    turns = []
+    cleaned_dialogue_parts = []
+
+    # 텍스트 정제 (대화 단위로 배치 처리)
+    lines = [line for line in lines if line.get("norm_text", "")]
+    cleaned_texts = clean_texts(line["norm_text"] for line in lines)
+
+    for line, cleaned_text in zip(lines, cleaned_texts):
+        if not cleaned_text:
+            continue
+
+        speaker = line.get("speaker", {})
+        speech_act = line.get("speechAct", "")
+
+        turn = {
+            "speaker_id": speaker.get("id", ""),
+            "speaker_sex": speaker.get("sex", ""),
+            "speaker_age": speaker.get("age", ""),
+            "text": cleaned_text,
+            "speech_act": speech_act,
+        }
+        turns.append(turn)
+        cleaned_dialogue_parts.append(cleaned_text)
+
+    if not turns:
+        return None
+
+    # 전체 대화 텍스트 생성
+    dialogue = "\n".join(cleaned_dialogue_parts)
+
+    return {
+        "conversation_id": f"{platform}_{info.get('id', '')}",
+        "platform": platform,
+        "subject": subject,
+        "speaker_type": speaker_type,
+        "dialogue": dialogue,
+        "turns": turns,
+        "source_file": filename,
+    }
+
+
+def iter_conversations_from_file(file_path: Path) -> Iterator[Dict]:
     """
-    cleaned = text
-    for pattern in CHAT_NOISE_PATTERNS:
-        cleaned = re.sub(pattern, " ", cleaned)
+    JSON 파일을 점진적으로 파싱하면서 대화를 한 건씩 반환합니다.
 
-    # 연속된 공백을 하나로 줄임
-    cleaned = re.sub(r"\s+", " ", cleaned)
+    info 배열의 원소를 하나씩 디코딩하므로 메모리 사용량이
+    파일 크기가 아니라 대화 하나의 크기에 비례합니다.
 
-    # 앞뒤 공백 제거
-    cleaned = cleaned.strip()
+    Raises:
+        json.JSONDecodeError, UnicodeDecodeError: 파일 형식이 잘못된 경우
+    """
+    filename = file_path.name
+    platform = filename.split("_")[0]
 
-    return cleaned
+    with open(file_path, "r", encoding="utf-8") as f:
+        for info in iter_array_items(f, key="info"):
+            conversation = build_conversation(info, platform, filename)
+            if conversation is not None:
+                yield conversation
 
 
-def extract_conversation_from_file(file_path: Path) -> List[Dict]:
+def extract_conversation_from_file(
+    file_path: Path, streaming: Optional[bool] = None
+) -> List[Dict]:
     """
     JSON 파일에서 대화 데이터를 추출합니다.
 
+    Args:
+        file_path: 원본 JSON 파일 경로
+        streaming: True이면 점진적 파싱, False이면 json.load 사용.
+            None이면 파일 크기가 STREAMING_THRESHOLD_BYTES 이상일 때 점진적 파싱
+
     Returns:
         대화 청크 리스트. 각 청크는 다음 필드를 포함:
         - conversation_id: 대화 식별자
@@ -103,6 +210,13 @@ def extract_conversation_from_file(file_path: Path) -> List[Dict]:
         - dialogue: 정제된 대화 텍스트
         - turns: 개별 발화 리스트
     """
+    if streaming is None:
+        streaming = file_path.stat().st_size >= STREAMING_THRESHOLD_BYTES
+
+    if streaming:
+        # 프로세스 풀에서 결과를 넘기려면 리스트가 필요 (직렬 처리는 iter_file_conversations 사용)
+        return list(iter_file_conversations(file_path, streaming=True))
+
     conversations = []
 
     try:
@@ -117,77 +231,66 @@ def extract_conversation_from_file(file_path: Path) -> List[Dict]:
     platform = filename.split("_")[0]
 
     # info 배열 처리
-    info_list = data.get("info", [])
-    for info in info_list:
-        annotations = info.get("annotations", {})
-        lines = annotations.get("lines", [])
-
-        if not lines:
-            continue
-
-        # 메타데이터 추출
-        subject = annotations.get("subject", "")
-        speaker_type = annotations.get("speaker_type", "")
+    for info in data.get("info", []):
+        conversation = build_conversation(info, platform, filename)
+        if conversation is not None:
+            conversations.append(conversation)
 
-        # 대화 턴 처리
-        turns = []
-        cleaned_dialogue_parts = []
+    return conversations
 
-        for line in lines:
-            norm_text = line.get("norm_text", "")
-            if not norm_text:
-                continue
 
-            # 텍스트 정제
-            cleaned_text = clean_text(norm_text)
-            if not cleaned_text:
-                continue
+def iter_file_conversations(
+    file_path: Path, streaming: Optional[bool] = None
+) -> Iterator[Dict]:
+    """
+    JSON 파일에서 대화를 한 건씩 추출합니다.
 
-            speaker = line.get("speaker", {})
-            speech_act = line.get("speechAct", "")
+    점진적 파싱 대상 파일은 대화를 읽는 대로 내보내므로 메모리 사용량이
+    파일이 아니라 대화 하나의 크기에 비례합니다. 점진적 파싱 도중 형식 오류가
+    나면 오류 앞까지 읽은 대화만 반환됩니다.
 
-            turn = {
-                "speaker_id": speaker.get("id", ""),
-                "speaker_sex": speaker.get("sex", ""),
-                "speaker_age": speaker.get("age", ""),
-                "text": cleaned_text,
-                "speech_act": speech_act,
-            }
-            turns.append(turn)
-            cleaned_dialogue_parts.append(cleaned_text)
+    Args:
+        file_path: 원본 JSON 파일 경로
+        streaming: extract_conversation_from_file과 같음
+    """
+    if streaming is None:
+        streaming = file_path.stat().st_size >= STREAMING_THRESHOLD_BYTES
 
-        if not turns:
-            continue
+    if not streaming:
+        yield from extract_conversation_from_file(file_path, streaming=False)
+        return
 
-        # 전체 대화 텍스트 생성
-        dialogue = "\n".join(cleaned_dialogue_parts)
-
-        conversation = {
-            "conversation_id": f"{platform}_{info.get('id', '')}",
-            "platform": platform,
-            "subject": subject,
-            "speaker_type": speaker_type,
-            "dialogue": dialogue,
-            "turns": turns,
-            "source_file": filename,
-        }
-        conversations.append(conversation)
+    try:
+        yield from iter_conversations_from_file(file_path)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"Error reading {file_path}: {e}")
 
-    return conversations
 
+def _extract_files(json_files: List[Path], workers: int = 1) -> Iterator[Iterable[Dict]]:
+    """
+    파일 목록에서 대화를 추출하여 입력 순서대로 반환합니다.
 
-def process_all_data(data_dir: str) -> Tuple[List[Dict], Dict]:
+    직렬 처리에서는 파일마다 대화를 한 건씩 내보내는 이터레이터를 반환하므로
+    다음 파일로 넘어가기 전에 끝까지 소비해야 합니다. workers가 2 이상이면
+    프로세스 풀에 파일을 분배하고 파일별 리스트를 반환하지만,
+    결과는 항상 json_files 순서대로 반환되므로 직렬 실행과 결과가 같습니다.
     """
-    모든 플랫폼의 채팅 데이터를 처리합니다.
+    if workers <= 1 or len(json_files) <= 1:
+        for json_file in json_files:
+            yield iter_file_conversations(json_file)
+        return
 
-    Args:
-        data_dir: 데이터 디렉토리 경로
+    # 파일 수가 많을 때 IPC 오버헤드를 줄이기 위해 묶어서 전달
+    chunksize = max(1, len(json_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            extract_conversation_from_file, json_files, chunksize=chunksize
+        )
 
-    Returns:
-        (처리된 대화 리스트, 통계 정보)
-    """
-    all_conversations = []
-    stats = {
+
+def new_stats() -> Dict:
+    """빈 처리 통계 딕셔너리를 생성합니다."""
+    return {
         "total_files": 0,
         "excluded_files": 0,
         "processed_files": 0,
@@ -195,20 +298,24 @@ def process_all_data(data_dir: str) -> Tuple[List[Dict], Dict]:
         "by_platform": {},
     }
 
-    data_path = Path(data_dir)
 
-    # 모든 플랫폼 폴더 순회
+def _collect_targets(data_path: Path, stats: Dict) -> List[Tuple[str, Path]]:
+    """
+    처리할 (플랫폼 이름, 파일 경로) 목록을 수집하고 파일 수 통계를 기록합니다.
+
+    플랫폼/파일명 순으로 정렬하여 결과 순서를 고정합니다.
+    """
+    targets = []
     for platform_dir in sorted(data_path.iterdir()):
         if not platform_dir.is_dir():
             continue
 
         platform_name = platform_dir.name
         platform_stats = {"total": 0, "excluded": 0, "processed": 0, "conversations": 0}
+        stats["by_platform"][platform_name] = platform_stats
 
         # JSON 파일 순회
-        json_files = list(platform_dir.glob("*.json"))
-
-        for json_file in json_files:
+        for json_file in sorted(platform_dir.glob("*.json")):
             stats["total_files"] += 1
             platform_stats["total"] += 1
 
@@ -218,54 +325,274 @@ def process_all_data(data_dir: str) -> Tuple[List[Dict], Dict]:
                 platform_stats["excluded"] += 1
                 continue
 
-            # 대화 추출
-            conversations = extract_conversation_from_file(json_file)
+            targets.append((platform_name, json_file))
 
-            stats["processed_files"] += 1
-            platform_stats["processed"] += 1
+    return targets
 
-            stats["total_conversations"] += len(conversations)
-            platform_stats["conversations"] += len(conversations)
 
-            all_conversations.extend(conversations)
+def iter_all_conversations(
+    data_dir: str, stats: Optional[Dict] = None, workers: int = 1
+) -> Iterator[Dict]:
+    """
+    모든 플랫폼의 채팅 데이터를 처리하여 대화를 한 건씩 반환합니다.
 
-        stats["by_platform"][platform_name] = platform_stats
+    파일 단위로 추출한 결과를 바로 흘려보내므로 전체 코퍼스를
+    메모리에 모으지 않습니다. stats는 순회가 진행되는 동안 채워집니다.
+
+    Args:
+        data_dir: 데이터 디렉토리 경로
+        stats: 통계를 기록할 딕셔너리 (new_stats()로 생성)
+        workers: 병렬 처리에 사용할 프로세스 수 (1이면 직렬 처리)
+    """
+    if stats is None:
+        stats = new_stats()
+
+    targets = _collect_targets(Path(data_dir), stats)
+
+    # 대화 추출 (결과는 targets 순서대로 병합)
+    json_files = [json_file for _, json_file in targets]
+    results = _extract_files(json_files, workers=workers)
+
+    for (platform_name, _), conversations in zip(targets, results):
+        platform_stats = stats["by_platform"][platform_name]
 
+        stats["processed_files"] += 1
+        platform_stats["processed"] += 1
+
+        for conversation in conversations:
+            stats["total_conversations"] += 1
+            platform_stats["conversations"] += 1
+            yield conversation
+
+
+def process_all_data(data_dir: str, workers: int = 1) -> Tuple[List[Dict], Dict]:
+    """
+    모든 플랫폼의 채팅 데이터를 처리합니다.
+
+    Args:
+        data_dir: 데이터 디렉토리 경로
+        workers: 병렬 처리에 사용할 프로세스 수 (1이면 직렬 처리)
+
+    Returns:
+        (처리된 대화 리스트, 통계 정보)
+    """
+    stats = new_stats()
+    all_conversations = list(iter_all_conversations(data_dir, stats, workers=workers))
     return all_conversations, stats
 
 
-def save_processed_data(conversations: List[Dict], output_path: str) -> None:
+def default_manifest_path(output_path: str) -> Path:
     """
-    처리된 대화 데이터를 JSON 파일로 저장합니다.
+    출력 파일에 대응하는 매니페스트 경로를 반환합니다.
+    형식(확장자)이 다른 출력끼리 매니페스트를 함께 쓰지 않도록 전체 파일 이름을 씁니다.
     """
     output = Path(output_path)
-    output.parent.mkdir(parents=True, exist_ok=True)
+    return output.with_name(f"{output.name}.manifest.json")
+
+
+def process_incremental(
+    data_dir: str,
+    output_path: str,
+    stats: Optional[Dict] = None,
+    workers: int = 1,
+    full: bool = False,
+    manifest_path: Optional[str] = None,
+    dedup_threshold: Optional[float] = None,
+) -> Dict[str, List[str]]:
+    """
+    매니페스트를 기준으로 추가/변경된 파일만 다시 추출하여 출력을 갱신합니다.
 
-    with open(output, "w", encoding="utf-8") as f:
-        json.dump(conversations, f, ensure_ascii=False, indent=2)
+    - 변경 없는 파일: 기존 출력에서 대화를 그대로 복사 (재추출 없음)
+    - 추가/변경된 파일: 다시 추출하여 출력 뒤쪽에 기록
+    - 삭제된 파일(또는 제외 대상이 된 파일): 해당 대화를 출력에서 제거
 
-    print(f"Saved {len(conversations)} conversations to {output}")
+    출력 파일이나 매니페스트가 없거나, 매니페스트가 다른 출력 파일(형식)의 것이거나,
+    full=True이면 전체를 다시 처리합니다.
+    증분 갱신 시 대화 순서는 전체 재처리 결과와 다를 수 있습니다.
+    중복 제거를 켠 경우에는 파일이 하나라도 추가/변경/삭제되면 모든 파일을
+    다시 추출해 전체 재처리와 같은 결과를 만듭니다.
 
+    Args:
+        data_dir: 데이터 디렉토리 경로
+        output_path: 출력 파일 경로 (.jsonl 또는 .json)
+        stats: 통계를 기록할 딕셔너리 (new_stats()로 생성)
+        workers: 병렬 처리에 사용할 프로세스 수
+        full: True이면 매니페스트를 무시하고 전체 재처리
+        manifest_path: 매니페스트 경로 (None이면 출력 파일 옆에 생성)
+        dedup_threshold: 유사 중복 제거 임계값 (None이면 중복 제거 안 함).
+            지난 실행과 값이 다르면 전체를 다시 처리하며, 결과는 stats["dedup"]에 기록
+
+    Returns:
+        변경 내역 {"added": [...], "changed": [...], "unchanged": [...], "deleted": [...]}
+    """
+    if stats is None:
+        stats = new_stats()
+
+    output = Path(output_path)
+    if manifest_path is None:
+        manifest_path = str(default_manifest_path(str(output)))
+
+    manifest = load_manifest(manifest_path)
+    if (
+        full
+        or not output.exists()
+        or manifest.get("output") != output.name
+        or manifest.get("dedup_threshold") != dedup_threshold
+    ):
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+    manifest["output"] = output.name
+    manifest["dedup_threshold"] = dedup_threshold
+    recorded = manifest["files"]
+
+    targets = _collect_targets(Path(data_dir), stats)
+    sources = {f"{platform}/{path.name}": path for platform, path in targets}
+    platforms = {f"{platform}/{path.name}": platform for platform, path in targets}
+
+    diff = diff_sources(manifest, sources)
+    stale = set(diff["added"]) | set(diff["changed"])
+    if dedup_threshold is not None and (stale or diff["deleted"]):
+        # 기존 출력은 이미 중복이 제거되어 있어, 변경된 파일 때문에 빠졌던 대화가
+        # 다시 남아야 하는지 알 수 없음 -> 중복 제거 시에는 전체를 다시 추출
+        stale = set(sources)
+    to_extract = [rel_path for rel_path in sources if rel_path in stale]
+    kept = [rel_path for rel_path in diff["unchanged"] if rel_path not in stale]
+    files = {rel_path: recorded[rel_path] for rel_path in kept}
+
+    def count_file(rel_path: str, conversation_count: int) -> None:
+        platform_stats = stats["by_platform"][platforms[rel_path]]
+        stats["processed_files"] += 1
+        platform_stats["processed"] += 1
+        stats["total_conversations"] += conversation_count
+        platform_stats["conversations"] += conversation_count
+
+    for rel_path in kept:
+        count_file(rel_path, len(files[rel_path].get("conversation_ids", [])))
+
+    dedup = NearDuplicateFilter(threshold=dedup_threshold) if dedup_threshold is not None else None
+
+    def generate() -> Iterator[Dict]:
+        # 변경 없는 파일의 대화는 기존 출력에서 그대로 가져옴
+        kept_names = {sources[rel_path].name for rel_path in kept}
+        if kept_names:
+            for conv in iter_processed_data(str(output)):
+                if conv.get("source_file") in kept_names:
+                    yield conv
+
+        # 추가/변경된 파일만 다시 추출
+        results = _extract_files([sources[p] for p in to_extract], workers=workers)
+        for rel_path, conversations in zip(to_extract, results):
+            entry = file_fingerprint(sources[rel_path])
+            entry["conversation_ids"] = []
+            for conversation in conversations:
+                # 매니페스트와 통계에는 중복 제거 후 남은 대화만 기록
+                if dedup is not None and dedup.is_duplicate(conversation.get("dialogue", "")):
+                    continue
+                entry["conversation_ids"].append(conversation["conversation_id"])
+                yield conversation
+            files[rel_path] = entry
+            count_file(rel_path, len(entry["conversation_ids"]))
+
+    if to_extract or diff["deleted"] or not output.exists():
+        # 임시 파일에 기록한 뒤 교체 (기존 출력을 읽는 동안 덮어쓰지 않도록)
+        tmp_output = output.with_name(f"{output.stem}.tmp{output.suffix}")
+        save_processed_data(generate(), str(tmp_output))
+        replace_output(str(tmp_output), str(output))
+
+        if dedup is not None:
+            stats["dedup"] = dedup.report()
+    else:
+        print(f"No source changes. {output} is up to date.")
+
+    # 매니페스트 항목은 소스 파일 순서대로 저장
+    manifest["files"] = {rel_path: files[rel_path] for rel_path in sources}
+    save_manifest(manifest, manifest_path)
+
+    return diff
 
-def main():
-    """메인 실행 함수"""
-    # 현재 스크립트 위치 기준으로 경로 설정
-    script_dir = Path(__file__).parent
-    data_dir = script_dir / "data"
-    output_path = script_dir / "processed" / "chat_data_cleaned_v2.json"
 
+def print_dedup_report(report: Dict) -> None:
+    """유사 중복 제거 통계를 출력합니다."""
+    print("\n" + "=" * 60)
+    print("유사 중복 제거")
     print("=" * 60)
-    print("채팅 데이터 전처리 시작")
+    print(
+        f"임계값: {report['threshold']} "
+        f"(MinHash {report['num_perm']}, 밴드 {report['bands']} x {report['rows']}, "
+        f"{report['shingle_size']}-gram)"
+    )
+    print(f"입력 대화 수: {report['input']}")
+    print(f"남은 대화 수: {report['kept']}")
+    print(f"제거된 대화 수: {report['duplicates']} ({report['duplicate_ratio']:.1%})")
+    print(f"후보 비교 횟수: {report['candidate_checks']}")
+
+
+def print_changes(diff: Dict[str, List[str]]) -> None:
+    """증분 처리 변경 내역을 출력합니다."""
+    print("\n" + "=" * 60)
+    print("변경 내역")
     print("=" * 60)
-    print(f"\n데이터 디렉토리: {data_dir}")
-    print(f"출력 파일: {output_path}")
-    print(f"\n제외할 카테고리: {sorted(EXCLUDED_CATEGORIES)}")
-    print()
+    print(f"추가된 파일: {len(diff['added'])}")
+    print(f"변경된 파일: {len(diff['changed'])}")
+    print(f"삭제된 파일: {len(diff['deleted'])}")
+    print(f"변경 없음: {len(diff['unchanged'])}")
 
-    # 데이터 처리
-    conversations, stats = process_all_data(str(data_dir))
+    for label, key in (("+", "added"), ("~", "changed"), ("-", "deleted")):
+        for rel_path in diff[key]:
+            print(f"  {label} {rel_path}")
 
-    # 통계 출력
+
+def write_sharded(conversations: Iterable[Dict], shards_dir: str) -> int:
+    """
+    대화를 플랫폼 x 카테고리 샤드로 나누어 저장하고 샤드 매니페스트를 기록합니다.
+
+    Returns:
+        저장된 대화 수
+    """
+    writer = ShardWriter(shards_dir)
+    count = 0
+    for conv in conversations:
+        category = get_category_from_filename(conv.get("source_file", ""))
+        writer.write(conv.get("platform", ""), category, conv)
+        count += 1
+    manifest = writer.close()
+
+    print(f"Wrote {len(manifest['shards'])} shards to {shards_dir}")
+    return count
+
+
+def save_processed_data(conversations: Iterable[Dict], output_path: str) -> int:
+    """
+    처리된 대화 데이터를 파일로 저장합니다.
+
+    - .jsonl: 한 줄에 대화 하나씩 스트리밍으로 저장
+    - .columnar: 컬럼 저장소 디렉토리로 스트리밍 저장 (mmap으로 읽기 가능)
+    - .shards: 플랫폼 x 카테고리 샤드 디렉토리로 저장 (매니페스트 포함)
+    - 그 외: 기존과 같이 JSON 배열로 저장
+
+    Returns:
+        저장된 대화 수
+    """
+    output = Path(output_path)
+
+    if output.suffix == ".jsonl":
+        count = write_jsonl(conversations, str(output))
+    elif output.suffix == ".columnar":
+        count = write_columnar(conversations, str(output))
+    elif output.suffix == ".shards":
+        count = write_sharded(conversations, str(output))
+    else:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        conversations = list(conversations)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(conversations, f, ensure_ascii=False, indent=2)
+        count = len(conversations)
+
+    print(f"Saved {count} conversations to {output}")
+    return count
+
+
+def print_stats(stats: Dict) -> None:
+    """처리 통계를 출력합니다."""
     print("\n" + "=" * 60)
     print("처리 통계")
     print("=" * 60)
@@ -282,9 +609,81 @@ def main():
         print(f"    - 처리됨: {pstats['processed']}")
         print(f"    - 대화 수: {pstats['conversations']}")
 
-    # 결과 저장
-    if conversations:
-        save_processed_data(conversations, str(output_path))
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령행 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="채팅 데이터 전처리")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="병렬 처리 프로세스 수 (1: 직렬, 0: CPU 코어 수만큼)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "columnar", "shards", "json"],
+        default="jsonl",
+        help=(
+            "출력 형식 (jsonl: 스트리밍 저장, columnar: mmap 컬럼 저장소, "
+            "shards: 플랫폼 x 카테고리 샤드, json: 기존 JSON 배열)"
+        ),
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="매니페스트를 무시하고 모든 파일을 다시 처리",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="MinHash/LSH로 유사 중복 대화 제거",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=0.85,
+        help="중복으로 판단할 자카드 유사도 (기본값: 0.85)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """메인 실행 함수"""
+    args = parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    # 현재 스크립트 위치 기준으로 경로 설정
+    script_dir = Path(__file__).parent
+    data_dir = script_dir / "data"
+    output_path = script_dir / "processed" / f"chat_data_cleaned_v2.{args.format}"
+
+    print("=" * 60)
+    print("채팅 데이터 전처리 시작")
+    print("=" * 60)
+    print(f"\n데이터 디렉토리: {data_dir}")
+    print(f"출력 파일: {output_path}")
+    print(f"\n제외할 카테고리: {sorted(EXCLUDED_CATEGORIES)}")
+    print(f"워커 수: {workers}")
+    print()
+
+    # 데이터 처리 및 저장 (추가/변경된 파일만 다시 추출)
+    stats = new_stats()
+    diff = process_incremental(
+        str(data_dir),
+        str(output_path),
+        stats,
+        workers=workers,
+        full=args.full,
+        dedup_threshold=args.dedup_threshold if args.dedup else None,
+    )
+
+    # 통계 출력
+    print_stats(stats)
+    print_changes(diff)
+    if "dedup" in stats:
+        print_dedup_report(stats["dedup"])
+
+    if stats["total_conversations"]:
         print(f"\n처리 완료! {output_path}에 저장됨")
     else:
         print("\n처리된 대화가 없습니다.")
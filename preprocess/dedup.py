@@ -0,0 +1,190 @@
+"""
+유사 중복 대화 제거 모듈 (MinHash + LSH)
+
+clean_text로 ㅋㅋ/ㅎㅎ 같은 노이즈를 지우고 나면 거의 같은 내용의
+짧은 잡담이 많이 남습니다. 대화(dialogue)의 글자 n-gram 집합으로
+MinHash 시그니처를 만들고, LSH 밴딩으로 후보만 골라 비교하여
+자카드 유사도가 임계값 이상인 대화를 제거합니다.
+
+모든 쌍을 비교하지 않으므로 처리 비용은 대화 수에 선형으로 증가합니다.
+먼저 등장한 대화를 남기고 이후의 유사 대화를 제거합니다.
+"""
+
+import random
+import re
+import zlib
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+# 2^61 - 1 (메르센 소수) 위에서의 유니버설 해시 사용
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+
+_P = np.uint64(_MERSENNE_PRIME)
+_SHIFT_61 = np.uint64(61)
+_SHIFT_32 = np.uint64(32)
+_SHIFT_29 = np.uint64(29)
+_MASK_29 = np.uint64((1 << 29) - 1)
+_MASK_32 = np.uint64(_MAX_HASH)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    LSH 밴드 수와 밴드당 행 수를 고릅니다.
+
+    후보가 될 확률이 50%가 되는 유사도 (1/b)^(1/r)이
+    threshold에 가장 가까운 (b, r) 조합을 반환합니다.
+    """
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+def _mod_mersenne(x: np.ndarray) -> np.ndarray:
+    """uint64 배열의 2^61 - 1 나머지 (2^61 = 1 (mod p)을 이용해 상위 비트를 접어 더함)"""
+    x = (x & _P) + (x >> _SHIFT_61)
+    return np.where(x >= _P, x - _P, x)
+
+
+def char_shingles(text: str, size: int) -> List[int]:
+    """공백을 정규화한 텍스트의 글자 n-gram 해시 목록을 반환합니다."""
+    normalized = _WHITESPACE.sub(" ", text).strip()
+    if len(normalized) <= size:
+        return [zlib.crc32(normalized.encode("utf-8"))] if normalized else []
+
+    shingles = {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+    return [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+
+
+class NearDuplicateFilter:
+    """MinHash/LSH 기반 유사 중복 대화 필터"""
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            threshold: 중복으로 판단할 자카드 유사도 (0~1)
+            num_perm: MinHash 시그니처 길이
+            shingle_size: 글자 n-gram 크기
+            seed: 해시 함수 생성 시드 (같은 시드면 결과가 항상 같음)
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1]: {threshold}")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = random.Random(seed)
+        perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        # a * h가 uint64를 넘지 않도록 a를 상위/하위 32비트로 나눠 둠 (num_perm x 1 열 벡터)
+        a = np.array([a for a, _ in perms], dtype=np.uint64)[:, None]
+        self._a_hi = a >> _SHIFT_32
+        self._a_lo = a & _MASK_32
+        self._b = np.array([b for _, b in perms], dtype=np.uint64)[:, None]
+
+        # 남긴 대화의 시그니처 (num_perm개씩 이어 붙인 32비트 배열)
+        self._signatures = array("I")
+        # 밴드별 버킷: 밴드 해시 -> 남긴 대화 번호 리스트
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+
+        self.stats = {"input": 0, "kept": 0, "duplicates": 0, "candidate_checks": 0}
+
+    def signature(self, text: str) -> array:
+        """텍스트의 MinHash 시그니처를 계산합니다."""
+        hashes = char_shingles(text, self.shingle_size)
+        if not hashes:
+            return array("I", [_MAX_HASH] * self.num_perm)
+
+        # 모든 순열 x 모든 n-gram의 (a * h + b) mod p를 한 번에 계산 (결과는 정수 연산과 같음)
+        # a * h = a_hi * h * 2^32 + a_lo * h 이고,
+        # x * 2^32 = (x >> 29) + ((x & (2^29 - 1)) << 32) (mod p)
+        h = np.array(hashes, dtype=np.uint64)[None, :]
+        high = self._a_hi * h
+        high = (high >> _SHIFT_29) + ((high & _MASK_29) << _SHIFT_32)
+        values = _mod_mersenne(
+            _mod_mersenne(self._a_lo * h) + _mod_mersenne(high) + self._b
+        )
+        return array("I", (values.min(axis=1) & _MASK_32).tolist())
+
+    def _band_keys(self, signature: array) -> List[int]:
+        rows = self.rows
+        return [
+            hash(tuple(signature[band * rows : (band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def _similarity(self, signature: array, index: int) -> float:
+        """시그니처와 index번째로 남긴 대화의 추정 자카드 유사도"""
+        start = index * self.num_perm
+        stored = self._signatures[start : start + self.num_perm]
+        matches = sum(1 for x, y in zip(signature, stored) if x == y)
+        return matches / self.num_perm
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        앞서 본 대화와 유사하면 True를 반환합니다.
+        유사하지 않으면 이 대화를 인덱스에 추가하고 False를 반환합니다.
+        """
+        self.stats["input"] += 1
+        signature = self.signature(text)
+        keys = self._band_keys(signature)
+
+        checked = set()
+        for band, key in enumerate(keys):
+            for index in self._buckets[band].get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                self.stats["candidate_checks"] += 1
+                if self._similarity(signature, index) >= self.threshold:
+                    self.stats["duplicates"] += 1
+                    return True
+
+        index = self.stats["kept"]
+        self._signatures.extend(signature)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        self.stats["kept"] += 1
+        return False
+
+    def filter(self, conversations: Iterable[Dict]) -> Iterator[Dict]:
+        """유사 중복을 제거한 대화를 한 건씩 반환합니다."""
+        for conv in conversations:
+            if not self.is_duplicate(conv.get("dialogue", "")):
+                yield conv
+
+    def report(self) -> Dict:
+        """중복 제거 통계를 반환합니다."""
+        stats = dict(self.stats)
+        stats.update(
+            {
+                "threshold": self.threshold,
+                "num_perm": self.num_perm,
+                "bands": self.bands,
+                "rows": self.rows,
+                "shingle_size": self.shingle_size,
+                "duplicate_ratio": (
+                    stats["duplicates"] / stats["input"] if stats["input"] else 0.0
+                ),
+            }
+        )
+        return stats
@@ -0,0 +1,135 @@
+"""
+대용량 JSON 파일 점진적 파싱 모듈
+
+원본 데이터 파일은 {"...": ..., "info": [ {...}, {...}, ... ]} 형태입니다.
+json.load로 파일 전체를 읽는 대신, 파일을 청크 단위로 읽으면서
+최상위 객체의 배열 필드(기본값 "info")의 원소를 하나씩 디코딩하여 반환합니다.
+메모리 사용량은 파일 크기가 아니라 원소 하나의 크기에 비례합니다.
+
+외부 의존성 없이 json.JSONDecoder.raw_decode만 사용합니다.
+"""
+
+import json
+from typing import Any, Iterator, TextIO
+
+# 기본 읽기 단위 (문자 수)
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
+class _StreamBuffer:
+    """파일에서 필요한 만큼만 읽어 오는 버퍼"""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self, size: int) -> bool:
+        """버퍼에 size 글자 이상을 추가로 읽습니다. 더 읽을 내용이 없으면 False."""
+        if self.eof:
+            return False
+
+        # 이미 소비한 부분은 버려서 버퍼가 계속 커지지 않도록 함
+        if self.pos:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛴 다음 글자를 반환합니다. 파일 끝이면 빈 문자열."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._read_more(self.chunk_size):
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """다음 글자가 chars 중 하나인지 확인하고 소비합니다."""
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise json.JSONDecodeError(
+                f"Expecting one of {chars!r}", self.buf, self.pos
+            )
+        self.pos += 1
+        return ch
+
+    def decode_value(self, decoder: json.JSONDecoder) -> Any:
+        """
+        현재 위치의 JSON 값 하나를 디코딩합니다.
+
+        값이 버퍼 안에서 끝나지 않으면 읽기 단위를 두 배씩 늘려 가며 다시 시도합니다.
+        """
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                # 숫자/리터럴이 버퍼 끝에서 잘렸을 수 있으므로 끝에 닿으면 더 읽음
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._read_more(read_size):
+                if self.pos >= len(self.buf):
+                    raise json.JSONDecodeError("Unexpected end of data", self.buf, self.pos)
+            read_size = max(read_size, len(self.buf)) * 2
+
+
+def iter_array_items(
+    f: TextIO, key: str = "info", chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    최상위 JSON 객체에서 key 배열의 원소를 하나씩 반환합니다.
+
+    Args:
+        f: 텍스트 모드로 연 파일 객체
+        key: 순회할 최상위 배열 필드 이름
+        chunk_size: 한 번에 읽을 글자 수
+
+    Raises:
+        json.JSONDecodeError: JSON 형식이 잘못된 경우
+    """
+    decoder = json.JSONDecoder()
+    stream = _StreamBuffer(f, chunk_size)
+
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+
+    while True:
+        member = stream.decode_value(decoder)
+        if not isinstance(member, str):
+            raise json.JSONDecodeError(
+                "Expecting property name enclosed in double quotes", stream.buf, stream.pos
+            )
+        stream.expect(":")
+
+        if member == key and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    yield stream.decode_value(decoder)
+                    if stream.expect(",]") == "]":
+                        break
+        else:
+            # 다른 필드는 디코딩해서 버림
+            stream.decode_value(decoder)
+
+        if stream.expect(",}") == "}":
+            return
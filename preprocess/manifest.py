@@ -0,0 +1,112 @@
+"""
+전처리 소스 파일 매니페스트 모듈
+
+원본 JSON 파일마다 크기, 수정 시각, 내용 해시와 해당 파일에서 생성된
+대화 ID 목록을 기록합니다. 다음 실행 때 이 기록과 비교하여
+새로 추가되거나 변경된 파일만 다시 추출할 수 있습니다.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+MANIFEST_VERSION = 1
+
+# 해시 계산 시 한 번에 읽을 바이트 수
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    """파일 내용의 SHA-256 해시를 반환합니다."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: Path) -> Dict:
+    """파일의 크기, 수정 시각, 내용 해시를 반환합니다."""
+    stat = path.stat()
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": file_sha256(path),
+    }
+
+
+def load_manifest(path: str) -> Dict:
+    """
+    매니페스트를 읽습니다. 파일이 없거나 버전이 다르면 빈 매니페스트를 반환합니다.
+    """
+    manifest_path = Path(path)
+    if not manifest_path.exists():
+        return {"version": MANIFEST_VERSION, "files": {}}
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"Error reading manifest {manifest_path}: {e}")
+        return {"version": MANIFEST_VERSION, "files": {}}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+
+    return manifest
+
+
+def save_manifest(manifest: Dict, path: str) -> None:
+    """매니페스트를 저장합니다. (임시 파일에 쓴 뒤 교체)"""
+    manifest_path = Path(path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def diff_sources(manifest: Dict, sources: Dict[str, Path]) -> Dict[str, List[str]]:
+    """
+    현재 소스 파일 목록을 매니페스트와 비교합니다.
+
+    크기와 수정 시각이 같으면 변경되지 않은 것으로 보고,
+    다르면 내용 해시까지 비교합니다. (touch만 된 파일은 변경으로 보지 않음)
+
+    Args:
+        manifest: load_manifest()로 읽은 매니페스트
+        sources: {상대 경로: 파일 경로} 형태의 현재 소스 파일 목록
+
+    Returns:
+        {"added": [...], "changed": [...], "unchanged": [...], "deleted": [...]}
+        각 값은 상대 경로 리스트 (added/changed/unchanged는 sources 순서 유지)
+    """
+    recorded = manifest.get("files", {})
+    diff = {"added": [], "changed": [], "unchanged": [], "deleted": []}
+
+    for rel_path, path in sources.items():
+        entry = recorded.get(rel_path)
+        if entry is None:
+            diff["added"].append(rel_path)
+            continue
+
+        stat = path.stat()
+        if stat.st_size == entry.get("size") and stat.st_mtime == entry.get("mtime"):
+            diff["unchanged"].append(rel_path)
+            continue
+
+        sha256 = file_sha256(path)
+        if sha256 == entry.get("sha256"):
+            # 내용은 같고 수정 시각만 바뀐 경우: 기록만 갱신
+            entry["size"] = stat.st_size
+            entry["mtime"] = stat.st_mtime
+            diff["unchanged"].append(rel_path)
+        else:
+            diff["changed"].append(rel_path)
+
+    diff["deleted"] = [rel_path for rel_path in recorded if rel_path not in sources]
+
+    return diff
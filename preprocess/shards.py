@@ -0,0 +1,136 @@
+"""
+코퍼스 샤드 모듈
+
+정제된 코퍼스를 플랫폼 x 주제 카테고리(파일명에서 추출한 번호) 단위의
+JSONL 샤드로 나누어 저장하고, 샤드 목록과 내용 해시를 매니페스트로 기록합니다.
+인덱서는 매니페스트를 보고 바뀐 샤드나 배포에 필요한 샤드만 다시 인덱싱할 수 있습니다.
+
+디렉토리 구성:
+- shards.json: 샤드 매니페스트
+- {PLATFORM}/{PLATFORM}_{CATEGORY}.jsonl: 샤드 파일
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from preprocess.manifest import file_sha256
+
+SHARD_MANIFEST_VERSION = 1
+SHARD_MANIFEST_FILENAME = "shards.json"
+
+
+def is_sharded(path: str) -> bool:
+    """경로가 샤드 디렉토리인지 확인합니다."""
+    return (Path(path) / SHARD_MANIFEST_FILENAME).exists()
+
+
+def shard_id(platform: str, category: Optional[int]) -> str:
+    """샤드 ID를 생성합니다. 카테고리를 알 수 없으면 "unknown"을 사용합니다."""
+    return f"{platform}_{category if category is not None else 'unknown'}"
+
+
+class ShardWriter:
+    """대화를 샤드별 JSONL 파일로 나누어 기록하는 기록기"""
+
+    def __init__(self, shards_dir: str):
+        self.shards_dir = Path(shards_dir)
+        self.shards_dir.mkdir(parents=True, exist_ok=True)
+        self._files: Dict[str, TextIO] = {}
+        self._shards: Dict[str, Dict] = {}
+
+    def write(self, platform: str, category: Optional[int], conv: Dict) -> None:
+        """대화 하나를 해당 샤드에 기록합니다."""
+        sid = shard_id(platform, category)
+        f = self._files.get(sid)
+        if f is None:
+            rel_path = f"{platform}/{sid}.jsonl"
+            path = self.shards_dir / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            f = open(path, "w", encoding="utf-8")
+            self._files[sid] = f
+            self._shards[sid] = {
+                "path": rel_path,
+                "platform": platform,
+                "category": category,
+                "conversations": 0,
+            }
+
+        f.write(json.dumps(conv, ensure_ascii=False))
+        f.write("\n")
+        self._shards[sid]["conversations"] += 1
+
+    def close(self) -> Dict:
+        """
+        모든 샤드 파일을 닫고 매니페스트를 저장합니다.
+
+        Returns:
+            샤드 매니페스트
+        """
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+        shards = {}
+        for sid in sorted(self._shards):
+            entry = self._shards[sid]
+            entry["sha256"] = file_sha256(self.shards_dir / entry["path"])
+            shards[sid] = entry
+
+        manifest = {"version": SHARD_MANIFEST_VERSION, "shards": shards}
+        with open(self.shards_dir / SHARD_MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        return manifest
+
+
+def load_shard_manifest(shards_dir: str) -> Dict:
+    """샤드 매니페스트를 읽습니다."""
+    with open(Path(shards_dir) / SHARD_MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != SHARD_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported shard manifest version: {manifest.get('version')}")
+
+    return manifest
+
+
+def select_shards(
+    manifest: Dict,
+    platforms: Optional[Iterable[str]] = None,
+    categories: Optional[Iterable[int]] = None,
+) -> List[str]:
+    """
+    조건에 맞는 샤드 ID 목록을 반환합니다.
+
+    Args:
+        manifest: 샤드 매니페스트
+        platforms: 포함할 플랫폼 목록 (None이면 전체)
+        categories: 포함할 카테고리 번호 목록 (None이면 전체)
+    """
+    platform_set = set(platforms) if platforms else None
+    category_set = set(categories) if categories else None
+
+    return [
+        sid
+        for sid, entry in manifest["shards"].items()
+        if (platform_set is None or entry["platform"] in platform_set)
+        and (category_set is None or entry["category"] in category_set)
+    ]
+
+
+def iter_shard(shards_dir: str, manifest: Dict, sid: str) -> Iterator[Dict]:
+    """샤드 하나의 대화를 한 건씩 읽습니다."""
+    path = Path(shards_dir) / manifest["shards"][sid]["path"]
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_sharded(shards_dir: str) -> Iterator[Dict]:
+    """모든 샤드의 대화를 매니페스트 순서대로 한 건씩 읽습니다."""
+    manifest = load_shard_manifest(shards_dir)
+    for sid in manifest["shards"]:
+        yield from iter_shard(shards_dir, manifest, sid)
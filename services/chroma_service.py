@@ -5,15 +5,110 @@ ChromaDB 벡터 데이터베이스 서비스 모듈
 유사 대화를 검색하는 기능을 제공합니다.
 """
 
+import argparse
+import copy
+import hashlib
 import json
 import os
+import uuid
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import chromadb
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
 from chromadb.config import Settings as ChromaSettings
 from chromadb.utils import embedding_functions
 
+from preprocess.chunker import DEFAULT_OVERLAP, DEFAULT_WINDOW_SIZE, iter_chunks
+from preprocess.corpus_io import iter_processed_data
+from preprocess.shards import is_sharded, iter_shard, load_shard_manifest, select_shards
+from services.embedding_cache import DEFAULT_MAX_BYTES, CachedEmbeddingFunction, EmbeddingCache
+from services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from services.quantized_index import QuantizedIndex
+from services.query_cache import QueryEmbedder, TTLCache, normalize_query
+from services.speaker_profile import speaker_metadata, speaker_where
+from services.subject_tags import tag_metadata, tag_where
+
+# 샤드 단위로 인덱싱한 내용 해시 기록 파일 (persist_dir 안에 저장)
+SHARD_STATE_FILENAME = "indexed_shards.json"
+
+# 컬렉션 버전 기록 파일 (persist_dir 안에 저장, 컬렉션을 바꿀 때마다 새 버전을 기록)
+COLLECTION_VERSION_FILENAME = "collection_versions.json"
+
+DEFAULT_PERSIST_DIR = str(Path(__file__).parent.parent / "chroma_db")
+DEFAULT_COLLECTION_NAME = "chat_conversations"
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+# 임베딩 캐시 기본 경로 (persist_dir과 분리)
+DEFAULT_EMBEDDING_CACHE_DIR = str(Path(__file__).parent.parent / "embedding_cache")
+
+# 인덱싱 후 동작 확인용 검색 쿼리 (벤치마크에서도 사용)
+TEST_QUERIES = ["안녕하세요", "오늘 뭐해?", "밥 먹었어?"]
+
+# 검색 방식: 임베딩 검색만 사용 / BM25 어휘 검색과 임베딩 검색을 RRF로 결합
+SEARCH_MODES = ("vector", "hybrid")
+
+# 주제 필터 방식: 태그 필드 정확 일치 / 기존 subject 부분 문자열($contains)
+SUBJECT_FILTER_MODES = ("tag", "contains")
+
+# 하이브리드 검색 시 방식별로 넉넉히 가져와 합친 뒤 n_results개로 자름
+HYBRID_FETCH_FACTOR = 3
+
+# 하이브리드 검색에서 벡터 검색 없이 BM25 결과로 응답할 기본 신뢰도
+# (n_results번째 결과까지 쿼리 n-gram을 IDF 기준 90% 이상 포함하는 경우)
+DEFAULT_LEXICAL_CONFIDENCE = 0.9
+
+
+def create_embedding_function(
+    embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+    embedding_cache_dir: Optional[str] = None,
+    embedding_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    use_embedding_cache: bool = True,
+) -> Tuple[EmbeddingFunction, Optional[EmbeddingCache]]:
+    """
+    문장 임베딩 함수를 만듭니다.
+
+    Returns:
+        (임베딩 함수, 임베딩 캐시 / 캐시를 쓰지 않으면 None)
+    """
+    embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=embedding_model
+    )
+    if not use_embedding_cache:
+        return embedding_fn, None
+
+    cache = EmbeddingCache(
+        embedding_cache_dir or DEFAULT_EMBEDDING_CACHE_DIR,
+        embedding_model,
+        embedding_cache_max_bytes,
+    )
+    return CachedEmbeddingFunction(embedding_fn, cache), cache
+
+
+def _load_collection_versions(path: Path) -> Dict:
+    """컬렉션 버전 기록을 읽습니다. {collection_name: version}"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_collection_version(
+    persist_dir: Optional[str] = None, collection_name: str = DEFAULT_COLLECTION_NAME
+) -> Optional[str]:
+    """
+    persist_dir에 기록된 컬렉션 버전을 읽습니다. (ChromaDB를 열지 않음)
+
+    ChromaService가 컬렉션을 바꿀 때마다 새 버전을 기록하므로, 컬렉션에서 만든
+    스냅샷이 최신인지 문서 전체를 읽지 않고 확인하는 데 씁니다.
+    기록이 없으면(이 기능 이전에 만든 컬렉션) None
+    """
+    path = Path(persist_dir or DEFAULT_PERSIST_DIR) / COLLECTION_VERSION_FILENAME
+    return _load_collection_versions(path).get(collection_name)
+
 
 class ChromaService:
     """ChromaDB 벡터 데이터베이스 서비스"""
@@ -21,8 +116,18 @@ class ChromaService:
     def __init__(
         self,
         persist_dir: Optional[str] = None,
-        collection_name: str = "chat_conversations",
-        embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        collection_name: str = DEFAULT_COLLECTION_NAME,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+        embedding_cache_dir: Optional[str] = None,
+        embedding_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        use_embedding_cache: bool = True,
+        query_cache_size: int = 1024,
+        result_cache_size: int = 1024,
+        result_cache_ttl: float = 300.0,
+        quantization: Optional[str] = None,
+        search_mode: str = "vector",
+        lexical_confidence: Optional[float] = DEFAULT_LEXICAL_CONFIDENCE,
+        subject_filter_mode: str = "tag",
     ):
         """
         ChromaDB 서비스 초기화
@@ -31,13 +136,40 @@ class ChromaService:
             persist_dir: ChromaDB 저장 경로 (None이면 기본 경로 사용)
             collection_name: 컬렉션 이름
             embedding_model: 사용할 임베딩 모델
+            embedding_cache_dir: 임베딩 캐시 경로 (None이면 기본 경로 사용)
+                persist_dir과 분리되어 있어 컬렉션을 새로 만들어도 벡터를 재사용합니다.
+            embedding_cache_max_bytes: 임베딩 캐시 최대 크기
+            use_embedding_cache: 임베딩 캐시 사용 여부
+            query_cache_size: 쿼리 임베딩 LRU 캐시 크기 (0이면 사용 안 함)
+            result_cache_size: 검색 결과 캐시 크기 (0이면 사용 안 함)
+            result_cache_ttl: 검색 결과 캐시 유효 시간 (초)
+            quantization: 양자화 검색 형식 (float16, int8 / None이면 ChromaDB HNSW 검색)
+                지정하면 컬렉션 벡터를 양자화한 인덱스를 persist_dir에 만들어 검색에 사용합니다.
+            search_mode: 검색 방식 (vector, hybrid)
+            lexical_confidence: 하이브리드 모드에서 n_results번째 BM25 결과의 신뢰도
+                (쿼리 n-gram 포함 비율, 0~1]가 이 값 이상이면 벡터 검색과 결합하지 않고
+                쿼리 임베딩 없이 어휘 검색 결과만으로 응답 (None이면 항상 결합).
+                이 결과에는 거리가 없습니다(None).
+            subject_filter_mode: 주제 필터 방식 (tag: 태그 필드 정확 일치,
+                contains: subject 부분 문자열 일치)
         """
+        if lexical_confidence is not None and not 0 < lexical_confidence <= 1:
+            raise ValueError(f"lexical_confidence must be in (0, 1]: {lexical_confidence}")
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search_mode: {search_mode} (choose from {SEARCH_MODES})")
+        if subject_filter_mode not in SUBJECT_FILTER_MODES:
+            raise ValueError(
+                f"Unsupported subject_filter_mode: {subject_filter_mode} "
+                f"(choose from {SUBJECT_FILTER_MODES})"
+            )
+
         # 기본 저장 경로 설정
         if persist_dir is None:
-            persist_dir = str(Path(__file__).parent.parent / "chroma_db")
+            persist_dir = DEFAULT_PERSIST_DIR
 
         self.persist_dir = persist_dir
         self.collection_name = collection_name
+        self.embedding_model = embedding_model
 
         # ChromaDB 클라이언트 초기화
         self.client = chromadb.PersistentClient(
@@ -45,10 +177,29 @@ class ChromaService:
         )
 
         # 임베딩 함수 설정
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=embedding_model
+        self.embedding_fn, self.embedding_cache = create_embedding_function(
+            embedding_model, embedding_cache_dir, embedding_cache_max_bytes, use_embedding_cache
         )
 
+        # 검색 캐시 (쿼리 임베딩 LRU, 검색 결과 TTL)
+        self.query_embedder = QueryEmbedder(self.embedding_fn, query_cache_size)
+        self.result_cache = TTLCache(result_cache_size, result_cache_ttl)
+
+        # 양자화 인덱스 (첫 검색 때 불러오거나 생성)
+        self.quantization = quantization
+        self._quantized_index: Optional[QuantizedIndex] = None
+
+        # 어휘(BM25) 인덱스 (하이브리드 모드 첫 검색 때 불러오거나 생성)
+        self.search_mode = search_mode
+        self.lexical_confidence = lexical_confidence
+        self._lexical_index: Optional[LexicalIndex] = None
+        self.search_stats = {"lexical_fast_path": 0, "hybrid": 0}
+
+        self.subject_filter_mode = subject_filter_mode
+
+        # 필터별 문서 수 캐시 (컬렉션이 바뀌면 비움)
+        self._filter_counts: Dict[Tuple[str, Optional[int]], int] = {}
+
         # 컬렉션 가져오기 또는 생성
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
@@ -59,46 +210,115 @@ class ChromaService:
         print(f"ChromaDB initialized at {persist_dir}")
         print(f"Collection '{collection_name}' has {self.collection.count()} documents")
 
+    @staticmethod
+    def build_metadata(conv: Dict, extra_metadata: Optional[Dict] = None) -> Dict:
+        """
+        대화(또는 청크)의 메타데이터를 만듭니다.
+        ChromaDB는 중첩 객체를 지원하지 않으므로 평탄화합니다.
+        """
+        metadata = {
+            "platform": conv.get("platform", ""),
+            "subject": conv.get("subject", ""),
+            "speaker_type": conv.get("speaker_type", ""),
+            "source_file": conv.get("source_file", ""),
+            "turn_count": len(conv.get("turns", [])),
+        }
+
+        # 주제 태그 필드 (주제 필터를 정확 일치 조건으로 처리하기 위함)
+        metadata.update(tag_metadata(metadata["subject"]))
+
+        # 화자 성별/말투 필드 (페르소나와 상대 성별에 맞는 예시만 검색하기 위함)
+        metadata.update(speaker_metadata(conv.get("turns", [])))
+
+        # 청크인 경우 원본 대화로 돌아갈 수 있는 정보 추가
+        if "chunk_id" in conv:
+            metadata.update(
+                {
+                    "parent_id": conv.get("parent_id", ""),
+                    "chunk_index": conv.get("chunk_index", 0),
+                    "chunk_count": conv.get("chunk_count", 1),
+                    "turn_start": conv.get("turn_start", 0),
+                    "turn_end": conv.get("turn_end", 0),
+                }
+            )
+        if extra_metadata:
+            metadata.update(extra_metadata)
+
+        return metadata
+
+    @staticmethod
+    def content_hash(document: str, metadata: Dict) -> str:
+        """문서 내용과 메타데이터의 해시 (내용이 같으면 항상 같은 값)"""
+        payload = json.dumps(
+            {"document": document, "metadata": metadata},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    @classmethod
+    def content_hash_id(cls, document: str, metadata: Dict) -> str:
+        """문서 내용과 메타데이터로 만든 ID (대화 ID가 없는 문서에 사용)"""
+        return "h_" + cls.content_hash(document, metadata)
+
+    @classmethod
+    def document_record(
+        cls, conv: Dict, extra_metadata: Optional[Dict] = None
+    ) -> Tuple[str, Dict]:
+        """
+        대화(또는 청크)의 문서 ID와 메타데이터를 만듭니다.
+
+        청크는 chunk_id, 청킹하지 않은 대화는 conversation_id를 문서 ID로 사용하고
+        (둘 다 없으면 내용 해시), 바뀐 문서를 찾을 수 있도록 내용 해시를
+        메타데이터의 content_hash에 기록합니다.
+        """
+        dialogue = conv.get("dialogue", "")
+        metadata = cls.build_metadata(conv, extra_metadata)
+        digest = cls.content_hash(dialogue, metadata)
+        doc_id = conv.get("chunk_id") or conv.get("conversation_id") or f"h_{digest}"
+        metadata["content_hash"] = digest
+        return doc_id, metadata
+
     def add_conversations(
-        self, conversations: List[Dict], batch_size: int = 100
+        self,
+        conversations: Iterable[Dict],
+        batch_size: int = 100,
+        extra_metadata: Optional[Dict] = None,
     ) -> int:
         """
         대화 데이터를 벡터 DB에 추가합니다.
 
         Args:
-            conversations: 대화 데이터 리스트
+            conversations: 대화 데이터 이터러블 (리스트 또는 스트리밍 제너레이터)
             batch_size: 배치 크기
+            extra_metadata: 모든 문서에 공통으로 추가할 메타데이터 (예: 샤드 ID)
 
         Returns:
             추가된 문서 수
         """
         added_count = 0
+        iterator = iter(conversations)
+        i = 0
 
-        for i in range(0, len(conversations), batch_size):
-            batch = conversations[i : i + batch_size]
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
 
             ids = []
             documents = []
             metadatas = []
 
             for conv in batch:
-                conv_id = conv.get("conversation_id", f"conv_{i + len(ids)}")
                 dialogue = conv.get("dialogue", "")
 
                 if not dialogue:
                     continue
 
+                conv_id, metadata = self.document_record(conv, extra_metadata)
+
                 ids.append(conv_id)
                 documents.append(dialogue)
-
-                # 메타데이터 (ChromaDB는 중첩 객체를 지원하지 않으므로 평탄화)
-                metadata = {
-                    "platform": conv.get("platform", ""),
-                    "subject": conv.get("subject", ""),
-                    "speaker_type": conv.get("speaker_type", ""),
-                    "source_file": conv.get("source_file", ""),
-                    "turn_count": len(conv.get("turns", [])),
-                }
                 metadatas.append(metadata)
 
             if ids:
@@ -106,17 +326,192 @@ class ChromaService:
                 added_count += len(ids)
                 print(f"Added batch {i // batch_size + 1}: {len(ids)} documents")
 
+            i += len(batch)
+
+        if added_count:
+            self.invalidate_search_cache()
+
         print(f"Total documents added: {added_count}")
         print(f"Collection now has {self.collection.count()} documents")
 
         return added_count
 
+    def get_ids(self, where: Optional[Dict] = None, page_size: int = 5000) -> List[str]:
+        """컬렉션(또는 조건에 맞는 문서)의 ID 목록을 반환합니다."""
+        ids = []
+        offset = 0
+        while True:
+            page = self.collection.get(
+                where=where, limit=page_size, offset=offset, include=[]
+            )
+            ids.extend(page["ids"])
+            if len(page["ids"]) < page_size:
+                return ids
+            offset += page_size
+
+    def get_content_hashes(
+        self, where: Optional[Dict] = None, page_size: int = 5000
+    ) -> Dict[str, str]:
+        """
+        컬렉션(또는 조건에 맞는 문서)의 문서 ID별 내용 해시를 반환합니다.
+        (content_hash가 없는 문서는 빈 문자열)
+        """
+        hashes = {}
+        offset = 0
+        while True:
+            page = self.collection.get(
+                where=where, limit=page_size, offset=offset, include=["metadatas"]
+            )
+            for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+                hashes[doc_id] = (metadata or {}).get("content_hash", "")
+            if len(page["ids"]) < page_size:
+                return hashes
+            offset += page_size
+
+    def sync_conversations(
+        self,
+        conversations: Iterable[Dict],
+        batch_size: int = 100,
+        extra_metadata: Optional[Dict] = None,
+        where: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        입력 코퍼스와 컬렉션을 동기화합니다.
+
+        문서 ID는 add_conversations와 같은 chunk_id/conversation_id를 쓰고,
+        메타데이터의 content_hash로 바뀐 문서를 찾습니다.
+
+        - ID와 내용 해시가 같은 문서: 임베딩 없이 건너뜀
+        - 새로운(또는 내용이 바뀐) 문서: 임베딩 후 같은 ID로 upsert
+        - 입력에 없는 기존 문서: 삭제
+
+        Args:
+            conversations: 대화 데이터 이터러블
+            batch_size: 배치 크기
+            extra_metadata: 모든 문서에 공통으로 추가할 메타데이터
+            where: 비교 대상 기존 문서 범위 (예: {"shard": "KAKAO_4"}, None이면 전체)
+
+        Returns:
+            {"added": 추가 수, "unchanged": 유지 수, "deleted": 삭제 수}
+        """
+        existing = self.get_content_hashes(where)
+        seen_ids = set()
+        stats = {"added": 0, "unchanged": 0, "deleted": 0}
+
+        ids = []
+        documents = []
+        metadatas = []
+
+        def flush() -> None:
+            if ids:
+                self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas)
+                stats["added"] += len(ids)
+                print(f"Upserted {len(ids)} documents")
+                ids.clear()
+                documents.clear()
+                metadatas.clear()
+
+        for conv in conversations:
+            dialogue = conv.get("dialogue", "")
+            if not dialogue:
+                continue
+
+            doc_id, metadata = self.document_record(conv, extra_metadata)
+
+            if doc_id in seen_ids:
+                continue
+            seen_ids.add(doc_id)
+
+            if existing.get(doc_id) == metadata["content_hash"]:
+                stats["unchanged"] += 1
+                continue
+
+            ids.append(doc_id)
+            documents.append(dialogue)
+            metadatas.append(metadata)
+            if len(ids) >= batch_size:
+                flush()
+        flush()
+
+        removed = list(set(existing) - seen_ids)
+        for start in range(0, len(removed), batch_size):
+            self.collection.delete(ids=removed[start : start + batch_size])
+        stats["deleted"] = len(removed)
+
+        if stats["added"] or stats["deleted"]:
+            self.invalidate_search_cache()
+
+        print(
+            f"Sync done: {stats['added']} added, {stats['unchanged']} unchanged, "
+            f"{stats['deleted']} deleted"
+        )
+        print(f"Collection now has {self.collection.count()} documents")
+
+        return stats
+
+    @staticmethod
+    def build_where(
+        platform_filter: Optional[str] = None,
+        subject_filter: Optional[str] = None,
+        subject_filter_mode: str = "tag",
+        speaker_sex_filter: Optional[str] = None,
+        style_filter: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        검색 필터로 ChromaDB where 조건을 만듭니다. 필터가 없으면 None.
+
+        subject_filter_mode가 tag면 주제 필터를 태그로 나누어 태그 필드 정확 일치 조건으로,
+        contains면 subject 부분 문자열 조건으로 만듭니다.
+        화자 성별/말투 필터는 speaker_profile의 필드 정확 일치 조건으로 만듭니다.
+        """
+        conditions = []
+        if platform_filter:
+            conditions.append({"platform": platform_filter})
+        if subject_filter and subject_filter_mode == "contains":
+            conditions.append({"subject": {"$contains": subject_filter}})
+        elif subject_filter:
+            subject_where = tag_where(subject_filter)
+            if subject_where:
+                conditions.extend(subject_where.get("$and", [subject_where]))
+        speaker_condition = speaker_where(speaker_sex_filter, style_filter)
+        if speaker_condition:
+            conditions.append(speaker_condition)
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+
+    def count(self, limit: Optional[int] = None, **filters) -> int:
+        """
+        필터에 맞는 문서 수를 반환합니다. 결과는 컬렉션이 바뀔 때까지 캐시합니다.
+
+        Args:
+            limit: 이 수까지만 셈 (큰 파티션의 ID를 모두 읽지 않도록)
+            filters: search()의 필터 인자
+        """
+        filters = {k: v for k, v in filters.items() if v}
+        where = self.build_where(**{"subject_filter_mode": self.subject_filter_mode, **filters})
+        if where is None:
+            total = self.collection.count()
+            return min(total, limit) if limit is not None else total
+
+        key = (json.dumps(where, sort_keys=True), limit)
+        if key not in self._filter_counts:
+            page = self.collection.get(where=where, limit=limit, include=[])
+            self._filter_counts[key] = len(page["ids"])
+        return self._filter_counts[key]
+
     def search(
         self,
         query: str,
         n_results: int = 5,
         platform_filter: Optional[str] = None,
         subject_filter: Optional[str] = None,
+        subject_filter_mode: Optional[str] = None,
+        speaker_sex_filter: Optional[str] = None,
+        style_filter: Optional[str] = None,
     ) -> Dict:
         """
         쿼리와 유사한 대화를 검색합니다.
@@ -125,53 +520,414 @@ class ChromaService:
             query: 검색 쿼리
             n_results: 반환할 결과 수
             platform_filter: 플랫폼 필터 (KAKAO, FACEBOOK 등)
-            subject_filter: 주제 필터
+            subject_filter: 주제 필터 (예: "연애", "미용과 건강/식음료")
+            subject_filter_mode: 주제 필터 방식 (None이면 서비스 기본값)
+            speaker_sex_filter: 화자 성별 필터 (M, F)
+            style_filter: 말투 필터 (EMOTIONAL, LOGICAL, TOUGH). 성별과 함께 주면 그 성별 화자의 말투
 
         Returns:
-            검색 결과 (documents, distances, metadatas)
-        """
-        where_filter = None
-
-        # 필터 구성
-        if platform_filter or subject_filter:
-            conditions = []
-            if platform_filter:
-                conditions.append({"platform": platform_filter})
-            if subject_filter:
-                conditions.append({"subject": {"$contains": subject_filter}})
-
-            if len(conditions) == 1:
-                where_filter = conditions[0]
-            else:
-                where_filter = {"$and": conditions}
-
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where=where_filter,
-            include=["documents", "metadatas", "distances"],
-        )
+            검색 결과 (ids, documents, distances, metadatas)
+        """
+        filters = {
+            "platform_filter": platform_filter,
+            "subject_filter": subject_filter,
+            "subject_filter_mode": subject_filter_mode,
+            "speaker_sex_filter": speaker_sex_filter,
+            "style_filter": style_filter,
+        }
+        return self.search_batch([query], n_results=n_results, filters=[filters])[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        n_results: int = 5,
+        filters: Optional[Sequence[Optional[Dict]]] = None,
+        batch_size: int = 256,
+    ) -> List[Dict]:
+        """
+        여러 쿼리를 한 번에 검색합니다.
+
+        캐시에 없는 쿼리는 한 번에 임베딩하고, 같은 필터를 쓰는 쿼리끼리
+        묶어 ChromaDB에 한 번씩만 질의합니다.
+
+        Args:
+            queries: 검색 쿼리 목록
+            n_results: 쿼리당 반환할 결과 수
+            filters: 쿼리별 필터 목록 (search()의 platform_filter, subject_filter,
+                subject_filter_mode, speaker_sex_filter, style_filter 키를 갖는 dict 또는 None).
+                None이면 모든 쿼리를 필터 없이 검색
+            batch_size: ChromaDB에 한 번에 보낼 최대 쿼리 수
+
+        Returns:
+            입력 순서와 같은 검색 결과 리스트 (각 항목은 search() 반환 형식)
+        """
+        if filters is None:
+            filters = [None] * len(queries)
+        if len(filters) != len(queries):
+            raise ValueError("filters must have the same length as queries")
+
+        results: List[Optional[Dict]] = [None] * len(queries)
+        normalized = [normalize_query(query) for query in queries]
+
+        # 결과 캐시에 없는 쿼리를 where 조건별로 묶음
+        groups: Dict[str, Dict] = {}
+        result_keys: Dict[int, Tuple] = {}
+        for i, (query, query_filters) in enumerate(zip(normalized, filters)):
+            query_filters = {k: v for k, v in (query_filters or {}).items() if v}
+            result_key = (query, n_results, tuple(sorted(query_filters.items())))
+            cached = self.result_cache.get(result_key)
+            if cached is not None:
+                results[i] = copy.deepcopy(cached)
+                continue
+
+            result_keys[i] = result_key
+            where = self.build_where(
+                **{"subject_filter_mode": self.subject_filter_mode, **query_filters}
+            )
+            group = groups.setdefault(
+                json.dumps(where, sort_keys=True), {"where": where, "items": []}
+            )
+            group["items"].append((i, result_key))
+
+        n_fetch = n_results * HYBRID_FETCH_FACTOR if self.search_mode == "hybrid" else n_results
+
+        # 하이브리드 모드: BM25 신뢰도가 높은 쿼리는 벡터 검색 없이 어휘 검색 결과로 응답
+        lexical_ids: Dict[int, List[str]] = {}
+        ranked: Dict[int, Tuple[List[str], Dict[str, float]]] = {}
+        if self.search_mode == "hybrid":
+            index = self.get_lexical_index()
+            for group in groups.values():
+                remaining = []
+                for i, result_key in group["items"]:
+                    ids, _, confidences = index.search(
+                        normalized[i], n_results * HYBRID_FETCH_FACTOR, group["where"]
+                    )
+                    if (
+                        self.lexical_confidence is not None
+                        and len(ids) >= n_results
+                        and confidences[n_results - 1] >= self.lexical_confidence
+                    ):
+                        ranked[i] = (ids[:n_results], {})
+                        self.search_stats["lexical_fast_path"] += 1
+                    else:
+                        lexical_ids[i] = ids
+                        remaining.append((i, result_key))
+                group["items"] = remaining
+
+        # 벡터 검색까지 가는 쿼리만 임베딩
+        pending = [i for group in groups.values() for i, _ in group["items"]]
+        embeddings = dict(zip(pending, self.embed_queries([normalized[i] for i in pending])))
+
+        records: Dict[str, Tuple[str, Dict]] = {}
+        for group in groups.values():
+            items = group["items"]
+            for start in range(0, len(items), batch_size):
+                batch = items[start : start + batch_size]
+                response = self._query([embeddings[i] for i, _ in batch], n_fetch, group["where"])
+                for j, (i, result_key) in enumerate(batch):
+                    if self.search_mode != "hybrid":
+                        results[i] = {
+                            key: [response[key][j]] if response.get(key) else None
+                            for key in ("ids", "documents", "metadatas", "distances")
+                        }
+                        continue
+
+                    vector_ids = response["ids"][j]
+                    distances = dict(zip(vector_ids, response["distances"][j]))
+                    for doc_id, document, metadata in zip(
+                        vector_ids, response["documents"][j], response["metadatas"][j]
+                    ):
+                        records[doc_id] = (document, metadata)
+
+                    fused = reciprocal_rank_fusion([vector_ids, lexical_ids[i]])[:n_results]
+                    ranked[i] = (fused, distances)
+                    self.search_stats["hybrid"] += 1
+
+        # 어휘 검색으로만 찾은 문서는 본문/메타데이터를 컬렉션에서 가져오고,
+        # 결합한 결과는 거리 임계값을 쓸 수 있도록 저장된 벡터와 쿼리 임베딩으로 거리를 계산
+        # (벡터는 배치 전체에서 한 번에 가져옴, 빠른 경로 결과는 거리 없음)
+        missing = [doc_id for ids, _ in ranked.values() for doc_id in ids if doc_id not in records]
+        records.update(self._fetch_records(missing))
+        unknown = [
+            doc_id
+            for i, (ids, distances) in ranked.items()
+            if i in embeddings
+            for doc_id in ids
+            if doc_id not in distances
+        ]
+        rows, vectors = self._fetch_vectors(unknown)
+        for i, (ids, distances) in ranked.items():
+            if i in embeddings:
+                unknown = [doc_id for doc_id in ids if doc_id not in distances]
+                distances.update(self._cosine_distances(embeddings[i], unknown, rows, vectors))
+            hits = [doc_id for doc_id in ids if doc_id in records]
+            results[i] = {
+                "ids": [hits],
+                "documents": [[records[doc_id][0] for doc_id in hits]],
+                "metadatas": [[records[doc_id][1] for doc_id in hits]],
+                "distances": [[distances.get(doc_id) for doc_id in hits]],
+            }
+
+        for i, result_key in result_keys.items():
+            self.result_cache.put(result_key, copy.deepcopy(results[i]))
 
         return results
 
-    def get_similar_conversations(self, query: str, n_results: int = 3) -> List[Dict]:
+    def _query(
+        self, query_embeddings: List[List[float]], n_results: int, where: Optional[Dict]
+    ) -> Dict:
+        """임베딩으로 검색합니다. 양자화 모드면 양자화 인덱스를 사용합니다."""
+        if not self.quantization:
+            return self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where,
+                include=["documents", "metadatas", "distances"],
+            )
+
+        index = self.get_quantized_index()
+        ids, distances = index.search(query_embeddings, n_results, where)
+
+        # 문서 본문은 인덱스에 두지 않고 결과 ID만 컬렉션에서 가져옴
+        found = self._fetch_records([doc_id for row in ids for doc_id in row])
+
+        return {
+            "ids": ids,
+            "documents": [[found[doc_id][0] for doc_id in row] for row in ids],
+            "metadatas": [[found[doc_id][1] for doc_id in row] for row in ids],
+            "distances": distances,
+        }
+
+    def _fetch_records(self, ids: Sequence[str]) -> Dict[str, Tuple[str, Dict]]:
+        """문서 ID별 (본문, 메타데이터)를 컬렉션에서 가져옵니다."""
+        unique_ids = list(dict.fromkeys(ids))
+        if not unique_ids:
+            return {}
+        page = self.collection.get(ids=unique_ids, include=["documents", "metadatas"])
+        return {
+            doc_id: (document, metadata)
+            for doc_id, document, metadata in zip(
+                page["ids"], page["documents"], page["metadatas"]
+            )
+        }
+
+    def _fetch_vectors(self, ids: Sequence[str]) -> Tuple[Dict[str, int], np.ndarray]:
+        """
+        문서 벡터를 컬렉션에서 한 번에 가져옵니다.
+
+        Returns:
+            (문서 ID -> 행 번호, 행별로 정규화한 벡터 행렬)
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        if not unique_ids:
+            return {}, np.zeros((0, 0), dtype=np.float32)
+        page = self.collection.get(ids=unique_ids, include=["embeddings"])
+        if not len(page["ids"]):
+            return {}, np.zeros((0, 0), dtype=np.float32)
+
+        vectors = np.asarray(page["embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        rows = {doc_id: row for row, doc_id in enumerate(page["ids"])}
+        return rows, vectors / np.where(norms > 0, norms, 1.0)
+
+    @staticmethod
+    def _cosine_distances(
+        query_embedding: Sequence[float],
+        ids: Sequence[str],
+        rows: Dict[str, int],
+        vectors: np.ndarray,
+    ) -> Dict[str, float]:
+        """
+        _fetch_vectors로 가져온 문서 벡터와 쿼리 임베딩의 코사인 거리
+        (컬렉션의 hnsw:space와 같은 척도, 벡터가 없는 문서는 빠짐)
+        """
+        known = [doc_id for doc_id in dict.fromkeys(ids) if doc_id in rows]
+        if not known:
+            return {}
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        similarities = vectors[[rows[doc_id] for doc_id in known]] @ query
+        return {
+            doc_id: float(1.0 - similarity) for doc_id, similarity in zip(known, similarities)
+        }
+
+    def collection_fingerprint(self) -> str:
+        """
+        컬렉션 문서 ID와 내용 해시 목록의 해시
+        (양자화/어휘 인덱스가 최신인지 확인하는 데 사용, 같은 ID의 내용이 바뀌어도 달라짐)
+        """
+        digest = hashlib.sha256()
+        for doc_id, content_hash in sorted(self.get_content_hashes().items()):
+            digest.update(doc_id.encode("utf-8"))
+            digest.update(b"\t")
+            digest.update(content_hash.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def get_quantized_index(self, page_size: int = 5000) -> QuantizedIndex:
+        """
+        양자화 인덱스를 반환합니다.
+        저장된 인덱스가 현재 컬렉션과 같으면 불러오고, 다르면 컬렉션 벡터로 다시 만듭니다.
+        """
+        if self._quantized_index is not None:
+            return self._quantized_index
+
+        index_dir = (
+            Path(self.persist_dir) / "quantized" / f"{self.collection_name}_{self.quantization}"
+        )
+        fingerprint = self.collection_fingerprint()
+
+        if (index_dir / "meta.json").exists():
+            index = QuantizedIndex.load(str(index_dir))
+            if index.fingerprint == fingerprint:
+                self._quantized_index = index
+                return index
+
+        print(f"Building {self.quantization} quantized index...")
+        index = QuantizedIndex(self.quantization)
+        offset = 0
+        while True:
+            page = self.collection.get(
+                limit=page_size, offset=offset, include=["embeddings", "metadatas"]
+            )
+            index.add(page["ids"], page["embeddings"], page["metadatas"])
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+        index.fingerprint = fingerprint
+        index.save(str(index_dir))
+        print(f"Quantized index: {len(index)} vectors, {index.nbytes / 1024 / 1024:.1f} MB")
+
+        self._quantized_index = index
+        return index
+
+    def get_lexical_index(self, page_size: int = 5000) -> LexicalIndex:
+        """
+        어휘(BM25) 인덱스를 반환합니다.
+        저장된 인덱스가 현재 컬렉션과 같으면 불러오고, 다르면 컬렉션 문서로 다시 만듭니다.
+        """
+        if self._lexical_index is not None:
+            return self._lexical_index
+
+        index_dir = Path(self.persist_dir) / "lexical" / self.collection_name
+        fingerprint = self.collection_fingerprint()
+
+        if (index_dir / "meta.json").exists():
+            index = LexicalIndex.load(str(index_dir))
+            if index.fingerprint == fingerprint:
+                self._lexical_index = index
+                return index
+
+        print("Building lexical index...")
+        index = LexicalIndex()
+        offset = 0
+        while True:
+            page = self.collection.get(
+                limit=page_size, offset=offset, include=["documents", "metadatas"]
+            )
+            index.add(page["ids"], page["documents"], page["metadatas"])
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+        index.fingerprint = fingerprint
+        index.save(str(index_dir))
+        print(f"Lexical index: {len(index)} documents")
+
+        self._lexical_index = index
+        return index
+
+    def embed_query(self, query: str) -> List[float]:
+        """쿼리 임베딩을 반환합니다. 최근에 쓴 쿼리는 LRU 캐시에서 꺼냅니다."""
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: Sequence[str]) -> List[List[float]]:
+        """
+        쿼리 임베딩 목록을 반환합니다.
+        LRU 캐시에 없는 쿼리만 모아 임베딩 함수를 한 번 호출합니다.
+        """
+        return self.query_embedder(queries)
+
+    def collection_version(self) -> str:
+        """
+        기록된 컬렉션 버전을 반환합니다. (기록이 없으면 새로 기록)
+        컬렉션을 바꿀 때마다 달라지며, 내용 전체를 읽는 collection_fingerprint()와 달리
+        persist_dir의 작은 파일만 읽습니다.
+        """
+        version = read_collection_version(self.persist_dir, self.collection_name)
+        return version or self._record_collection_version()
+
+    def _record_collection_version(self) -> str:
+        """새 컬렉션 버전을 persist_dir에 기록합니다."""
+        path = Path(self.persist_dir) / COLLECTION_VERSION_FILENAME
+        versions = _load_collection_versions(path)
+        versions[self.collection_name] = uuid.uuid4().hex
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(versions, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return versions[self.collection_name]
+
+    def invalidate_search_cache(self, include_embeddings: bool = False) -> None:
+        """
+        컬렉션이 바뀌었을 때 검색 결과 캐시를 비우고 새 컬렉션 버전을 기록합니다.
+        양자화/어휘 인덱스는 다음 검색 때 다시 불러옵니다.
+
+        Args:
+            include_embeddings: 쿼리 임베딩 캐시도 비울지 여부
+                (쿼리 임베딩은 컬렉션 내용과 무관하므로 컬렉션을 새로 만들 때만 비움)
+        """
+        self.result_cache.clear()
+        self._filter_counts.clear()
+        self._quantized_index = None
+        self._lexical_index = None
+        self._record_collection_version()
+        if include_embeddings:
+            self.query_embedder.cache.clear()
+
+    def get_similar_conversations(self, query: str, n_results: int = 3, **filters) -> List[Dict]:
         """
         사용자 쿼리와 유사한 대화를 반환합니다.
 
         Args:
             query: 사용자 입력
             n_results: 반환할 대화 수
+            filters: search()의 필터 인자
 
         Returns:
             유사 대화 리스트
         """
-        results = self.search(query, n_results=n_results)
+        return self.to_conversations(self.search(query, n_results=n_results, **filters))
 
+    def get_similar_conversations_batch(
+        self, queries: Sequence[str], n_results: int = 3
+    ) -> List[List[Dict]]:
+        """
+        여러 쿼리의 유사 대화를 한 번에 반환합니다.
+
+        Args:
+            queries: 사용자 입력 목록
+            n_results: 쿼리당 반환할 대화 수
+
+        Returns:
+            입력 순서와 같은 유사 대화 리스트 목록
+        """
+        return [
+            self.to_conversations(results)
+            for results in self.search_batch(queries, n_results=n_results)
+        ]
+
+    @staticmethod
+    def to_conversations(results: Dict) -> List[Dict]:
+        """단일 쿼리 검색 결과를 대화 dict 리스트로 변환합니다."""
         conversations = []
 
         if results["documents"] and results["documents"][0]:
             for i, doc in enumerate(results["documents"][0]):
                 conv = {
+                    "id": results["ids"][0][i],
                     "dialogue": doc,
                     "metadata": (
                         results["metadatas"][0][i] if results["metadatas"] else {}
@@ -184,6 +940,11 @@ class ChromaService:
 
         return conversations
 
+    def delete_where(self, where: Dict) -> None:
+        """조건에 맞는 문서를 삭제합니다."""
+        self.collection.delete(where=where)
+        self.invalidate_search_cache()
+
     def clear_collection(self) -> None:
         """컬렉션의 모든 문서를 삭제합니다."""
         self.client.delete_collection(self.collection_name)
@@ -192,6 +953,7 @@ class ChromaService:
             embedding_function=self.embedding_fn,
             metadata={"hnsw:space": "cosine"},
         )
+        self.invalidate_search_cache(include_embeddings=True)
         print(f"Collection '{self.collection_name}' cleared")
 
     def get_stats(self) -> Dict:
@@ -200,16 +962,34 @@ class ChromaService:
             "collection_name": self.collection_name,
             "document_count": self.collection.count(),
             "persist_dir": self.persist_dir,
+            "query_embedding_cache": self.query_embedder.cache.stats(),
+            "result_cache": self.result_cache.stats(),
+            "search_stats": dict(self.search_stats),
+            "embedding_cache": (
+                dict(self.embedding_cache.stats, entries=len(self.embedding_cache))
+                if self.embedding_cache
+                else None
+            ),
         }
 
 
-def load_and_index_data(data_path: str, clear_existing: bool = False) -> ChromaService:
+def load_and_index_data(
+    data_path: str,
+    clear_existing: bool = False,
+    window_size: Optional[int] = DEFAULT_WINDOW_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    incremental: bool = False,
+) -> ChromaService:
     """
     정제된 데이터를 로드하여 ChromaDB에 인덱싱합니다.
 
     Args:
         data_path: 정제된 데이터 파일 경로
         clear_existing: 기존 데이터 삭제 여부
+        window_size: 청크당 턴 수 (None이면 대화 전체를 하나의 문서로 인덱싱)
+        overlap: 인접 청크 간 겹치는 턴 수
+        incremental: True이면 문서 ID별 내용 해시로 기존 컬렉션과 비교하여
+            새로운/바뀐 문서만 임베딩하고, 사라진 문서는 삭제
 
     Returns:
         ChromaService 인스턴스
@@ -220,6 +1000,18 @@ def load_and_index_data(data_path: str, clear_existing: bool = False) -> ChromaS
     if clear_existing:
         service.clear_collection()
 
+    def load_conversations() -> Iterable[Dict]:
+        conversations = iter_processed_data(data_path)
+        if window_size:
+            conversations = iter_chunks(conversations, window_size, overlap)
+        return conversations
+
+    # 증분 모드: 바뀐 문서만 upsert
+    if incremental:
+        print(f"Syncing conversations from {data_path}")
+        service.sync_conversations(load_conversations())
+        return service
+
     # 이미 데이터가 있으면 건너뛰기
     if service.collection.count() > 0:
         print(
@@ -227,45 +1019,180 @@ def load_and_index_data(data_path: str, clear_existing: bool = False) -> ChromaS
         )
         return service
 
-    # 데이터 로드
-    with open(data_path, "r", encoding="utf-8") as f:
-        conversations = json.load(f)
+    # 데이터를 한 건씩 읽으면서 배치 단위로 인덱싱
+    print(f"Loading conversations from {data_path}")
+    service.add_conversations(load_conversations())
+
+    return service
+
 
-    print(f"Loaded {len(conversations)} conversations from {data_path}")
+def _load_shard_state(path: Path) -> Dict:
+    """인덱싱된 샤드 기록을 읽습니다. {collection_name: {shard_id: sha256}}"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-    # 인덱싱
-    service.add_conversations(conversations)
+
+def index_shards(
+    shards_dir: str,
+    platforms: Optional[List[str]] = None,
+    categories: Optional[List[int]] = None,
+    force: bool = False,
+    prune: bool = False,
+    window_size: Optional[int] = DEFAULT_WINDOW_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    service: Optional[ChromaService] = None,
+) -> ChromaService:
+    """
+    샤드 매니페스트를 기준으로 바뀐 샤드만 다시 인덱싱합니다.
+
+    인덱싱한 샤드의 내용 해시를 persist_dir의 indexed_shards.json에 기록하고,
+    해시가 같은 샤드는 건너뜁니다. 바뀐 샤드는 해당 샤드의 문서와 비교하여
+    새로운/바뀐 문서만 임베딩하고 사라진 문서는 삭제합니다.
+
+    Args:
+        shards_dir: 샤드 디렉토리 경로
+        platforms: 인덱싱할 플랫폼 목록 (None이면 전체)
+        categories: 인덱싱할 카테고리 번호 목록 (None이면 전체)
+        force: True이면 해시가 같아도 다시 인덱싱
+        prune: True이면 선택되지 않았거나 사라진 샤드의 문서를 삭제
+        window_size: 청크당 턴 수 (None이면 대화 전체를 하나의 문서로 인덱싱)
+        overlap: 인접 청크 간 겹치는 턴 수
+        service: 사용할 ChromaService (None이면 새로 생성)
+
+    Returns:
+        ChromaService 인스턴스
+    """
+    if service is None:
+        service = ChromaService()
+
+    manifest = load_shard_manifest(shards_dir)
+    selected = select_shards(manifest, platforms, categories)
+
+    state_path = Path(service.persist_dir) / SHARD_STATE_FILENAME
+    state = _load_shard_state(state_path)
+    indexed = state.setdefault(service.collection_name, {})
+
+    # 선택되지 않았거나 매니페스트에서 사라진 샤드 정리
+    stale = [
+        sid
+        for sid in indexed
+        if sid not in manifest["shards"] or (prune and sid not in selected)
+    ]
+    for sid in stale:
+        service.delete_where({"shard": sid})
+        del indexed[sid]
+        print(f"Removed shard {sid}")
+
+    for sid in selected:
+        entry = manifest["shards"][sid]
+        if not force and indexed.get(sid) == entry["sha256"]:
+            print(f"Shard {sid} unchanged. Skipping.")
+            continue
+
+        # 샤드 안에서도 바뀐 문서만 임베딩
+        conversations = iter_shard(shards_dir, manifest, sid)
+        if window_size:
+            conversations = iter_chunks(conversations, window_size, overlap)
+        result = service.sync_conversations(
+            conversations, extra_metadata={"shard": sid}, where={"shard": sid}
+        )
+        indexed[sid] = entry["sha256"]
+        print(f"Indexed shard {sid}: {result}")
+
+        # 중간에 실패해도 완료된 샤드는 다시 인덱싱하지 않도록 매번 기록
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
 
     return service
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령행 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="ChromaDB 인덱싱 및 테스트 검색")
+    parser.add_argument(
+        "--data",
+        type=str,
+        default=None,
+        help="정제된 데이터 경로 (기본값: preprocess/processed/chat_data_cleaned_v2.*)",
+    )
+    parser.add_argument(
+        "--platform",
+        action="append",
+        dest="platforms",
+        help="샤드 인덱싱 시 포함할 플랫폼 (여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "--category",
+        action="append",
+        type=int,
+        dest="categories",
+        help="샤드 인덱싱 시 포함할 카테고리 번호 (여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="샤드 해시가 같아도 다시 인덱싱"
+    )
+    parser.add_argument(
+        "--prune", action="store_true", help="선택되지 않은 샤드의 문서 삭제"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="컬렉션을 비우고 전체를 다시 임베딩 (기본값: 바뀐 문서만 upsert)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """테스트 및 인덱싱 실행"""
+    args = parse_args(argv)
     script_dir = Path(__file__).parent
-    data_path = (
-        script_dir.parent / "preprocess" / "processed" / "chat_data_cleaned_v2.json"
-    )
+    processed_dir = script_dir.parent / "preprocess" / "processed"
+
+    if args.data:
+        data_path = Path(args.data)
+    else:
+        # 샤드(.shards), 스트리밍 형식(.jsonl), 컬럼 저장소(.columnar),
+        # 기존 JSON 배열 순으로 사용
+        for suffix in (".shards", ".jsonl", ".columnar", ".json"):
+            data_path = processed_dir / f"chat_data_cleaned_v2{suffix}"
+            if data_path.exists():
+                break
 
     if not data_path.exists():
         print(f"Data file not found: {data_path}")
         print("Please run data_preprocessor.py first.")
         return
 
-    # 데이터 인덱싱
-    service = load_and_index_data(str(data_path), clear_existing=True)
+    # 데이터 인덱싱 (샤드는 바뀐 샤드만, 그 외에는 바뀐 문서만 upsert)
+    if is_sharded(str(data_path)):
+        service = index_shards(
+            str(data_path),
+            platforms=args.platforms,
+            categories=args.categories,
+            force=args.force,
+            prune=args.prune,
+        )
+    elif args.rebuild:
+        service = load_and_index_data(str(data_path), clear_existing=True)
+    else:
+        service = load_and_index_data(str(data_path), incremental=True)
 
     # 테스트 검색
     print("\n" + "=" * 60)
     print("테스트 검색")
     print("=" * 60)
 
-    test_queries = ["안녕하세요", "오늘 뭐해?", "밥 먹었어?"]
-
-    for query in test_queries:
+    for query in TEST_QUERIES:
         print(f"\n쿼리: '{query}'")
         results = service.get_similar_conversations(query, n_results=2)
         for i, conv in enumerate(results):
-            print(f"\n  결과 {i+1} (거리: {conv['distance']:.4f}):")
+            distance = "N/A" if conv["distance"] is None else f"{conv['distance']:.4f}"
+            print(f"\n  결과 {i+1} (거리: {distance}):")
             print(f"    플랫폼: {conv['metadata'].get('platform', 'N/A')}")
             print(f"    주제: {conv['metadata'].get('subject', 'N/A')}")
             dialogue_preview = (
@@ -0,0 +1,191 @@
+"""
+RAG 컨텍스트 조립 모듈
+
+검색된 대화를 그대로 이어 붙이면 시스템 프롬프트 길이가 대화마다 크게 달라지고,
+긴 예시 하나가 OpenAI 응답 지연과 비용을 키웁니다. 이 모듈은 검색 결과를
+토큰 예산 안에서 컨텍스트 문자열로 조립합니다.
+
+- 거리가 임계값보다 먼 결과는 버림 (거리가 없는 결과는 유지)
+- 예시마다 쿼리와 문자 bigram이 가장 많이 겹치는 발화를 중심으로 max_turns개 발화만 남김
+- 예산을 넘는 예시는 중심에서 먼 발화부터 줄이고, 그래도 넘으면 건너뜀
+- 이전 턴에 이미 넣은 예시(repeat 표시)는 repeat_turns개 발화만 남긴 한 줄 참조로 넣음
+- 실제로 넣은 토큰 수를 보고해 지연 시간과 품질 사이를 조정할 수 있게 함
+
+토큰 수는 tiktoken이 설치되어 있으면 모델 토크나이저로, 없으면 문자 수 기반
+추정치(ASCII 4자당 1토큰, 한글 등 그 외 문자 1자당 1토큰)로 셉니다.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import (
+    CHAT_MODEL,
+    RAG_CONTEXT_TOKEN_BUDGET,
+    RAG_MAX_DISTANCE,
+    RAG_MAX_TURNS_PER_EXAMPLE,
+    RAG_REPEAT_TURNS,
+)
+from services.lexical_index import char_ngrams
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 예시 사이 구분자
+EXAMPLE_SEPARATOR = "\n\n"
+
+
+class TokenCounter:
+    """토큰 수 계산기 (tiktoken이 없으면 문자 수로 추정)"""
+
+    def __init__(self, model: str = CHAT_MODEL):
+        """
+        Args:
+            model: 토크나이저를 고를 모델 이름
+        """
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    self.encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self.encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # 토크나이저 파일을 받지 못하는 환경 등에서는 추정치 사용
+                print(f"tiktoken unavailable, using heuristic token count: {e}")
+        self.method = "tiktoken" if self.encoding is not None else "heuristic"
+
+    def count(self, text: str) -> int:
+        """텍스트의 토큰 수"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        ascii_chars = sum(1 for c in text if c.isascii())
+        return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def relevant_window(lines: Sequence[str], query: str, max_turns: int) -> Tuple[int, int, int]:
+    """
+    쿼리와 가장 관련 있는 발화를 중심으로 max_turns개 발화 범위를 찾습니다.
+
+    Returns:
+        (시작 인덱스, 끝 인덱스(미포함), 중심 발화 인덱스)
+    """
+    query_grams = set(char_ngrams(query))
+    overlaps = [len(query_grams & set(char_ngrams(line))) for line in lines]
+    center = max(range(len(lines)), key=lambda i: overlaps[i]) if lines else 0
+
+    # 겹치는 발화가 없으면 대화 앞부분 사용
+    if not lines or overlaps[center] == 0:
+        return 0, min(len(lines), max_turns), 0
+
+    start = max(0, min(center - (max_turns - 1) // 2, len(lines) - max_turns))
+    return start, min(len(lines), start + max_turns), center
+
+
+class ContextAssembler:
+    """검색 결과를 토큰 예산 안에서 컨텍스트 문자열로 조립"""
+
+    def __init__(
+        self,
+        token_budget: int = RAG_CONTEXT_TOKEN_BUDGET,
+        max_distance: Optional[float] = RAG_MAX_DISTANCE,
+        max_turns: int = RAG_MAX_TURNS_PER_EXAMPLE,
+        min_turns: int = 2,
+        repeat_turns: int = RAG_REPEAT_TURNS,
+        counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Args:
+            token_budget: 컨텍스트 전체 최대 토큰 수
+            max_distance: 이보다 거리가 먼 결과는 버림 (None이면 거르지 않음)
+            max_turns: 예시당 최대 발화 수
+            min_turns: 예산에 맞추려고 줄일 때 남길 최소 발화 수
+            repeat_turns: 이전 턴에 넣은 예시를 참조로 넣을 때 남길 발화 수
+            counter: 토큰 수 계산기 (None이면 CHAT_MODEL 기준으로 생성)
+        """
+        self.token_budget = token_budget
+        self.max_distance = max_distance
+        self.max_turns = max_turns
+        self.min_turns = min_turns
+        self.repeat_turns = repeat_turns
+        self.counter = counter or TokenCounter()
+
+    @staticmethod
+    def format_example(index: int, item: Dict, lines: Sequence[str]) -> str:
+        """예시 하나를 컨텍스트 형식으로 만듭니다."""
+        subject = (item.get("metadata") or {}).get("subject", "Unknown")
+        if item.get("repeat"):
+            return f"예시 {index} (앞서 참고한 대화): " + " / ".join(lines)
+        return f"예시 {index} (주제: {subject}):\n" + "\n".join(lines)
+
+    def assemble(self, query: str, results: List[Dict]) -> Dict:
+        """
+        검색 결과를 컨텍스트로 조립합니다.
+
+        Args:
+            query: 검색 쿼리 (예시에서 남길 발화를 고르는 데 사용)
+            results: 가까운 순 검색 결과 (id, dialogue, metadata, distance dict 리스트)
+
+        Returns:
+            {
+                "context": 컨텍스트 문자열 (넣을 예시가 없으면 None),
+                "tokens": 컨텍스트 토큰 수,
+                "examples": 넣은 예시 수,
+                "ids": 넣은 예시의 문서 ID 목록,
+                "repeats": 한 줄 참조로 넣은 예시 수,
+                "dropped_distance": 거리 임계값으로 버린 결과 수,
+                "dropped_budget": 예산이 모자라 버린 결과 수,
+                "trimmed_turns": 잘라낸 발화 수,
+                "token_counter": 토큰 계산 방식 (tiktoken, heuristic),
+            }
+        """
+        parts: List[str] = []
+        report = {
+            "context": None,
+            "tokens": 0,
+            "examples": 0,
+            "ids": [],
+            "repeats": 0,
+            "dropped_distance": 0,
+            "dropped_budget": 0,
+            "trimmed_turns": 0,
+            "token_counter": self.counter.method,
+        }
+
+        for item in results:
+            distance = item.get("distance")
+            has_distance = self.max_distance is not None and distance is not None
+            if has_distance and distance > self.max_distance:
+                report["dropped_distance"] += 1
+                continue
+
+            lines = [line for line in item.get("dialogue", "").split("\n") if line.strip()]
+            if not lines:
+                continue
+            max_turns = self.repeat_turns if item.get("repeat") else self.max_turns
+            start, end, center = relevant_window(lines, query, max_turns)
+
+            # 예산을 넘으면 중심 발화에서 먼 쪽부터 한 발화씩 줄임
+            while True:
+                text = self.format_example(len(parts) + 1, item, lines[start:end])
+                cost = self.counter.count(EXAMPLE_SEPARATOR + text if parts else text)
+                if report["tokens"] + cost <= self.token_budget:
+                    parts.append(text)
+                    report["ids"].append(item["id"])
+                    report["repeats"] += 1 if item.get("repeat") else 0
+                    report["tokens"] += cost
+                    report["trimmed_turns"] += len(lines) - (end - start)
+                    break
+                if end - start <= min(self.min_turns, max_turns):
+                    report["dropped_budget"] += 1
+                    break
+                if center - start > end - 1 - center:
+                    start += 1
+                else:
+                    end -= 1
+
+        if parts:
+            report["context"] = EXAMPLE_SEPARATOR.join(parts)
+            report["examples"] = len(parts)
+        return report
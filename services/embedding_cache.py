@@ -0,0 +1,229 @@
+"""
+임베딩 디스크 캐시 모듈
+
+문장 임베딩 결과를 (모델 이름, 텍스트 해시) 기준으로 디스크에 저장해 두고,
+같은 텍스트를 다시 임베딩할 때 재사용합니다. 컬렉션을 다시 만들거나
+새 persist_dir로 옮겨도 이미 계산한 벡터는 다시 계산하지 않습니다.
+
+저장 구조 (cache_dir/{모델 이름}/):
+- meta.json: 모델 이름, 벡터 차원
+- vectors.f32: float32 벡터를 이어 붙인 추가 전용(append-only) 파일 (mmap으로 읽음)
+- index.tsv: "텍스트 해시<TAB>슬롯 번호" 추가 전용 인덱스
+
+vectors.f32가 max_bytes를 넘으면 최근에 사용하지 않은 항목부터 버리고
+파일을 다시 씁니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+# 기본 캐시 크기 상한 (vectors.f32 기준)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# 캐시 정리 시 남길 크기 비율
+_COMPACT_RATIO = 0.75
+
+
+def text_hash(text: str) -> str:
+    """텍스트 해시 (캐시 키)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class EmbeddingCache:
+    """모델별 임베딩 디스크 캐시"""
+
+    def __init__(self, cache_dir: str, model_name: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 캐시 루트 디렉토리 (모델별 하위 디렉토리 생성)
+            model_name: 임베딩 모델 이름
+            max_bytes: 벡터 파일 최대 크기 (넘으면 오래 안 쓴 항목부터 삭제)
+        """
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.dir = Path(cache_dir) / re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self.vectors_path = self.dir / "vectors.f32"
+        self.index_path = self.dir / "index.tsv"
+        self.meta_path = self.dir / "meta.json"
+
+        self._lock = threading.Lock()
+        self._slots: Dict[str, int] = {}
+        self._last_used: Dict[str, int] = {}
+        self._tick = 0
+        self._matrix: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+        self._load()
+
+    def _load(self) -> None:
+        """메타데이터와 인덱스를 읽고 벡터 파일을 mmap으로 엽니다."""
+        if self.meta_path.exists():
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("model_name") != self.model_name:
+                raise ValueError(
+                    f"Embedding cache at {self.dir} belongs to {meta.get('model_name')}"
+                )
+            self.dim = meta["dim"]
+
+        if self.dim is None or not self.index_path.exists():
+            return
+
+        row_count = self.vectors_path.stat().st_size // (4 * self.dim)
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, slot = line.rstrip("\n").partition("\t")
+                # 벡터 기록이 끝나기 전에 중단된 항목은 무시
+                if slot and int(slot) < row_count:
+                    self._slots[key] = int(slot)
+
+        # 재시작 후에는 먼저 기록된 항목을 오래된 것으로 간주
+        self._last_used = dict(self._slots)
+        self._tick = row_count
+        self._remap()
+
+    def _remap(self) -> None:
+        """벡터 파일을 읽기 전용 mmap으로 다시 엽니다."""
+        if self.dim is None or not self.vectors_path.exists():
+            self._matrix = None
+            return
+        rows = self.vectors_path.stat().st_size // (4 * self.dim)
+        if rows == 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+        )
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """텍스트별 캐시된 벡터를 반환합니다. 없으면 None."""
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = text_hash(text)
+                slot = self._slots.get(key)
+                if slot is None or self._matrix is None or slot >= len(self._matrix):
+                    self.stats["misses"] += 1
+                    results.append(None)
+                    continue
+                self.stats["hits"] += 1
+                self._tick += 1
+                self._last_used[key] = self._tick
+                results.append(np.array(self._matrix[slot]))
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """벡터를 캐시에 추가합니다. 이미 있는 텍스트는 건너뜁니다."""
+        if not texts:
+            return
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model_name": self.model_name, "dim": self.dim}, f)
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim mismatch: {matrix.shape[1]} != {self.dim}")
+
+            rows = []
+            keys = []
+            for text, row in zip(texts, matrix):
+                key = text_hash(text)
+                if key in self._slots or key in keys:
+                    continue
+                keys.append(key)
+                rows.append(row)
+            if not rows:
+                return
+
+            start = self.vectors_path.stat().st_size // (4 * self.dim) if self.vectors_path.exists() else 0
+
+            # 벡터를 먼저 기록한 뒤 인덱스를 기록 (중간에 중단되어도 인덱스가 잘못된 벡터를 가리키지 않음)
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.stack(rows).astype(np.float32).tobytes())
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                for offset, key in enumerate(keys):
+                    f.write(f"{key}\t{start + offset}\n")
+
+            for offset, key in enumerate(keys):
+                self._tick += 1
+                self._slots[key] = start + offset
+                self._last_used[key] = self._tick
+
+            self._remap()
+
+            if self.vectors_path.stat().st_size > self.max_bytes:
+                self._compact()
+
+    def _compact(self) -> None:
+        """최근에 사용한 항목만 남기고 벡터 파일과 인덱스를 다시 씁니다."""
+        row_bytes = 4 * self.dim
+        keep_rows = max(1, int(self.max_bytes * _COMPACT_RATIO) // row_bytes)
+        keep = sorted(self._slots, key=self._last_used.get, reverse=True)[:keep_rows]
+        keep.sort(key=self._slots.get)
+
+        tmp_vectors = self.vectors_path.with_name("vectors.f32.tmp")
+        tmp_index = self.index_path.with_name("index.tsv.tmp")
+        with open(tmp_vectors, "wb") as vf, open(tmp_index, "w", encoding="utf-8") as idx:
+            for new_slot, key in enumerate(keep):
+                vf.write(np.asarray(self._matrix[self._slots[key]], dtype=np.float32).tobytes())
+                idx.write(f"{key}\t{new_slot}\n")
+
+        self._matrix = None
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_index, self.index_path)
+
+        self.stats["evicted"] += len(self._slots) - len(keep)
+        self._slots = {key: slot for slot, key in enumerate(keep)}
+        self._last_used = {key: self._last_used[key] for key in keep}
+        self._remap()
+
+
+class CachedEmbeddingFunction(EmbeddingFunction):
+    """EmbeddingCache를 앞에 둔 임베딩 함수 래퍼"""
+
+    def __init__(self, base: EmbeddingFunction, cache: EmbeddingCache):
+        """
+        Args:
+            base: 실제 임베딩을 계산하는 함수 (예: SentenceTransformerEmbeddingFunction)
+            cache: 임베딩 캐시
+        """
+        self.base = base
+        self.cache = cache
+
+    def __call__(self, input):
+        texts = list(input)
+        cached = self.cache.get_many(texts)
+
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            computed = self.base([texts[i] for i in missing])
+            computed = [np.asarray(vector, dtype=np.float32) for vector in computed]
+            self.cache.put_many([texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                cached[i] = vector
+
+        return cached
+
+    # 컬렉션에 기록된 임베딩 함수 설정과 충돌하지 않도록 원래 함수의 이름/설정을 사용
+    def name(self) -> str:
+        return self.base.name()
+
+    def get_config(self) -> Dict:
+        return self.base.get_config()
@@ -0,0 +1,263 @@
+"""
+인덱스 아티팩트 내보내기/가져오기 모듈
+
+배포할 때마다 chroma_db 디렉토리를 통째로 옮기거나 전체 말뭉치를 다시
+임베딩하지 않도록, 컬렉션을 버전이 붙은 파일 하나로 내보내고
+다시 임베딩하지 않고 그대로 읽어 들입니다.
+
+아티팩트 구조 (zip):
+- manifest.json: 형식 버전, 임베딩 모델, 차원, 문서 수, 말뭉치 해시, 샤드 인덱싱 기록
+- embeddings.npy: float32 벡터 (records.jsonl과 같은 순서)
+- records.jsonl: 한 줄에 문서 하나 ({"id", "document", "metadata"})
+
+말뭉치 해시는 문서 ID와 본문으로 만든 순서 무관 해시로, 가져올 때 파일이
+손상되지 않았는지 확인하고 어떤 말뭉치로 만든 인덱스인지 구분하는 데 씁니다.
+
+실행:
+    python -m services.index_artifact export index.zip
+    python -m services.index_artifact import index.zip [--replace]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import time
+import zipfile
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from services.chroma_service import (
+    DEFAULT_EMBEDDING_MODEL,
+    SHARD_STATE_FILENAME,
+    ChromaService,
+    _load_shard_state,
+)
+
+ARTIFACT_FORMAT = "dating-sim-index"
+ARTIFACT_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+EMBEDDINGS_NAME = "embeddings.npy"
+RECORDS_NAME = "records.jsonl"
+
+
+def corpus_hash(records: Iterable[Tuple[str, str]]) -> str:
+    """
+    (문서 ID, 본문) 목록의 해시. 순서와 무관하게 같은 말뭉치면 같은 값입니다.
+    """
+    digests = sorted(
+        hashlib.sha256(f"{doc_id}\0{document}".encode("utf-8")).digest()
+        for doc_id, document in records
+    )
+    digest = hashlib.sha256()
+    for item in digests:
+        digest.update(item)
+    return digest.hexdigest()
+
+
+def read_manifest(path: str) -> Dict:
+    """아티팩트의 manifest.json을 읽습니다."""
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read(MANIFEST_NAME).decode("utf-8"))
+
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Not an index artifact: {path}")
+    if manifest.get("format_version", 0) > ARTIFACT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact version {manifest['format_version']} "
+            f"(this build reads up to {ARTIFACT_VERSION})"
+        )
+    return manifest
+
+
+def _iter_collection(service: ChromaService, page_size: int) -> Iterator[Dict]:
+    """컬렉션을 페이지 단위로 읽습니다."""
+    offset = 0
+    while True:
+        page = service.collection.get(
+            limit=page_size,
+            offset=offset,
+            include=["embeddings", "documents", "metadatas"],
+        )
+        if page["ids"]:
+            yield page
+        if len(page["ids"]) < page_size:
+            return
+        offset += page_size
+
+
+def export_artifact(service: ChromaService, path: str, page_size: int = 5000) -> Dict:
+    """
+    컬렉션을 아티팩트 파일로 내보냅니다.
+
+    Args:
+        service: 내보낼 ChromaService
+        path: 아티팩트 저장 경로 (.zip)
+        page_size: 컬렉션에서 한 번에 읽을 문서 수
+
+    Returns:
+        manifest 내용
+    """
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    vectors: List[np.ndarray] = []
+    hash_items: List[Tuple[str, str]] = []
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(RECORDS_NAME, "w") as f:
+            for page in _iter_collection(service, page_size):
+                vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+                for doc_id, document, metadata in zip(
+                    page["ids"], page["documents"], page["metadatas"]
+                ):
+                    record = {"id": doc_id, "document": document, "metadata": metadata}
+                    f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                    hash_items.append((doc_id, document))
+
+        embeddings = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        buffer = io.BytesIO()
+        np.save(buffer, embeddings)
+        # 벡터는 압축 효과가 거의 없으므로 저장만 함
+        zf.writestr(EMBEDDINGS_NAME, buffer.getvalue(), compress_type=zipfile.ZIP_STORED)
+
+        shard_state = _load_shard_state(Path(service.persist_dir) / SHARD_STATE_FILENAME)
+        manifest = {
+            "format": ARTIFACT_FORMAT,
+            "format_version": ARTIFACT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "collection_name": service.collection_name,
+            "embedding_model": service.embedding_model,
+            "dim": int(embeddings.shape[1]) if len(embeddings) else 0,
+            "count": len(hash_items),
+            "corpus_hash": corpus_hash(hash_items),
+            "shard_state": shard_state.get(service.collection_name, {}),
+        }
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    print(f"Exported {manifest['count']} documents to {out} ({out.stat().st_size:,} bytes)")
+    return manifest
+
+
+def _iter_records(zf: zipfile.ZipFile) -> Iterator[Dict]:
+    with zf.open(RECORDS_NAME) as f:
+        for line in io.TextIOWrapper(f, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
+
+
+def import_artifact(
+    service: ChromaService,
+    path: str,
+    replace: bool = False,
+    batch_size: Optional[int] = None,
+) -> Dict:
+    """
+    아티팩트를 다시 임베딩하지 않고 컬렉션에 불러옵니다.
+
+    Args:
+        service: 불러올 ChromaService
+        path: 아티팩트 경로
+        replace: 컬렉션에 문서가 있으면 비우고 불러올지 여부 (False면 오류)
+        batch_size: 한 번에 추가할 문서 수 (None이면 ChromaDB 최대 배치 크기)
+
+    Returns:
+        manifest 내용
+
+    Raises:
+        ValueError: 임베딩 모델이 다르거나, 컬렉션이 비어 있지 않거나, 파일이 손상된 경우
+    """
+    manifest = read_manifest(path)
+    if manifest["embedding_model"] != service.embedding_model:
+        raise ValueError(
+            f"Artifact was built with embedding model '{manifest['embedding_model']}', "
+            f"but the service uses '{service.embedding_model}'"
+        )
+    if service.collection.count() and not replace:
+        raise ValueError(
+            f"Collection '{service.collection_name}' is not empty "
+            "(use replace=True to overwrite it)"
+        )
+
+    with zipfile.ZipFile(path) as zf:
+        # 불러오기 전에 기록이 manifest와 맞는지 확인
+        actual_hash = corpus_hash(
+            (record["id"], record["document"]) for record in _iter_records(zf)
+        )
+        if actual_hash != manifest["corpus_hash"]:
+            raise ValueError(f"Corpus hash mismatch (artifact is corrupted): {path}")
+
+        with zf.open(EMBEDDINGS_NAME) as f:
+            embeddings = np.load(f)
+        if len(embeddings) != manifest["count"]:
+            raise ValueError(
+                f"Embedding count mismatch: {len(embeddings)} != {manifest['count']}"
+            )
+
+        if service.collection.count():
+            service.clear_collection()
+
+        batch_size = batch_size or service.client.get_max_batch_size()
+        records = _iter_records(zf)
+        row = 0
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            service.collection.add(
+                ids=[record["id"] for record in batch],
+                embeddings=embeddings[row : row + len(batch)],
+                documents=[record["document"] for record in batch],
+                metadatas=[record["metadata"] for record in batch],
+            )
+            row += len(batch)
+
+    service.invalidate_search_cache()
+
+    # 샤드 인덱싱 기록도 함께 복원 (다음 index_shards 실행 때 바뀐 샤드만 처리)
+    state_path = Path(service.persist_dir) / SHARD_STATE_FILENAME
+    state = _load_shard_state(state_path)
+    state[service.collection_name] = manifest.get("shard_state", {})
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+    print(f"Imported {row} documents into '{service.collection_name}' from {path}")
+    return manifest
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="인덱스 아티팩트 내보내기/가져오기")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("path", help="아티팩트 경로 (.zip)")
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument("--collection", default="chat_conversations", help="컬렉션 이름")
+    parser.add_argument(
+        "--embedding-model",
+        default=DEFAULT_EMBEDDING_MODEL,
+        help="서비스 임베딩 모델 (가져올 때 아티팩트의 모델과 같아야 함)",
+    )
+    parser.add_argument(
+        "--replace", action="store_true", help="가져올 때 기존 컬렉션을 비우고 덮어쓰기"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    service = ChromaService(
+        persist_dir=args.persist_dir,
+        collection_name=args.collection,
+        embedding_model=args.embedding_model,
+    )
+
+    if args.command == "export":
+        export_artifact(service, args.path)
+    else:
+        import_artifact(service, args.path, replace=args.replace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+한국어 문자 n-gram BM25 역색인 모듈
+
+짧은 한국어 채팅 메시지("밥 먹었어?")는 임베딩 검색보다 글자 단위 일치가
+더 잘 맞는 경우가 많고, 임베딩 모델을 거치지 않으므로 훨씬 빠릅니다.
+이 모듈은 문서를 어절 단위 문자 bigram(한 글자 어절은 그대로)으로 나누어
+역색인을 만들고 BM25로 점수를 매깁니다.
+
+저장 구조 (디렉토리):
+- meta.json: 버전, BM25 파라미터, 문서 수, 원본 컬렉션 지문(fingerprint)
+- terms.json: n-gram -> [포스팅 시작, 끝] 오프셋
+- postings_docs.npy / postings_tf.npy: 포스팅 문서 번호(uint32)와 출현 횟수(uint16)
+- doc_lengths.npy: 문서별 n-gram 수
+- records.jsonl: 문서 번호 순서대로 문서 ID와 메타데이터
+
+포스팅 배열은 읽을 때 mmap으로 엽니다.
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.where_filter import WhereMaskCache
+
+LEXICAL_INDEX_VERSION = 1
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    """
+    텍스트를 어절별 문자 n-gram으로 나눕니다.
+    n보다 짧은 어절은 어절 전체를 하나의 n-gram으로 사용합니다.
+    """
+    grams = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) <= n:
+            grams.append(word)
+        else:
+            grams.extend(word[i : i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+class LexicalIndex:
+    """문자 n-gram BM25 역색인"""
+
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        """
+        Args:
+            k1: BM25 출현 횟수 포화 파라미터
+            b: BM25 문서 길이 정규화 파라미터
+        """
+        self.k1 = k1
+        self.b = b
+        self.fingerprint: Optional[str] = None
+        self.ids: List[str] = []
+        self.metadatas: List[Optional[Dict]] = []
+        self._masks = WhereMaskCache()
+
+        self._terms: Dict[str, Tuple[int, int]] = {}
+        self._docs = np.zeros(0, dtype=np.uint32)
+        self._tfs = np.zeros(0, dtype=np.uint16)
+        self._doc_lengths = np.zeros(0, dtype=np.uint32)
+
+        # add() 후 아직 포스팅 배열에 합치지 않은 항목
+        self._pending: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._pending_lengths: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> None:
+        """문서를 색인합니다."""
+        if metadatas is None:
+            metadatas = [None] * len(ids)
+
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            doc = len(self.ids)
+            counts = Counter(char_ngrams(document or ""))
+            for term, tf in counts.items():
+                self._pending[term].append((doc, min(tf, 0xFFFF)))
+            self._pending_lengths.append(sum(counts.values()))
+            self.ids.append(doc_id)
+            self.metadatas.append(metadata)
+
+    def _finalize(self) -> None:
+        """add()로 쌓인 포스팅을 연속 배열로 합칩니다."""
+        if not self._pending_lengths:
+            return
+
+        terms = set(self._terms) | set(self._pending)
+        docs = []
+        tfs = []
+        new_terms = {}
+        offset = 0
+        for term in sorted(terms):
+            start, end = self._terms.get(term, (0, 0))
+            pending = self._pending.get(term, [])
+            count = (end - start) + len(pending)
+            docs.append(self._docs[start:end])
+            tfs.append(self._tfs[start:end])
+            if pending:
+                docs.append(np.array([d for d, _ in pending], dtype=np.uint32))
+                tfs.append(np.array([t for _, t in pending], dtype=np.uint16))
+            new_terms[term] = (offset, offset + count)
+            offset += count
+
+        self._terms = new_terms
+        self._docs = np.concatenate(docs) if docs else np.zeros(0, dtype=np.uint32)
+        self._tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.uint16)
+        self._doc_lengths = np.concatenate(
+            [self._doc_lengths, np.asarray(self._pending_lengths, dtype=np.uint32)]
+        )
+        self._pending = defaultdict(list)
+        self._pending_lengths = []
+
+    def idf(self, term: str) -> float:
+        """BM25 IDF (색인에 없는 n-gram은 0)"""
+        start, end = self._terms.get(term, (0, 0))
+        df = end - start
+        if not df:
+            return 0.0
+        return math.log(1 + (len(self) - df + 0.5) / (df + 0.5))
+
+    def search(
+        self, query: str, n_results: int = 5, where: Optional[Dict] = None
+    ) -> Tuple[List[str], List[float], List[float]]:
+        """
+        BM25로 문서를 검색합니다.
+
+        Args:
+            query: 검색 쿼리
+            n_results: 반환할 결과 수
+            where: 메타데이터 필터 (ChromaDB where 문법)
+
+        Returns:
+            (문서 ID 목록, BM25 점수 목록, 신뢰도 목록), 점수 높은 순.
+            신뢰도는 쿼리 n-gram의 IDF 합 중 문서에 나오는 n-gram의 IDF 합 비율(0~1)로,
+            1이면 문서가 쿼리의 모든 n-gram을 포함합니다. (출현 횟수와 문서 길이에
+            영향을 받지 않으므로 점수 정규화보다 임계값을 정하기 쉬움)
+        """
+        self._finalize()
+
+        terms = set(char_ngrams(query))
+        if not len(self) or not terms:
+            return [], [], []
+
+        lengths = self._doc_lengths.astype(np.float32)
+        avg_length = float(lengths.mean()) or 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+
+        scores = np.zeros(len(self), dtype=np.float32)
+        matched = np.zeros(len(self), dtype=np.float64)
+        reference = 0.0
+        for term in terms:
+            idf = self.idf(term)
+            reference += idf
+            if not idf:
+                continue
+            start, end = self._terms[term]
+            docs = np.asarray(self._docs[start:end], dtype=np.int64)
+            tfs = np.asarray(self._tfs[start:end], dtype=np.float32)
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + length_norm[docs])
+            matched[docs] += idf
+
+        if where:
+            mask = self._masks.get(self.metadatas, where)
+            scores[~mask] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates) or reference <= 0:
+            return [], [], []
+
+        k = min(n_results, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        top_scores = [float(scores[i]) for i in top]
+        confidences = [min(1.0, float(matched[i]) / reference) for i in top]
+        return [self.ids[i] for i in top], top_scores, confidences
+
+    def save(self, path: str) -> None:
+        """인덱스를 디렉토리에 저장합니다."""
+        self._finalize()
+
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+
+        np.save(out / "postings_docs.npy", self._docs)
+        np.save(out / "postings_tf.npy", self._tfs)
+        np.save(out / "doc_lengths.npy", self._doc_lengths)
+
+        with open(out / "terms.json", "w", encoding="utf-8") as f:
+            json.dump(self._terms, f, ensure_ascii=False, separators=(",", ":"))
+
+        with open(out / "records.jsonl", "w", encoding="utf-8") as f:
+            for doc_id, metadata in zip(self.ids, self.metadatas):
+                f.write(json.dumps({"id": doc_id, "metadata": metadata}, ensure_ascii=False))
+                f.write("\n")
+
+        meta = {
+            "version": LEXICAL_INDEX_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "count": len(self),
+            "fingerprint": self.fingerprint,
+        }
+        with open(out / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        """저장된 인덱스를 읽습니다. 포스팅 배열은 mmap으로 엽니다."""
+        src = Path(path)
+        with open(src / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("version") != LEXICAL_INDEX_VERSION:
+            raise ValueError(f"Unsupported lexical index version: {meta.get('version')}")
+
+        index = cls(meta["k1"], meta["b"])
+        index.fingerprint = meta.get("fingerprint")
+
+        with open(src / "terms.json", "r", encoding="utf-8") as f:
+            index._terms = {term: tuple(span) for term, span in json.load(f).items()}
+
+        # 빈 배열은 mmap할 수 없으므로 그대로 읽음
+        mmap_mode = "r" if index._terms else None
+        index._docs = np.load(src / "postings_docs.npy", mmap_mode=mmap_mode)
+        index._tfs = np.load(src / "postings_tf.npy", mmap_mode=mmap_mode)
+        index._doc_lengths = np.load(src / "doc_lengths.npy")
+
+        with open(src / "records.jsonl", "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                index.ids.append(record["id"])
+                index.metadatas.append(record["metadata"])
+
+        return index
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """
+    여러 검색 결과 순위를 RRF(Reciprocal Rank Fusion)로 합칩니다.
+
+    Args:
+        rankings: 검색 방식별 문서 ID 목록 (좋은 순)
+        k: 순위 완화 상수 (클수록 하위 순위의 영향이 커짐)
+
+    Returns:
+        합친 점수 순 문서 ID 목록
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
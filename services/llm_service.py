@@ -1,6 +1,10 @@
+import logging
+
 from openai import OpenAI
 import streamlit as st
-from config.settings import OPENAI_API_KEY, CHAT_MODEL, ANALYSIS_MODEL
+from config.settings import OPENAI_API_KEY, CHAT_MODEL, ANALYSIS_MODEL, RAG_WAIT_TIMEOUT
+from services.rag_loader import BackgroundLoader
+from services.response_stream import StreamingResponse
 
 # 클라이언트 초기화
 if not OPENAI_API_KEY:
@@ -14,20 +18,18 @@ else:
 
 import json
 
+# 턴마다 남기는 RAG 진단 로그 (기본 로그 레벨에서는 출력되지 않음)
+logger = logging.getLogger(__name__)
+
 
 # RAG Service 초기화 (한 번만 로드 - 캐싱)
+# 모델 로딩이 첫 화면 렌더링을 막지 않도록 백그라운드 스레드에서 로드
 @st.cache_resource
-def get_initialized_rag_service():
-    try:
-        from services.rag_service import RAGService
-
-        return RAGService()
-    except Exception as e:
-        print(f"RAG Service Load Failed: {e}")
-        return None
+def get_rag_loader():
+    return BackgroundLoader().start()
 
 
-rag_service = get_initialized_rag_service()
+rag_loader = get_rag_loader()
 
 
 def sanitize_user_input(text):
@@ -134,14 +136,20 @@ def sanitize_user_input(text):
     return True, cleaned, ""
 
 
-def get_ai_response(messages):
+def get_ai_response(messages, persona=None, user_gender=None, memory=None, stream=False):
     """
     OpenAI API를 통해 챗봇 응답을 받아옵니다.
     messages: game_view에서 관리하는 대화 내역 리스트 (System Prompt 포함)
-    Returns: dict {"response": str, "score": int}
+    persona: 현재 상대 페르소나 ('EMOTIONAL', 'LOGICAL', 'TOUGH'). 이 말투의 예시를 우선 검색
+    user_gender: 사용자 성별 ('M', 'F'). 상대(반대) 성별 화자의 예시를 우선 검색
+    memory: 이번 라운드에 이미 넣은 예시 기록 (RetrievalMemory). 같은 예시를 반복해서 넣지 않음
+    stream: True면 응답을 스트리밍으로 받아 StreamingResponse를 반환
+        (순회하면 response 텍스트 조각, 순회가 끝나면 .result에 전체 dict)
+    Returns: dict {"response": str, "score": int} (stream=True면 StreamingResponse)
     """
     if not client:
-        return {"response": "🚨 API Key가 설정되지 않았습니다.", "score": 0}
+        result = {"response": "🚨 API Key가 설정되지 않았습니다.", "score": 0}
+        return StreamingResponse.from_result(result) if stream else result
 
     # 프롬프트 인젝션 방어: 마지막 사용자 메시지 검증
     last_user_msg = ""
@@ -156,11 +164,12 @@ def get_ai_response(messages):
         is_safe, cleaned_msg, warning = sanitize_user_input(last_user_msg)
         if not is_safe:
             # 위험한 입력 감지 시 안전한 응답 반환 (LLM 호출 안함)
-            return {
+            result = {
                 "response": "죄송하지만 기술적인 공격이네요. 안통한다 애송이!",
                 "score": -100,
                 "reason": "기술적인 공격"
             }
+            return StreamingResponse.from_result(result) if stream else result
         
         # 입력이 정제되었다면 메시지 교체
         if cleaned_msg != last_user_msg:
@@ -179,8 +188,36 @@ def get_ai_response(messages):
             break
 
     # 검색 및 컨텍스트 주입
+    # RAG가 아직 로딩 중이면 제한 시간만 기다리고, 그래도 안 되면 검색 없이 응답
+    rag_service = rag_loader.get(timeout=RAG_WAIT_TIMEOUT) if last_user_msg else None
     if rag_service and last_user_msg:
-        context = rag_service.search_context(last_user_msg)
+        opponent_gender = None
+        if user_gender:
+            opponent_gender = "F" if user_gender == "M" else "M"
+        try:
+            report = rag_service.build_context(
+                last_user_msg, persona=persona, speaker_sex=opponent_gender, memory=memory
+            )
+        except Exception as e:
+            logger.warning("RAG context failed: %s", e)
+            report = {"context": None, "tokens": 0}
+        context = report["context"]
+        # 주입한 토큰 수와 건너뛴 비율 기록 (예산/임계값 조정용, DEBUG 레벨)
+        if report.get("skipped"):
+            logger.debug("RAG context skipped: %s", report["skipped"])
+        else:
+            logger.debug(
+                "RAG context: %s tokens, %s examples (%s referenced, %s repeats skipped) "
+                "(dropped by distance %s, by budget %s)",
+                report["tokens"],
+                report.get("examples", 0),
+                report.get("repeats", 0),
+                report.get("repeats_skipped", 0),
+                report.get("dropped_distance", 0),
+                report.get("dropped_budget", 0),
+            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("RAG policy stats: %s", rag_service.policy.stats.snapshot())
         if context:
             # 시스템 메시지를 찾아서 컨텍스트 추가
             # 보통 messages[0]이 시스템 프롬프트임
@@ -194,6 +231,10 @@ def get_ai_response(messages):
                     final_messages[i] = {"role": "system", "content": new_content}
                     break
 
+    if stream:
+        # API 오류는 StreamingResponse가 순회 중에 받아 오류 응답으로 바꿈
+        return StreamingResponse(_stream_content(final_messages))
+
     try:
         response = client.chat.completions.create(
             model=CHAT_MODEL,
@@ -206,6 +247,19 @@ def get_ai_response(messages):
         return {"response": f"🚨 오류 발생: {str(e)}", "score": 0}
 
 
+def _stream_content(messages):
+    """채팅 응답을 스트리밍으로 요청하고 생성된 텍스트 조각을 차례로 반환합니다."""
+    response = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        response_format={"type": "json_object"},  # JSON 모드 강제
+        stream=True,
+    )
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
 def analyze_conversation(history):
     """
     대화 기록을 분석하여 사용자의 연애 성향을 파악합니다.
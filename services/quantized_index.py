@@ -0,0 +1,231 @@
+"""
+양자화 벡터 인덱스 모듈
+
+ChromaDB 컬렉션은 384차원 float32 벡터(문서당 1,536바이트)를 그대로 저장합니다.
+이 모듈은 같은 벡터를 float16(768바이트) 또는 int8(384바이트 + 스케일 4바이트)로
+줄여 저장하고, numpy 행렬 곱으로 코사인 거리 기준 전수 검색을 수행합니다.
+
+- float32: 양자화 없음 (정확한 전수 검색, 비교 기준)
+- float16: 반정밀도 저장
+- int8: 벡터별 스케일을 둔 대칭 양자화 (v ≈ q * scale / 127)
+
+저장 구조 (디렉토리):
+- meta.json: dtype, 차원, 문서 수, 원본 컬렉션 지문(fingerprint)
+- vectors.npy: 양자화된 벡터 (읽을 때 mmap)
+- scales.npy: int8 벡터별 스케일
+- records.jsonl: 행 순서대로 문서 ID와 메타데이터
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.where_filter import WhereMaskCache
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# 검색 시 한 번에 float32로 풀어 곱할 행 수
+# (4,096 x 384 x 4바이트 = 6MB 버퍼를 재사용하여 CPU 캐시 안에서 변환과 곱셈을 처리)
+_SEARCH_BLOCK_ROWS = 4096
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (코사인 유사도를 내적으로 계산하기 위함)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    정규화된 벡터를 양자화합니다.
+
+    Returns:
+        (양자화된 벡터, int8이면 벡터별 스케일 / 아니면 None)
+    """
+    if dtype == "float32":
+        return vectors.astype(np.float32), None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1)
+        scales[scales == 0] = 1.0
+        quantized = np.rint(vectors / scales[:, None] * 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    raise ValueError(f"Unsupported dtype: {dtype} (choose from {SUPPORTED_DTYPES})")
+
+
+class QuantizedIndex:
+    """양자화 벡터를 저장하고 코사인 거리로 전수 검색하는 인덱스"""
+
+    def __init__(self, dtype: str = "int8"):
+        """
+        Args:
+            dtype: 저장 형식 (float32, float16, int8)
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype} (choose from {SUPPORTED_DTYPES})")
+
+        self.dtype = dtype
+        self.fingerprint: Optional[str] = None
+        self.ids: List[str] = []
+        self.metadatas: List[Optional[Dict]] = []
+        self._masks = WhereMaskCache()
+        self.vectors: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """벡터 저장에 쓰는 바이트 수 (스케일 포함)"""
+        total = self.vectors.nbytes if self.vectors is not None else 0
+        if self.scales is not None:
+            total += self.scales.nbytes
+        return total
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> None:
+        """벡터를 양자화하여 추가합니다."""
+        if not ids:
+            return
+
+        quantized, scales = quantize(normalize_rows(np.asarray(embeddings)), self.dtype)
+        if self.vectors is None:
+            self.vectors = quantized
+            self.scales = scales
+        else:
+            self.vectors = np.concatenate([self.vectors, quantized])
+            if scales is not None:
+                self.scales = np.concatenate([self.scales, scales])
+
+        self.ids.extend(ids)
+        self.metadatas.extend(metadatas if metadatas is not None else [None] * len(ids))
+
+    def count(self, where: Optional[Dict] = None) -> int:
+        """where 조건에 맞는 문서 수 (조건별 마스크는 캐시)"""
+        if not where:
+            return len(self)
+        return int(self._masks.get(self.metadatas, where).sum())
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """전체 행에 대한 (쿼리 수 x 행 수) 코사인 유사도"""
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        if self.vectors.dtype == np.float32:
+            np.matmul(queries, self.vectors.T, out=scores)
+            return scores
+
+        # 저장 블록 전체를 매번 새 float32 배열로 바꾸지 않고,
+        # 고정 크기 버퍼 하나에 블록 단위로 풀어 넣으며 곱함
+        buffer = np.empty(
+            (min(_SEARCH_BLOCK_ROWS, len(self)), self.vectors.shape[1]), dtype=np.float32
+        )
+        for start in range(0, len(self), _SEARCH_BLOCK_ROWS):
+            stop = min(start + _SEARCH_BLOCK_ROWS, len(self))
+            block = buffer[: stop - start]
+            block[...] = self.vectors[start:stop]
+            np.matmul(queries, block.T, out=scores[:, start:stop])
+
+        if self.scales is not None:
+            scores *= self.scales / 127.0
+        return scores
+
+    def search(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+    ) -> Tuple[List[List[str]], List[List[float]]]:
+        """
+        쿼리별 가장 가까운 문서를 찾습니다.
+
+        Args:
+            query_embeddings: 쿼리 임베딩 목록
+            n_results: 쿼리당 반환할 결과 수
+            where: 메타데이터 필터 (ChromaDB where 문법)
+
+        Returns:
+            (쿼리별 문서 ID 목록, 쿼리별 코사인 거리 목록), 가까운 순
+        """
+        queries = normalize_rows(np.asarray(query_embeddings))
+        if not len(self) or not len(queries):
+            return [[] for _ in queries], [[] for _ in queries]
+
+        scores = self._scores(queries)
+
+        if where:
+            mask = self._masks.get(self.metadatas, where)
+            scores[:, ~mask] = -np.inf
+            available = int(mask.sum())
+        else:
+            available = len(self)
+
+        k = min(n_results, available)
+        all_ids: List[List[str]] = []
+        all_distances: List[List[float]] = []
+        for row in scores:
+            if k <= 0:
+                all_ids.append([])
+                all_distances.append([])
+                continue
+            top = np.argpartition(-row, k - 1)[:k] if k < len(row) else np.arange(len(row))
+            top = top[np.argsort(-row[top], kind="stable")][:k]
+            all_ids.append([self.ids[i] for i in top])
+            all_distances.append([float(1.0 - row[i]) for i in top])
+
+        return all_ids, all_distances
+
+    def save(self, path: str) -> None:
+        """인덱스를 디렉토리에 저장합니다."""
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+
+        dim = int(self.vectors.shape[1]) if self.vectors is not None else 0
+        vectors = self.vectors if self.vectors is not None else np.zeros((0, 0), dtype=self.dtype)
+        np.save(out / "vectors.npy", vectors)
+        if self.scales is not None:
+            np.save(out / "scales.npy", self.scales)
+
+        with open(out / "records.jsonl", "w", encoding="utf-8") as f:
+            for doc_id, metadata in zip(self.ids, self.metadatas):
+                f.write(json.dumps({"id": doc_id, "metadata": metadata}, ensure_ascii=False))
+                f.write("\n")
+
+        meta = {
+            "dtype": self.dtype,
+            "dim": dim,
+            "count": len(self),
+            "fingerprint": self.fingerprint,
+        }
+        with open(out / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path: str) -> "QuantizedIndex":
+        """저장된 인덱스를 읽습니다. 벡터 파일은 mmap으로 엽니다."""
+        src = Path(path)
+        with open(src / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        index = cls(meta["dtype"])
+        index.fingerprint = meta.get("fingerprint")
+        if meta["count"]:
+            index.vectors = np.load(src / "vectors.npy", mmap_mode="r")
+            if (src / "scales.npy").exists():
+                index.scales = np.load(src / "scales.npy")
+
+        with open(src / "records.jsonl", "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                index.ids.append(record["id"])
+                index.metadatas.append(record["metadata"])
+
+        return index
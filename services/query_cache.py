@@ -0,0 +1,145 @@
+"""
+검색 쿼리 캐시 모듈
+
+게임 중에는 "안녕하세요", "밥 먹었어?" 같은 같은 메시지가 반복해서 들어오므로
+쿼리 임베딩과 검색 결과를 프로세스 메모리에 캐시합니다.
+
+- LRUCache: 크기 제한 LRU (쿼리 임베딩용)
+- TTLCache: 크기 제한 + 만료 시간 (검색 결과용)
+- QueryEmbedder: LRU 캐시를 거치는 쿼리 임베딩 (ChromaService, NumpyVectorStore 공용)
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+from chromadb.api.types import EmbeddingFunction
+
+from services.embedding_cache import CachedEmbeddingFunction
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키로 사용할 쿼리 정규화 (앞뒤 공백 제거, 연속 공백 하나로)"""
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class LRUCache:
+    """크기 제한 LRU 캐시"""
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize: 최대 항목 수 (0이면 캐시하지 않음)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """값을 반환합니다. 없으면 None."""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """값을 저장하고, 넘치면 가장 오래 안 쓴 항목을 버립니다."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """모든 항목을 삭제합니다. (카운터는 유지)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        """캐시 통계를 반환합니다."""
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class TTLCache(LRUCache):
+    """만료 시간이 있는 크기 제한 LRU 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        """
+        Args:
+            maxsize: 최대 항목 수 (0이면 캐시하지 않음)
+            ttl: 항목 유효 시간 (초)
+        """
+        super().__init__(maxsize)
+        self.ttl = ttl
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = super().get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() < expires_at:
+            return value
+
+        # 만료된 항목은 miss로 처리
+        with self._lock:
+            self._data.pop(key, None)
+            self.hits -= 1
+            self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        super().put(key, (time.monotonic() + self.ttl, value))
+
+
+class QueryEmbedder:
+    """
+    LRU 캐시를 거치는 쿼리 임베딩
+
+    쿼리는 문서 임베딩 디스크 캐시를 거치지 않고 원래 함수로 임베딩합니다.
+    (한 번 쓰고 마는 채팅 메시지가 문서 임베딩 캐시를 채우지 않도록 함)
+    """
+
+    def __init__(self, embedding_fn: EmbeddingFunction, maxsize: int = 1024):
+        """
+        Args:
+            embedding_fn: 문서 임베딩 함수 (CachedEmbeddingFunction이면 캐시 없는 원래 함수 사용)
+            maxsize: LRU 캐시 크기 (0이면 캐시하지 않음)
+        """
+        if isinstance(embedding_fn, CachedEmbeddingFunction):
+            embedding_fn = embedding_fn.base
+        self.embedding_fn = embedding_fn
+        self.cache = LRUCache(maxsize)
+
+    def __call__(self, queries: Sequence[str]) -> List[List[float]]:
+        """
+        쿼리 임베딩 목록을 반환합니다.
+        LRU 캐시에 없는 쿼리만 모아 임베딩 함수를 한 번 호출합니다.
+        """
+        embeddings = [self.cache.get(query) for query in queries]
+
+        missing = sorted({query for query, emb in zip(queries, embeddings) if emb is None})
+        if missing:
+            computed = dict(zip(missing, self.embedding_fn(missing)))
+            for query, embedding in computed.items():
+                self.cache.put(query, embedding)
+            embeddings = [
+                emb if emb is not None else computed[query]
+                for query, emb in zip(queries, embeddings)
+            ]
+
+        return embeddings
@@ -0,0 +1,94 @@
+"""
+RAG 서비스 백그라운드 로더 모듈
+
+RAGService를 만들면 ChromaDB 클라이언트를 열고 임베딩 모델을 불러오므로
+수 초가 걸립니다. 앱 시작 시 이 작업을 백그라운드 스레드에서 실행해
+첫 화면 렌더링을 막지 않고, 호출 쪽은 준비 상태를 확인하거나
+제한 시간만큼만 기다린 뒤 검색을 건너뛸 수 있도록 합니다.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# 로더 상태
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+# 첫 검색 지연을 줄이기 위해 로딩 직후 한 번 임베딩할 쿼리
+WARMUP_QUERY = "안녕하세요"
+
+
+def create_rag_service():
+    """RAGService를 만들고 검색을 한 번 실행해 모델과 인덱스를 데웁니다."""
+    # chromadb, sentence-transformers 임포트도 백그라운드에서 하도록 지연 임포트
+    from services.rag_service import RAGService
+
+    service = RAGService()
+    service.retrieve(WARMUP_QUERY, n_results=1)
+    return service
+
+
+class BackgroundLoader:
+    """객체 생성을 백그라운드 스레드에서 실행하고 준비 상태를 제공하는 로더"""
+
+    def __init__(self, factory: Callable[[], Any] = create_rag_service, name: str = "rag-loader"):
+        """
+        Args:
+            factory: 생성 함수 (기본: create_rag_service)
+            name: 스레드 이름
+        """
+        self.factory = factory
+        self.name = name
+        self.state = STATE_PENDING
+        self.error: Optional[BaseException] = None
+        self.load_seconds: Optional[float] = None
+
+        self._value = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "BackgroundLoader":
+        """로딩 스레드를 시작합니다. 이미 시작했으면 아무것도 하지 않습니다."""
+        with self._lock:
+            if self._thread is None:
+                self.state = STATE_LOADING
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        try:
+            self._value = self.factory()
+            self.state = STATE_READY
+        except Exception as e:
+            print(f"Background load failed ({self.name}): {e}")
+            self.error = e
+            self.state = STATE_FAILED
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self._ready.set()
+
+    @property
+    def is_ready(self) -> bool:
+        """로딩이 성공적으로 끝났는지 여부"""
+        return self.state == STATE_READY
+
+    def get(self, timeout: Optional[float] = 0.0) -> Optional[Any]:
+        """
+        로딩된 객체를 반환합니다.
+
+        Args:
+            timeout: 최대 대기 시간 (초). 0이면 기다리지 않고, None이면 끝날 때까지 대기
+
+        Returns:
+            로딩된 객체 (아직 준비되지 않았거나 실패했으면 None)
+        """
+        self.start()
+        if timeout is None or timeout > 0:
+            self._ready.wait(timeout)
+        return self._value if self.state == STATE_READY else None
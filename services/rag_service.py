@@ -1,34 +1,208 @@
-from services.chroma_service import ChromaService
-from typing import Optional
+from config.settings import VECTOR_BACKEND
+from services.context_assembler import ContextAssembler
+from services.retrieval_memory import RetrievalMemory
+from services.retrieval_policy import SKIP_ALL_REPEATS, RetrievalPolicy
+from services.vector_store import VectorStore, create_vector_store
+from typing import Dict, List, Optional, Set
+
+# 같은 대화의 청크가 여러 개 검색될 수 있으므로 넉넉히 가져온 뒤 대화 단위로 추림
+CHUNK_FETCH_FACTOR = 3
+
+
+def persona_filter_chain(persona: Optional[str] = None, speaker_sex: Optional[str] = None) -> List[Dict]:
+    """
+    Returns the filters to try in order: the persona's own partition first,
+    then the opponent's gender only, then the whole collection.
+    """
+    chain = []
+    if speaker_sex and persona:
+        chain.append({"speaker_sex_filter": speaker_sex, "style_filter": persona})
+    if speaker_sex:
+        chain.append({"speaker_sex_filter": speaker_sex})
+    elif persona:
+        chain.append({"style_filter": persona})
+    chain.append({})
+    return chain
 
 
 class RAGService:
-    def __init__(self):
+    def __init__(
+        self,
+        vector_store: Optional[VectorStore] = None,
+        backend: str = VECTOR_BACKEND,
+        assembler: Optional[ContextAssembler] = None,
+        policy: Optional[RetrievalPolicy] = None,
+    ):
+        """
+        Args:
+            vector_store: Store to search with. Defaults to a new store of the
+                configured backend (config.settings.VECTOR_BACKEND).
+            backend: Backend used when vector_store is not given ("chroma" or "numpy").
+            assembler: Builds the token-budgeted context string. Defaults to the
+                budget and distance threshold in config.settings.
+            policy: Decides whether to inject and how many examples to keep,
+                based on the candidates' distances.
+        """
+        self.assembler = assembler or ContextAssembler()
+        self.policy = policy or RetrievalPolicy()
+        if vector_store is not None:
+            self.vector_store = vector_store
+            return
+
         try:
-            self.chroma_service = ChromaService()
+            self.vector_store = create_vector_store(backend)
         except Exception as e:
-            print(f"ChromaService init failed: {e}")
-            self.chroma_service = None
+            print(f"Vector store init failed ({backend}): {e}")
+            self.vector_store = None
 
-    def search_context(self, query: str, n_results: int = 3) -> Optional[str]:
+    def retrieve(
+        self,
+        query: str,
+        n_results: int = 3,
+        exclude_parents: Optional[Set[str]] = None,
+        **filters,
+    ) -> List[Dict]:
         """
-        Queries ChromaDB for similar conversations and formats them as a context string.
+        Returns up to n_results chunks from distinct parent conversations,
+        best match first.
+
+        Args:
+            exclude_parents: Parent conversation IDs to skip (updated in place).
+            filters: Search filters passed to the vector store
+                (platform_filter, subject_filter, speaker_sex_filter, style_filter).
         """
-        if not self.chroma_service:
-            return None
+        if not self.vector_store or n_results <= 0:
+            return []
 
-        try:
-            results = self.chroma_service.get_similar_conversations(query, n_results)
-            if not results:
-                return None
+        results = self.vector_store.get_similar_conversations(
+            query, n_results * CHUNK_FETCH_FACTOR, **filters
+        )
+
+        items = []
+        seen_parents = exclude_parents if exclude_parents is not None else set()
+        for item in results:
+            metadata = item["metadata"] or {}
+            parent_id = metadata.get("parent_id") or item["id"]
+            if parent_id in seen_parents:
+                continue
+            seen_parents.add(parent_id)
+            items.append(item)
+            if len(items) >= n_results:
+                break
+
+        return items
+
+    def retrieve_for_persona(
+        self,
+        query: str,
+        n_results: int = 3,
+        persona: Optional[str] = None,
+        speaker_sex: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Searches the partition matching the persona style and speaker sex,
+        topping up from broader partitions when it has too few matches.
+
+        The partitions are nested (style and sex, then sex, then everything),
+        so a partition holding fewer documents than are still needed is skipped
+        without searching it: the next, broader partition contains the same
+        documents. This also skips the empty persona partitions of collections
+        indexed before the speaker fields existed. Partition sizes come from the
+        vector store's cached count.
+        """
+        items: List[Dict] = []
+        seen_parents: Set[str] = set()
+        if not self.vector_store:
+            return items
 
-            context_parts = []
-            for i, item in enumerate(results, 1):
-                subject = item["metadata"].get("subject", "Unknown")
-                dialogue = item["dialogue"]
-                context_parts.append(f"예시 {i} (주제: {subject}):\n{dialogue}")
+        for filters in persona_filter_chain(persona, speaker_sex):
+            needed = n_results - len(items)
+            if filters:
+                size = self.vector_store.count(limit=needed, **filters)
+                if size is not None and size < needed:
+                    continue
+            items.extend(self.retrieve(query, needed, exclude_parents=seen_parents, **filters))
+            if len(items) >= n_results:
+                break
+        return items
 
-            return "\n\n".join(context_parts)
+    def build_context(
+        self,
+        query: str,
+        n_results: Optional[int] = None,
+        persona: Optional[str] = None,
+        speaker_sex: Optional[str] = None,
+        memory: Optional[RetrievalMemory] = None,
+    ) -> Dict:
+        """
+        Retrieves similar conversation chunks, lets the retrieval policy decide
+        which of them are worth injecting, and assembles those within the token budget.
+
+        Args:
+            n_results: Number of examples to inject at most. Defaults to the policy's max_results.
+            memory: Examples already injected this round. Depending on its mode,
+                repeated hits are left out (skip), sent as a one-line reference
+                (reference), or left out with their slots filled by the next-best
+                unseen candidates (replace).
+
+        Returns:
+            The ContextAssembler report: "context" (None when nothing is injected),
+            "tokens" injected, and counts of examples kept, dropped and trimmed,
+            plus "candidates" retrieved, "repeats_skipped" and "skipped"
+            (the policy's skip reason, "all_repeats" when every selected example
+            was already injected this round, or None).
+        """
+        n_results = n_results or self.policy.max_results
+        n_fetch = n_results + (memory.extra_candidates(n_results) if memory is not None else 0)
+        candidates = self.retrieve_for_persona(query, n_fetch, persona, speaker_sex)
+        if memory is not None:
+            candidates = memory.prioritize(candidates)
+
+        # 거리 판단은 반복 예시를 포함한 전체 후보로 하고, 고른 뒤에 반복 예시를 뺌
+        # (통계는 반복 예시를 뺀 최종 결과로 기록)
+        selected, skip_reason = self.policy.select(candidates, limit=n_results, record=False)
+        repeats_skipped = 0
+        if memory is not None:
+            selected, repeats_skipped = memory.filter(selected)
+            if not selected and not skip_reason:
+                skip_reason = SKIP_ALL_REPEATS
+        self.policy.stats.record(len(selected), skip_reason)
+
+        report = self.assembler.assemble(query, selected)
+        report.update(
+            {
+                "candidates": len(candidates),
+                "repeats_skipped": repeats_skipped,
+                "skipped": skip_reason,
+            }
+        )
+
+        if memory is not None:
+            injected = set(report["ids"])
+            memory.remember(
+                [item for item in selected if item["id"] in injected and not item.get("repeat")]
+            )
+        return report
+
+    def search_context(
+        self,
+        query: str,
+        n_results: Optional[int] = None,
+        persona: Optional[str] = None,
+        speaker_sex: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Queries the vector store for similar conversation chunks and formats them as a context string.
+
+        Args:
+            persona: Persona type (EMOTIONAL, LOGICAL, TOUGH) whose speaking style to prefer.
+            speaker_sex: Sex (M, F) of the speaker the examples should come from.
+        """
+        if not self.vector_store:
+            return None
+
+        try:
+            return self.build_context(query, n_results, persona, speaker_sex)["context"]
         except Exception as e:
             print(f"Search context failed: {e}")
             return None
@@ -0,0 +1,213 @@
+"""
+스트리밍 응답 처리 모듈
+
+챗봇 응답은 {"response": ..., "score": ..., "reason": ...} 형태의 JSON 객체 하나로
+옵니다. 전체 JSON이 끝날 때까지 기다리면 사용자는 생성 시간 전체를 기다려야 하므로,
+스트리밍으로 받은 조각을 점진적으로 파싱해 response 필드의 문자열을 도착하는 대로
+내보내고, score와 reason은 객체가 끝난 뒤 전체를 파싱해 제공합니다.
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, Optional
+
+_WHITESPACE = " \t\n\r"
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JsonFieldExtractor:
+    """
+    JSON 객체 조각을 받으면서 최상위 문자열 필드 하나의 값을 점진적으로 디코딩합니다.
+
+    Example:
+        extractor = JsonFieldExtractor("response")
+        extractor.feed('{"respon')      # -> ""
+        extractor.feed('se": "안녕')    # -> "안녕"
+        extractor.feed('하세요\\n", "score": 5}')  # -> "하세요\n"
+    """
+
+    def __init__(self, field: str = "response"):
+        """
+        Args:
+            field: 값을 꺼낼 최상위 필드 이름
+        """
+        self.field = field
+        self.text = ""
+        self.done = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None  # \\uXXXX의 16진수 자리
+        self._high_surrogate: Optional[int] = None
+        self._expect_key = False
+        self._expect_value = False
+        self._is_key = False
+        self._capture = False
+        self._key = ""
+        self._last_key = ""
+
+    def feed(self, chunk: str) -> str:
+        """
+        JSON 조각을 추가합니다.
+
+        Returns:
+            이번 조각으로 새로 디코딩된 필드 값 텍스트
+        """
+        out = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._in_string:
+                self._string_char(ch, out)
+            else:
+                self._structure_char(ch)
+
+        delta = "".join(out)
+        self.text += delta
+        return delta
+
+    def _structure_char(self, ch: str) -> None:
+        if ch in _WHITESPACE:
+            return
+        if ch == '"':
+            self._in_string = True
+            self._is_key = self._depth == 1 and self._expect_key
+            if self._is_key:
+                self._key = ""
+            self._capture = (
+                self._depth == 1 and self._expect_value and self._last_key == self.field
+            )
+            self._expect_key = False
+            self._expect_value = False
+        elif ch in "{[":
+            self._depth += 1
+            self._expect_key = self._depth == 1 and ch == "{"
+            self._expect_value = False
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth <= 0:
+                self.done = True
+        elif ch == ":" and self._depth == 1:
+            self._expect_value = True
+        elif ch == "," and self._depth == 1:
+            self._expect_key = True
+            self._expect_value = False
+        else:
+            # 숫자, true/false/null 등 문자열이 아닌 값
+            self._expect_value = False
+
+    def _string_char(self, ch: str, out: list) -> None:
+        if self._unicode is not None:
+            self._unicode += ch
+            if len(self._unicode) == 4:
+                self._emit(self._decode_unicode(int(self._unicode, 16)), out)
+                self._unicode = None
+            return
+
+        if self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode = ""
+            else:
+                self._emit(_ESCAPES.get(ch, ch), out)
+            return
+
+        if ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+            if self._is_key:
+                self._last_key = self._key
+            self._capture = False
+        else:
+            self._emit(ch, out)
+
+    def _decode_unicode(self, code: int) -> str:
+        """\\uXXXX 코드를 문자로 바꿉니다. (서로게이트 쌍은 두 번째 코드에서 합침)"""
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return ""
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        return chr(code)
+
+    def _emit(self, text: str, out: list) -> None:
+        if self._is_key:
+            self._key += text
+        elif self._capture:
+            out.append(text)
+
+
+class StreamingResponse:
+    """
+    스트리밍 챗봇 응답
+
+    순회하면 response 필드 텍스트 조각을 도착하는 대로 내보내고,
+    순회가 끝나면 result에 전체 결과 dict(response, score, reason)가 담깁니다.
+    """
+
+    def __init__(self, chunks: Iterable[str], field: str = "response"):
+        """
+        Args:
+            chunks: 모델이 생성한 JSON 텍스트 조각 이터러블
+            field: 스트리밍할 필드 이름
+        """
+        self._chunks = chunks
+        self._extractor = JsonFieldExtractor(field)
+        self._raw = []
+        self.result: Optional[Dict] = None
+        # 중간에 멈춘 순회도 finish()에서 이어서 받을 수 있도록 생성기 하나를 공유
+        self._stream = self._generate()
+
+    @classmethod
+    def from_result(cls, result: Dict) -> "StreamingResponse":
+        """이미 완성된 결과(오류 응답 등)를 스트리밍 응답으로 감쌉니다."""
+        return cls([json.dumps(result, ensure_ascii=False)])
+
+    def __iter__(self) -> Iterator[str]:
+        return self._stream
+
+    def _generate(self) -> Iterator[str]:
+        try:
+            for chunk in self._chunks:
+                if not chunk:
+                    continue
+                self._raw.append(chunk)
+                delta = self._extractor.feed(chunk)
+                if delta:
+                    yield delta
+        except Exception as e:
+            error = f"🚨 오류 발생: {str(e)}"
+            self.result = {"response": self._extractor.text or error, "score": 0}
+            if not self._extractor.text:
+                yield error
+            return
+
+        self.result = self._parse("".join(self._raw))
+
+    def _parse(self, raw: str) -> Dict:
+        try:
+            result = json.loads(raw)
+        except json.JSONDecodeError:
+            # JSON이 잘린 경우 스트리밍한 텍스트라도 응답으로 사용
+            return {"response": self._extractor.text or raw, "score": 0}
+        if not isinstance(result, dict):
+            return {"response": str(result), "score": 0}
+        return result
+
+    def finish(self) -> Dict:
+        """남은 조각을 모두 받고 전체 결과를 반환합니다."""
+        for _ in self._stream:
+            pass
+        return self.result
@@ -0,0 +1,108 @@
+"""
+세션별 검색 기억 모듈
+
+한 라운드(최대 10턴) 동안 이어지는 사용자 메시지는 같은 말뭉치 대화를 반복해서
+불러오는 경우가 많아, 매 턴 시스템 프롬프트에 같은 예시가 다시 들어갑니다.
+이 모듈은 세션(라운드)마다 이미 주입한 대화 ID를 기억해 두고,
+다시 검색된 대화를 모드에 따라 처리합니다.
+
+- skip: 다시 넣지 않음 (기본값, 토큰이 가장 적음)
+- reference: 가장 관련 있는 한 발화만 남긴 한 줄 참조로 넣음
+- replace: 다시 넣지 않고, 빈 자리를 다음으로 가까운 새 대화로 채움
+  (토큰은 줄지 않을 수 있지만 라운드에서 보는 예시가 다양해짐)
+
+기억은 Streamlit 세션 상태(st.session_state)에 두고 라운드가 바뀌면 새로 만듭니다.
+"""
+
+from typing import Dict, List, MutableMapping, Optional, Tuple
+
+from config.settings import RAG_REPEAT_MODE
+
+# 세션 상태에 기억을 저장할 키
+SESSION_KEY = "retrieval_memory"
+
+# 반복 예시 처리 모드
+REPEAT_MODES = ("skip", "reference", "replace")
+
+
+def parent_key(item: Dict) -> str:
+    """검색 결과의 원본 대화 ID (청크면 parent_id)"""
+    return (item.get("metadata") or {}).get("parent_id") or item["id"]
+
+
+class RetrievalMemory:
+    """이미 주입한 예시의 원본 대화 ID 기록"""
+
+    def __init__(self, round_id: Optional[object] = None, mode: str = RAG_REPEAT_MODE):
+        """
+        Args:
+            round_id: 기억이 속한 라운드 (바뀌면 session_memory()가 새 기억을 만듦)
+            mode: 반복 예시 처리 모드 (skip, reference, replace)
+        """
+        if mode not in REPEAT_MODES:
+            raise ValueError(f"Unsupported repeat mode: {mode} (choose from {REPEAT_MODES})")
+        self.round_id = round_id
+        self.mode = mode
+        self.seen: Dict[str, int] = {}  # 원본 대화 ID -> 처음 주입한 턴
+        self.turn = 0
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    def has_seen(self, item: Dict) -> bool:
+        """검색 결과의 원본 대화를 이미 주입했는지 여부"""
+        return parent_key(item) in self.seen
+
+    def reset(self) -> None:
+        """기억을 비웁니다."""
+        self.seen.clear()
+        self.turn = 0
+
+    def extra_candidates(self, n_results: int) -> int:
+        """반복 예시를 대신할 후보를 찾기 위해 더 가져올 검색 결과 수 (replace 모드만)"""
+        return min(len(self), n_results) if self.mode == "replace" else 0
+
+    def prioritize(self, candidates: List[Dict]) -> List[Dict]:
+        """
+        이미 주입한 후보에 repeat 표시를 붙입니다.
+        replace 모드면 처음 보는 후보를 앞으로 보냅니다. (각 그룹 안의 순서는 유지)
+        """
+        marked = [dict(item, repeat=True) if self.has_seen(item) else item for item in candidates]
+        if self.mode != "replace":
+            return marked
+        return [item for item in marked if not item.get("repeat")] + [
+            item for item in marked if item.get("repeat")
+        ]
+
+    def filter(self, selected: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        주입하기로 고른 예시에서 다시 넣지 않을 반복 예시를 뺍니다.
+
+        Returns:
+            (남길 예시, 뺀 반복 예시 수). reference 모드는 반복 예시를 참조로 남김
+        """
+        if self.mode == "reference":
+            return selected, 0
+        kept = [item for item in selected if not item.get("repeat")]
+        return kept, len(selected) - len(kept)
+
+    def remember(self, items: List[Dict]) -> None:
+        """이번 턴에 주입한 예시를 기록합니다."""
+        self.turn += 1
+        for item in items:
+            self.seen.setdefault(parent_key(item), self.turn)
+
+
+def session_memory(state: MutableMapping, round_id: object) -> RetrievalMemory:
+    """
+    세션 상태에서 현재 라운드의 기억을 가져옵니다. 라운드가 바뀌었으면 새로 만듭니다.
+
+    Args:
+        state: 세션 상태 (st.session_state)
+        round_id: 현재 라운드
+    """
+    memory = state.get(SESSION_KEY)
+    if memory is None or memory.round_id != round_id:
+        memory = RetrievalMemory(round_id)
+        state[SESSION_KEY] = memory
+    return memory
@@ -0,0 +1,136 @@
+"""
+검색 결과 주입 정책 모듈
+
+가장 가까운 예시도 멀리 떨어져 있으면 컨텍스트를 넣어도 응답 품질에 도움이 되지 않고
+프롬프트만 길어집니다. 이 모듈은 검색 후보의 거리 분포를 보고
+주입할 예시 수를 정하거나 주입을 건너뜁니다.
+
+- 가장 가까운 후보의 거리가 max_distance보다 멀면 아무것도 넣지 않음
+- 가장 가까운 거리 + margin 안에 드는 후보만 남김
+  (거리가 급격히 벌어지면 적게, 고르게 가까우면 max_results까지 많이)
+- 거리가 없는 후보(하이브리드 검색의 어휘 빠른 경로 결과)는 통과로 간주
+
+턴마다 주입/건너뜀 횟수를 세어 임계값 조정에 쓸 수 있도록 합니다.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import (
+    RAG_DISTANCE_MARGIN,
+    RAG_MAX_DISTANCE,
+    RAG_MAX_RESULTS,
+    RAG_MIN_RESULTS,
+)
+
+# 건너뛴 이유
+SKIP_NO_RESULTS = "no_results"
+SKIP_WEAK_MATCH = "weak_match"
+SKIP_ALL_REPEATS = "all_repeats"  # 고른 예시가 모두 이번 라운드에 이미 넣은 예시
+
+
+class RetrievalStats:
+    """턴별 주입/건너뜀 카운터 (여러 세션이 공유하므로 잠금 사용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """카운터를 초기화합니다."""
+        self.turns = 0
+        self.injected = 0
+        self.skipped = {SKIP_NO_RESULTS: 0, SKIP_WEAK_MATCH: 0, SKIP_ALL_REPEATS: 0}
+        self.examples = 0
+
+    def record(self, selected: int, skip_reason: Optional[str]) -> None:
+        """한 턴의 결정을 기록합니다."""
+        with self._lock:
+            self.turns += 1
+            if skip_reason:
+                self.skipped[skip_reason] = self.skipped.get(skip_reason, 0) + 1
+            else:
+                self.injected += 1
+                self.examples += selected
+
+    def snapshot(self) -> Dict:
+        """현재 카운터 (skip_rate: 건너뛴 턴 비율, avg_examples: 주입한 턴의 평균 예시 수)"""
+        with self._lock:
+            skipped = sum(self.skipped.values())
+            return {
+                "turns": self.turns,
+                "injected": self.injected,
+                "skipped": dict(self.skipped),
+                "skip_rate": round(skipped / self.turns, 4) if self.turns else 0.0,
+                "avg_examples": round(self.examples / self.injected, 2) if self.injected else 0.0,
+            }
+
+
+class RetrievalPolicy:
+    """검색 후보의 거리로 주입 여부와 예시 수를 정하는 정책"""
+
+    def __init__(
+        self,
+        max_distance: Optional[float] = RAG_MAX_DISTANCE,
+        margin: Optional[float] = RAG_DISTANCE_MARGIN,
+        min_results: int = RAG_MIN_RESULTS,
+        max_results: int = RAG_MAX_RESULTS,
+    ):
+        """
+        Args:
+            max_distance: 가장 가까운 후보가 이보다 멀면 주입하지 않음 (None이면 검사 안 함)
+            margin: 가장 가까운 거리 + margin 안의 후보만 남김 (None이면 검사 안 함)
+            min_results: max_distance 안의 후보가 있으면 margin 밖이라도 최소로 남길 수
+            max_results: 검색할 후보 수 (남길 수 있는 최대 예시 수)
+        """
+        self.max_distance = max_distance
+        self.margin = margin
+        self.min_results = min_results
+        self.max_results = max_results
+        self.stats = RetrievalStats()
+
+    def _within(self, distance: Optional[float], limit: Optional[float]) -> bool:
+        return distance is None or limit is None or distance <= limit
+
+    def select(
+        self, candidates: List[Dict], limit: Optional[int] = None, record: bool = True
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        주입할 후보를 고르고 결정을 기록합니다.
+
+        Args:
+            candidates: 선호 순 검색 후보 (distance 키를 갖는 dict 리스트)
+            limit: 남길 최대 후보 수 (None이면 제한 없음)
+            record: 결정을 stats에 기록할지 여부 (고른 뒤 더 거르는 호출자는 False로 두고
+                최종 결과를 stats.record()로 직접 기록)
+
+        Returns:
+            (주입할 후보 목록, 건너뛴 이유 / 주입하면 None)
+        """
+        selected, skip_reason = self._select(candidates)
+        selected = selected[:limit]
+        if record:
+            self.stats.record(len(selected), skip_reason)
+        return selected, skip_reason
+
+    def _select(self, candidates: List[Dict]) -> Tuple[List[Dict], Optional[str]]:
+        if not candidates:
+            return [], SKIP_NO_RESULTS
+
+        distances = [item.get("distance") for item in candidates]
+        known = [distance for distance in distances if distance is not None]
+        best = min(known) if known else None
+
+        if not self._within(best, self.max_distance):
+            return [], SKIP_WEAK_MATCH
+
+        # max_distance 안의 후보 중 margin 안의 후보만 (단 min_results개는 보장)
+        eligible = [
+            item for item, distance in zip(candidates, distances)
+            if self._within(distance, self.max_distance)
+        ]
+        limit = best + self.margin if best is not None and self.margin is not None else None
+        selected = [item for item in eligible if self._within(item.get("distance"), limit)]
+        if len(selected) < self.min_results:
+            selected = eligible[: self.min_results]
+        return selected, None
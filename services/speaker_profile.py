@@ -0,0 +1,106 @@
+"""
+화자 성별/말투 메타데이터 모듈
+
+전처리된 대화의 턴에는 speaker_sex, speech_act가 남아 있지만 컬렉션에는
+turn_count만 저장되어, 게임에서 상대 페르소나(EMOTIONAL/LOGICAL/TOUGH)와
+성별에 맞는 예시만 고를 방법이 없었습니다.
+
+인덱싱할 때 턴에서 다음 필드를 만들어 메타데이터에 넣고, 검색 시에는
+정확 일치 조건으로 해당 파티션만 찾습니다.
+
+- sex_M / sex_F: 해당 성별 화자가 있으면 True
+- style: 대화 전체의 주된 말투 (EMOTIONAL, LOGICAL, TOUGH, 없으면 "")
+- style_M / style_F: 해당 성별 화자 발화의 주된 말투
+
+말투는 화행(speech_act) 대분류로 추정합니다.
+- (표현) 감정/감사/사과 등 → EMOTIONAL (공감형)
+- (단언) 주장/진술 등 → LOGICAL (이성형)
+- (지시), (언약) 질문/요구/제안/약속 등 → TOUGH (직진형)
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+SPEAKER_SEXES = ("M", "F")
+PERSONA_STYLES = ("EMOTIONAL", "LOGICAL", "TOUGH")
+
+# 원본 데이터의 성별 표기 -> M/F
+_SEX_CODES = {
+    "남성": "M",
+    "남": "M",
+    "m": "M",
+    "male": "M",
+    "여성": "F",
+    "여": "F",
+    "f": "F",
+    "female": "F",
+}
+
+# 화행 대분류 -> 말투
+_SPEECH_ACT_STYLES = {
+    "표현": "EMOTIONAL",
+    "단언": "LOGICAL",
+    "지시": "TOUGH",
+    "언약": "TOUGH",
+}
+
+
+def normalize_sex(sex: str) -> str:
+    """성별 표기를 M/F로 바꿉니다. 알 수 없으면 ""."""
+    return _SEX_CODES.get((sex or "").strip().lower(), "")
+
+
+def speech_act_style(speech_act: str) -> str:
+    """
+    화행을 말투로 바꿉니다. 알 수 없으면 "".
+
+    Example:
+        "(표현) 긍정감정 표현하기" -> "EMOTIONAL"
+    """
+    speech_act = (speech_act or "").strip()
+    if speech_act.startswith("("):
+        category = speech_act[1:].split(")", 1)[0].strip()
+        return _SPEECH_ACT_STYLES.get(category, "")
+    return ""
+
+
+def dominant_style(turns: Iterable[Dict]) -> str:
+    """턴 목록에서 가장 많은 말투 (동률이면 먼저 나온 말투)"""
+    styles = (speech_act_style(turn.get("speech_act", "")) for turn in turns)
+    counts = Counter(style for style in styles if style)
+    if not counts:
+        return ""
+    return counts.most_common(1)[0][0]
+
+
+def speaker_metadata(turns: List[Dict]) -> Dict:
+    """
+    턴 목록의 성별/말투 메타데이터 필드
+
+    Example:
+        {"sex_F": True, "sex_M": True, "style": "EMOTIONAL",
+         "style_F": "EMOTIONAL", "style_M": "LOGICAL"}
+    """
+    metadata: Dict = {"style": dominant_style(turns)}
+    for sex in SPEAKER_SEXES:
+        sex_turns = [turn for turn in turns if normalize_sex(turn.get("speaker_sex", "")) == sex]
+        if sex_turns:
+            metadata[f"sex_{sex}"] = True
+            metadata[f"style_{sex}"] = dominant_style(sex_turns)
+    return metadata
+
+
+def speaker_where(speaker_sex: Optional[str] = None, style: Optional[str] = None) -> Optional[Dict]:
+    """
+    화자 성별(M/F, 남성/여성)/말투 필터를 where 조건으로 바꿉니다.
+
+    성별과 말투를 함께 주면 그 성별 화자의 말투(style_F 등)로 거릅니다.
+    """
+    sex = normalize_sex(speaker_sex)
+    if sex and style:
+        return {f"style_{sex}": style}
+    if sex:
+        return {f"sex_{sex}": True}
+    if style:
+        return {"style": style}
+    return None
@@ -0,0 +1,55 @@
+"""
+대화 주제 태그 모듈
+
+원본 데이터의 주제(subject)는 "미용과 건강/식음료", "연애/결혼"처럼 여러 주제가
+구분자로 이어진 문자열입니다. 이를 부분 문자열($contains)로 거르면 메타데이터를
+전부 훑어야 하므로, 인덱싱할 때 주제를 태그로 나누어 태그마다 불리언
+메타데이터 필드("tag_연애": True)를 두고 검색 시에는 정확히 일치하는 조건으로 거릅니다.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# 태그 메타데이터 필드 접두사
+TAG_FIELD_PREFIX = "tag_"
+
+_TAG_SEPARATORS = re.compile(r"[/,·|]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def subject_tags(subject: str) -> List[str]:
+    """
+    주제 문자열을 태그 목록으로 나눕니다.
+
+    Example:
+        "미용과 건강/식음료" -> ["미용과 건강", "식음료"]
+    """
+    tags = []
+    for part in _TAG_SEPARATORS.split(subject or ""):
+        tag = _WHITESPACE.sub(" ", part).strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def tag_field(tag: str) -> str:
+    """태그의 메타데이터 필드 이름 ("개인 및 관계" -> "tag_개인_및_관계")"""
+    return TAG_FIELD_PREFIX + tag.replace(" ", "_")
+
+
+def tag_metadata(subject: str) -> Dict[str, bool]:
+    """주제의 태그 메타데이터 필드 ({"tag_연애": True, "tag_결혼": True})"""
+    return {tag_field(tag): True for tag in subject_tags(subject)}
+
+
+def tag_where(subject_filter: str) -> Optional[Dict]:
+    """
+    주제 필터를 태그 정확 일치 where 조건으로 바꿉니다.
+    필터에 태그가 여러 개면 모두 가진 문서만 찾습니다.
+    """
+    conditions = [{tag_field(tag): True} for tag in subject_tags(subject_filter)]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
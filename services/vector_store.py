@@ -0,0 +1,435 @@
+"""
+벡터 저장소 추상화 모듈
+
+RAGService가 특정 벡터 DB에 묶이지 않도록 공통 인터페이스(VectorStore)를 두고,
+설정(config.settings.VECTOR_BACKEND)으로 구현을 고를 수 있게 합니다.
+
+- ChromaVectorStore: 기존 ChromaService (PersistentClient + HNSW)
+- NumpyVectorStore: 정규화된 임베딩 행렬을 메모리에 올려 행렬 곱 + 부분 정렬로
+  top-k를 찾는 전수 검색. 스냅샷이 최신이면 SQLite/HNSW를 열지 않으므로 시작이 빠르고,
+  말뭉치가 크지 않으면 검색도 더 빠릅니다.
+
+NumpyVectorStore 스냅샷은 Chroma 컬렉션에서 내보내 만듭니다:
+    python -m services.vector_store [--dtype float32] [--store-dir numpy_store]
+
+스냅샷에는 내보낼 때의 컬렉션 버전(ChromaService가 컬렉션을 바꿀 때마다 persist_dir에
+기록하는 값)을 함께 저장합니다. create_vector_store("numpy")는 이 파일끼리만 비교하고,
+버전이 다를 때만 Chroma 컬렉션을 열어 다시 내보냅니다.
+"""
+
+import argparse
+import json
+from abc import ABC, abstractmethod
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from chromadb.api.types import EmbeddingFunction
+
+from services.chroma_service import (
+    DEFAULT_EMBEDDING_MODEL,
+    ChromaService,
+    create_embedding_function,
+    read_collection_version,
+)
+from services.embedding_cache import EmbeddingCache
+from services.quantized_index import SUPPORTED_DTYPES, QuantizedIndex
+from services.query_cache import QueryEmbedder, normalize_query
+
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+# NumpyVectorStore 스냅샷 기본 경로
+DEFAULT_NUMPY_STORE_DIR = str(Path(__file__).parent.parent / "numpy_store")
+
+# 스냅샷을 내보낸 원본 컬렉션 버전 기록 파일 (스냅샷 경로 안에 저장)
+SOURCE_FILENAME = "source.json"
+
+
+class VectorStore(ABC):
+    """벡터 저장소 공통 인터페이스"""
+
+    @abstractmethod
+    def add(
+        self,
+        conversations: Iterable[Dict],
+        batch_size: int = 100,
+        extra_metadata: Optional[Dict] = None,
+    ) -> int:
+        """
+        대화를 임베딩하여 저장합니다.
+
+        Returns:
+            추가된 문서 수
+        """
+
+    @abstractmethod
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        n_results: int = 5,
+        filters: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> List[Dict]:
+        """
+        여러 쿼리를 한 번에 검색합니다.
+
+        Args:
+            queries: 검색 쿼리 목록
+            n_results: 쿼리당 반환할 결과 수
+            filters: 쿼리별 필터 (platform_filter, subject_filter 등을 갖는 dict 또는 None)
+
+        Returns:
+            입력 순서와 같은 검색 결과 리스트 (ChromaService.search() 반환 형식)
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """저장소 통계를 반환합니다."""
+
+    def count(self, limit: Optional[int] = None, **filters) -> Optional[int]:
+        """
+        필터에 맞는 문서 수를 반환합니다. (limit까지만 셈, 셀 수 없는 저장소는 None)
+
+        Args:
+            limit: 이 수까지만 셈
+            filters: search()의 필터 인자
+        """
+        return None
+
+    def search(self, query: str, n_results: int = 5, **filters) -> Dict:
+        """쿼리 하나를 검색합니다."""
+        return self.search_batch([query], n_results=n_results, filters=[filters])[0]
+
+    def get_similar_conversations(self, query: str, n_results: int = 3, **filters) -> List[Dict]:
+        """쿼리와 유사한 대화를 id, dialogue, metadata, distance dict 리스트로 반환합니다."""
+        return ChromaService.to_conversations(self.search(query, n_results=n_results, **filters))
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaService 기반 벡터 저장소"""
+
+    def __init__(self, service: Optional[ChromaService] = None, **service_kwargs):
+        """
+        Args:
+            service: 사용할 ChromaService (None이면 service_kwargs로 새로 생성)
+        """
+        self.service = service or ChromaService(**service_kwargs)
+
+    def add(
+        self,
+        conversations: Iterable[Dict],
+        batch_size: int = 100,
+        extra_metadata: Optional[Dict] = None,
+    ) -> int:
+        return self.service.add_conversations(conversations, batch_size, extra_metadata)
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        n_results: int = 5,
+        filters: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> List[Dict]:
+        return self.service.search_batch(queries, n_results=n_results, filters=filters)
+
+    def count(self, limit: Optional[int] = None, **filters) -> Optional[int]:
+        return self.service.count(limit=limit, **filters)
+
+    def stats(self) -> Dict:
+        return dict(self.service.get_stats(), backend="chroma")
+
+
+class NumpyVectorStore(VectorStore):
+    """메모리 NumPy 행렬 기반 코사인 전수 검색 벡터 저장소"""
+
+    def __init__(
+        self,
+        store_dir: Optional[str] = None,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+        dtype: str = "float32",
+        use_embedding_cache: bool = True,
+        query_cache_size: int = 1024,
+        subject_filter_mode: str = "tag",
+        embedding_fn: Optional[EmbeddingFunction] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        index: Optional[QuantizedIndex] = None,
+        documents: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            store_dir: 스냅샷 경로 (None이면 기본 경로). index가 없고 스냅샷이 있으면 불러옵니다.
+            embedding_model: 임베딩 모델 (스냅샷을 만든 모델과 같아야 함)
+            dtype: 벡터 저장 형식 (float32, float16, int8)
+            use_embedding_cache: 임베딩 디스크 캐시 사용 여부
+            query_cache_size: 쿼리 임베딩 LRU 캐시 크기
+            subject_filter_mode: 주제 필터 방식 (tag, contains)
+            embedding_fn: 사용할 임베딩 함수 (ChromaService와 모델을 공유할 때 지정,
+                None이면 embedding_model로 새로 생성)
+            embedding_cache: embedding_fn에 붙어 있는 임베딩 캐시
+            index: 이미 만든 벡터 인덱스 (지정하면 스냅샷을 읽지 않음)
+            documents: index의 행 순서대로 문서 본문
+        """
+        self.store_dir = Path(store_dir or DEFAULT_NUMPY_STORE_DIR)
+        self.embedding_model = embedding_model
+        self.subject_filter_mode = subject_filter_mode
+        if embedding_fn is None:
+            embedding_fn, embedding_cache = create_embedding_function(
+                embedding_model, use_embedding_cache=use_embedding_cache
+            )
+        self.embedding_fn, self.embedding_cache = embedding_fn, embedding_cache
+        self.query_embedder = QueryEmbedder(self.embedding_fn, query_cache_size)
+
+        self.documents: List[str] = list(documents or [])
+        self.collection_version: Optional[str] = None
+        if index is not None:
+            self.index = index
+        elif (self.store_dir / "meta.json").exists():
+            self.index = QuantizedIndex.load(str(self.store_dir))
+            with open(self.store_dir / "documents.jsonl", "r", encoding="utf-8") as f:
+                self.documents = [json.loads(line) for line in f]
+            self.collection_version = (self.snapshot_meta(str(self.store_dir)) or {}).get(
+                "collection_version"
+            )
+            print(f"NumPy vector store loaded from {self.store_dir} ({len(self.index)} documents)")
+        else:
+            self.index = QuantizedIndex(dtype)
+
+        self._rows = {doc_id: row for row, doc_id in enumerate(self.index.ids)}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _append(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict],
+    ) -> None:
+        for doc_id in ids:
+            self._rows[doc_id] = len(self._rows)
+        self.index.add(ids, embeddings, metadatas)
+        self.documents.extend(documents)
+
+    def add(
+        self,
+        conversations: Iterable[Dict],
+        batch_size: int = 100,
+        extra_metadata: Optional[Dict] = None,
+    ) -> int:
+        added_count = 0
+        iterator = iter(conversations)
+
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+
+            ids = []
+            documents = []
+            metadatas = []
+            for conv in batch:
+                dialogue = conv.get("dialogue", "")
+                if not dialogue:
+                    continue
+
+                doc_id, metadata = ChromaService.document_record(conv, extra_metadata)
+
+                # ChromaDB add()와 마찬가지로 이미 있는 ID는 건너뜀
+                if doc_id in self._rows or doc_id in ids:
+                    continue
+
+                ids.append(doc_id)
+                documents.append(dialogue)
+                metadatas.append(metadata)
+
+            if ids:
+                self._append(ids, self.embedding_fn(documents), documents, metadatas)
+                added_count += len(ids)
+
+        return added_count
+
+    def embed_queries(self, queries: Sequence[str]) -> List[List[float]]:
+        """쿼리 임베딩 목록을 반환합니다. (LRU 캐시에 없는 쿼리만 임베딩)"""
+        return self.query_embedder(queries)
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        n_results: int = 5,
+        filters: Optional[Sequence[Optional[Dict]]] = None,
+    ) -> List[Dict]:
+        if filters is None:
+            filters = [None] * len(queries)
+        if len(filters) != len(queries):
+            raise ValueError("filters must have the same length as queries")
+
+        normalized = [normalize_query(query) for query in queries]
+        embeddings = self.embed_queries(normalized)
+
+        # 같은 where 조건끼리 묶어 행렬 곱 한 번으로 검색
+        groups: Dict[str, Dict] = {}
+        for i, query_filters in enumerate(filters):
+            query_filters = {k: v for k, v in (query_filters or {}).items() if v}
+            where = ChromaService.build_where(
+                **{"subject_filter_mode": self.subject_filter_mode, **query_filters}
+            )
+            group = groups.setdefault(
+                json.dumps(where, sort_keys=True), {"where": where, "items": []}
+            )
+            group["items"].append(i)
+
+        results: List[Optional[Dict]] = [None] * len(queries)
+        for group in groups.values():
+            items = group["items"]
+            ids, distances = self.index.search(
+                [embeddings[i] for i in items], n_results, group["where"]
+            )
+            for i, row_ids, row_distances in zip(items, ids, distances):
+                rows = [self._rows[doc_id] for doc_id in row_ids]
+                results[i] = {
+                    "ids": [row_ids],
+                    "documents": [[self.documents[row] for row in rows]],
+                    "metadatas": [[self.index.metadatas[row] for row in rows]],
+                    "distances": [row_distances],
+                }
+
+        return results
+
+    def count(self, limit: Optional[int] = None, **filters) -> Optional[int]:
+        filters = {k: v for k, v in filters.items() if v}
+        where = ChromaService.build_where(
+            **{"subject_filter_mode": self.subject_filter_mode, **filters}
+        )
+        total = self.index.count(where)
+        return min(total, limit) if limit is not None else total
+
+    def stats(self) -> Dict:
+        return {
+            "backend": "numpy",
+            "document_count": len(self),
+            "dtype": self.index.dtype,
+            "vector_bytes": self.index.nbytes,
+            "store_dir": str(self.store_dir),
+            "query_embedding_cache": self.query_embedder.cache.stats(),
+        }
+
+    @staticmethod
+    def snapshot_meta(store_dir: Optional[str] = None) -> Optional[Dict]:
+        """스냅샷의 meta.json (dtype, 문서 수)과 원본 컬렉션 버전 / 스냅샷이 없으면 None"""
+        snapshot_dir = Path(store_dir or DEFAULT_NUMPY_STORE_DIR)
+        if not (snapshot_dir / "meta.json").exists():
+            return None
+        with open(snapshot_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["collection_version"] = None
+        if (snapshot_dir / SOURCE_FILENAME).exists():
+            with open(snapshot_dir / SOURCE_FILENAME, "r", encoding="utf-8") as f:
+                meta["collection_version"] = json.load(f).get("collection_version")
+        return meta
+
+    def save(self) -> None:
+        """스냅샷을 저장합니다."""
+        self.index.save(str(self.store_dir))
+        with open(self.store_dir / "documents.jsonl", "w", encoding="utf-8") as f:
+            for document in self.documents:
+                f.write(json.dumps(document, ensure_ascii=False))
+                f.write("\n")
+        with open(self.store_dir / SOURCE_FILENAME, "w", encoding="utf-8") as f:
+            json.dump({"collection_version": self.collection_version}, f)
+
+    @classmethod
+    def from_chroma(
+        cls,
+        service: ChromaService,
+        store_dir: Optional[str] = None,
+        dtype: str = "float32",
+        page_size: int = 5000,
+    ) -> "NumpyVectorStore":
+        """
+        Chroma 컬렉션의 벡터를 다시 임베딩하지 않고 그대로 가져와 스냅샷을 만듭니다.
+        임베딩 함수는 service의 것을 함께 씁니다. (모델을 다시 불러오지 않음)
+        """
+        # 내보내는 동안 컬렉션이 바뀌어도 버전이 내용보다 앞서지 않도록 먼저 읽음
+        version = service.collection_version()
+        index = QuantizedIndex(dtype)
+        documents: List[str] = []
+
+        offset = 0
+        while True:
+            page = service.collection.get(
+                limit=page_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"],
+            )
+            if len(page["ids"]):
+                index.add(page["ids"], page["embeddings"], page["metadatas"])
+                documents.extend(page["documents"])
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+
+        store = cls(
+            store_dir,
+            embedding_model=service.embedding_model,
+            dtype=dtype,
+            subject_filter_mode=service.subject_filter_mode,
+            embedding_fn=service.embedding_fn,
+            embedding_cache=service.embedding_cache,
+            index=index,
+            documents=documents,
+        )
+        store.collection_version = version
+        store.save()
+        print(f"Exported {len(store)} documents to {store.store_dir}")
+        return store
+
+
+def create_vector_store(backend: str = "chroma", **kwargs) -> VectorStore:
+    """
+    설정한 백엔드의 벡터 저장소를 만듭니다.
+
+    numpy 백엔드는 스냅샷에 저장한 컬렉션 버전을 persist_dir에 기록된 버전과 비교합니다.
+    (두 작은 파일만 읽고 ChromaDB는 열지 않음) 스냅샷이 없거나 재인덱싱/동기화로
+    컬렉션이 바뀌었으면 그때만 컬렉션을 열어 다시 내보내며, 임베딩 모델은
+    ChromaService와 함께 써서 한 번만 불러옵니다.
+
+    Args:
+        backend: chroma 또는 numpy
+        kwargs: 백엔드 생성자 인자 (numpy 백엔드는 원본 컬렉션 경로 persist_dir도 받음)
+    """
+    if backend == "chroma":
+        return ChromaVectorStore(**kwargs)
+    if backend == "numpy":
+        persist_dir = kwargs.pop("persist_dir", None)
+        store_dir = kwargs.get("store_dir")
+        meta = NumpyVectorStore.snapshot_meta(store_dir)
+        version = read_collection_version(persist_dir)
+        if meta is None or version is None or meta["collection_version"] != version:
+            print("NumPy vector store snapshot is missing or stale. Exporting from Chroma...")
+            service = ChromaService(
+                persist_dir=persist_dir,
+                embedding_model=kwargs.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
+                use_embedding_cache=kwargs.get("use_embedding_cache", True),
+            )
+            dtype = meta["dtype"] if meta else kwargs.get("dtype", "float32")
+            return NumpyVectorStore.from_chroma(service, store_dir=store_dir, dtype=dtype)
+        return NumpyVectorStore(**kwargs)
+    raise ValueError(f"Unsupported vector backend: {backend} (choose from {VECTOR_BACKENDS})")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Chroma 컬렉션을 NumPy 벡터 저장소로 내보내기")
+    parser.add_argument("--persist-dir", default=None, help="ChromaDB 경로 (기본: chroma_db)")
+    parser.add_argument("--store-dir", default=None, help="스냅샷 경로 (기본: numpy_store)")
+    parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, default="float32")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    service = ChromaService(persist_dir=args.persist_dir)
+    store = NumpyVectorStore.from_chroma(service, store_dir=args.store_dir, dtype=args.dtype)
+    print(store.stats())
+
+
+if __name__ == "__main__":
+    main()
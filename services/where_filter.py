@@ -0,0 +1,100 @@
+"""
+ChromaDB where 조건 평가 모듈
+
+ChromaDB 밖에서 벡터를 검색할 때(양자화 인덱스 등) 같은 where 조건으로
+메타데이터를 거를 수 있도록 ChromaDB의 메타데이터 필터 문법을 파이썬으로 평가합니다.
+
+지원 연산자: $and, $or, $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $contains, $not_contains
+
+태그/플랫폼 필터처럼 같은 조건이 반복되므로 WhereMaskCache로 조건별
+문서 마스크를 한 번만 계산해 두고 재사용합니다.
+"""
+
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+    "$contains": lambda value, target: isinstance(value, str) and target in value,
+    "$not_contains": lambda value, target: not (isinstance(value, str) and target in value),
+}
+
+
+def matches_where(metadata: Optional[Dict], where: Optional[Dict]) -> bool:
+    """
+    메타데이터가 where 조건을 만족하는지 확인합니다.
+
+    Args:
+        metadata: 문서 메타데이터
+        where: ChromaDB where 조건 (None이면 항상 True)
+
+    Returns:
+        조건 만족 여부
+    """
+    if not where:
+        return True
+
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, target in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not _OPERATORS[op](value, target):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+
+    return True
+
+
+class WhereMaskCache:
+    """where 조건별 문서 마스크(bool 배열) 캐시"""
+
+    def __init__(self, maxsize: int = 64):
+        """
+        Args:
+            maxsize: 캐시할 최대 조건 수
+        """
+        self.maxsize = maxsize
+        self._masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def get(self, metadatas: Sequence[Optional[Dict]], where: Dict) -> np.ndarray:
+        """
+        메타데이터 목록에서 where 조건을 만족하는 문서 마스크를 반환합니다.
+        메타데이터 목록이 바뀌면 clear()를 호출해야 합니다.
+        """
+        key = json.dumps(where, sort_keys=True, ensure_ascii=False)
+        mask = self._masks.get(key)
+        if mask is None or len(mask) != len(metadatas):
+            mask = np.fromiter(
+                (matches_where(metadata, where) for metadata in metadatas),
+                dtype=bool,
+                count=len(metadatas),
+            )
+            self._masks[key] = mask
+            while len(self._masks) > self.maxsize:
+                self._masks.popitem(last=False)
+        self._masks.move_to_end(key)
+        return mask
+
+    def clear(self) -> None:
+        """모든 마스크를 삭제합니다."""
+        self._masks.clear()
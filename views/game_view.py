@@ -1,6 +1,7 @@
 import streamlit as st
 import time
 from services.llm_service import get_ai_response
+from services.retrieval_memory import session_memory
 from services.db_service import save_chat_log, save_affinity_log
 from config.prompts import get_system_prompt, get_persona_name, get_first_greeting
 
@@ -140,9 +141,24 @@ def show_game():
             message_placeholder = st.empty()
             message_placeholder.markdown("입력 중... ▌")
             
-            result = get_ai_response(st.session_state["messages"])
-                
+            stream = get_ai_response(
+                st.session_state["messages"],
+                persona=current_type,
+                user_gender=user_gender,
+                memory=session_memory(st.session_state, current_round),
+                stream=True,
+            )
+
+            # 모델이 생성하는 대로 응답 텍스트 표시
+            for chunk in stream:
+                full_response += chunk
+                message_placeholder.markdown(full_response + "▌")
+
+            # 점수와 이유는 JSON 객체가 끝난 뒤에 확정됨
+            result = stream.finish()
             ai_text = result.get("response", "...")
+            full_response = full_response or ai_text
+            message_placeholder.markdown(full_response)
             
             # === [여기 수정] 점수 변환 안전장치 추가 ===
             try:
@@ -185,14 +201,6 @@ def show_game():
                 st.toast(f"{persona_name}의 호감도가 올랐습니다! (+{score_delta}) 😍")
             elif score_delta < 0:
                 st.toast(f"{persona_name}의 호감도가 떨어졌습니다.. ({score_delta}) 😢")
-
-            # 타자기 효과
-            full_response = ""
-            for chunk in ai_text.split():
-                full_response += chunk + " "
-                time.sleep(0.05)
-                message_placeholder.markdown(full_response + "▌")
-            message_placeholder.markdown(full_response)
         
         # AI 메시지 저장
         st.session_state["messages"].append({"role": "assistant", "content": full_response})